@@ -0,0 +1,145 @@
+"""SetlistFMAgents for several model deployments over shared plugins.
+
+Building a SetlistFMAgent sets up a kernel, a chat completion service,
+the plugins and their HTTP clients. AgentPool does that once per model
+deployment: the first agent's plugins (and so their connection pools,
+caches and rate limiters) are reused by every later one, and get() of a
+model already built is a dict lookup. Conversations (see session_manager)
+live outside the agents, so switching a session's model keeps its
+history. warm() opens connections to setlist.fm, Spotify and the model
+endpoints ahead of the first user request.
+"""
+import asyncio
+import logging
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, Iterable, List
+
+from setlist_agent import SetlistFMAgent
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_service(service: Any) -> None:
+    """Open the model endpoint's connection with a models listing (no tokens are spent)."""
+    client = getattr(service, "client", None)
+    if client is None or not hasattr(client, "models"):
+        return
+    try:
+        await client.models.list()
+    except Exception as e:
+        # any answer, even an error status, leaves a warm connection behind
+        logger.info(f"Model endpoint warm-up for {getattr(service, 'ai_model_id', '?')} answered: {e}")
+
+
+class AgentPool:
+    """One SetlistFMAgent per model deployment, built on first use.
+
+    Args:
+        api_key: Setlist.fm API key
+        api_key_env: Name of the environment variable containing the OpenAI API key
+        service_factory: Optional model name -> chat completion service; AzureChatCompletion by default
+        agent_kwargs: Further SetlistFMAgent arguments (memo_size, setlist_plugin, ...)
+    """
+
+    def __init__(self, api_key: str, api_key_env: str = "OPENAI_API",
+                 service_factory: Optional[Callable[[str], Any]] = None, **agent_kwargs: Any):
+        self.api_key = api_key
+        self.api_key_env = api_key_env
+        self.service_factory = service_factory
+        self.agent_kwargs = agent_kwargs
+        self.build_times: Dict[str, float] = {}
+        self._agents: Dict[str, SetlistFMAgent] = {}
+        self._lock = threading.Lock()
+        # (event loop, target) -> when its connections were last opened
+        self._warmed: Dict[tuple, float] = {}
+
+    @property
+    def models(self) -> List[str]:
+        return list(self._agents)
+
+    def get(self, model_name: str) -> SetlistFMAgent:
+        """The agent for model_name, built (once) if needed."""
+        agent = self._agents.get(model_name)
+        if agent is not None:
+            return agent
+        with self._lock:
+            if model_name not in self._agents:
+                self._agents[model_name] = self._build(model_name)
+            return self._agents[model_name]
+
+    def _build(self, model_name: str) -> SetlistFMAgent:
+        start = time.perf_counter()
+        kwargs = dict(self.agent_kwargs)
+        first = next(iter(self._agents.values()), None)
+        if first is not None:
+            # later models reuse the first agent's plugins and their clients
+            kwargs.update(setlist_plugin=first.setlist_plugin, identity_plugin=first.identity_plugin,
+                          tracks_plugin=first.tracks_plugin, fast_path=first.fast_path)
+        service = self.service_factory(model_name) if self.service_factory is not None else None
+        agent = SetlistFMAgent(self.api_key, model_name=model_name, api_key_env=self.api_key_env,
+                               service=service, **kwargs)
+        self.build_times[model_name] = time.perf_counter() - start
+        logger.info(f"Built agent for {model_name} in {self.build_times[model_name] * 1000:.1f} ms")
+        return agent
+
+    def _spotify_clients(self) -> List[Any]:
+        first = next(iter(self._agents.values()), None)
+        if first is None:
+            return []
+        clients = []
+        for plugin in (first.identity_plugin, first.tracks_plugin):
+            client = getattr(getattr(plugin, "resolver", None), "spotify_client", None)
+            if client is not None and all(client is not c for c in clients):
+                clients.append(client)
+        return clients
+
+    async def warm(self, model_names: Iterable[str] = (), connections: int = 2,
+                   max_age: float = 30.0) -> Dict[str, float]:
+        """Build agents for model_names and open connections to every upstream.
+
+        Connections belong to the running event loop, so this is meant to run
+        on the server's loop (e.g. on page load). Targets warmed on the same
+        loop within max_age seconds are skipped, so a model switch only warms
+        the new model. Returns the seconds each warm-up took, by target.
+        """
+        for model_name in model_names:
+            self.get(model_name)
+        if not self._agents:
+            return {}
+
+        async def timed(call):
+            start = time.perf_counter()
+            try:
+                await call
+            except Exception as e:
+                logger.warning(f"Warm-up failed: {e}")
+            return time.perf_counter() - start
+
+        first = next(iter(self._agents.values()))
+        targets = {"setlistfm": lambda: first.setlist_plugin.client.warm(connections)}
+        for i, client in enumerate(self._spotify_clients()):
+            targets[f"spotify{i or ''}"] = lambda client=client: client.warm(connections)
+        for model_name, agent in self._agents.items():
+            targets[f"model:{model_name}"] = lambda agent=agent: warm_service(agent.kernel.get_service("Agent"))
+        loop = id(asyncio.get_running_loop())
+        now = time.monotonic()
+        targets = {name: warm for name, warm in targets.items()
+                   if now - self._warmed.get((loop, name), float("-inf")) >= max_age}
+        if not targets:
+            return {}
+        for name in targets:
+            self._warmed[(loop, name)] = now
+        elapsed = await asyncio.gather(*[timed(warm()) for warm in targets.values()])
+        timings = dict(zip(targets, elapsed))
+        logger.info(f"Warmed connections: {', '.join(f'{k} {v * 1000:.0f} ms' for k, v in timings.items())}")
+        return timings
+
+    async def close(self) -> None:
+        """Close the shared clients' connection pools."""
+        first = next(iter(self._agents.values()), None)
+        if first is None:
+            return
+        await first.setlist_plugin.close()
+        for client in self._spotify_clients():
+            await client.close()
@@ -0,0 +1,171 @@
+"""Answers to first questions of a conversation, kept in front of the agent.
+
+The UI's example prompts and popular questions ("Find setlists for
+Radiohead in London") arrive verbatim or nearly so many times a day, and
+each one costs a full model-plus-tools turn. AnswerCache remembers the
+answers to first questions:
+
+- keys are normalized questions (case, punctuation, spacing and plural
+  "s" ignored), so trivial variations hit directly;
+- with similarity > 0 a miss is retried against past questions by TF-IDF
+  cosine similarity (computed locally). A near match is only accepted
+  when every word the two questions do not share is a filler word, so
+  "... in London" never answers "... in Paris";
+- entries expire by what the question asks about, in line with the
+  setlist.fm response cache TTLs: "latest"/"upcoming" questions after
+  15 minutes, setlist searches after an hour, artist facts after a day.
+
+Follow-up turns depend on the conversation so far and are never cached;
+SetlistFMAgent only consults the cache for a conversation's first turn.
+"""
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Optional, Dict, Any, List, Tuple
+
+# TTL in seconds by question pattern; the first matching pattern wins.
+DEFAULT_TTLS: Dict[str, float] = {
+    r"\b(last|latest|recent|recently|upcoming|next|new|today|tonight|tour|trending)\b": 15 * 60,
+    r"\b(setlists?|concerts?|shows?|gigs?|played|play)\b": 3600,
+    r"\b(artist|about|who|venue|where)\b": 24 * 3600,
+}
+DEFAULT_TTL = 10 * 60
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def tokens(question: str) -> List[str]:
+    """Lower-cased words of a question, possessive and plural "s" removed."""
+    words = _WORD.findall(question.casefold().replace("'s", ""))
+    return [w[:-1] if len(w) > 3 and w.endswith("s") and not w.endswith("ss") else w for w in words]
+
+
+def normalize(question: str) -> str:
+    return " ".join(tokens(question))
+
+
+# words whose presence or absence does not change what is asked
+FILLER_WORDS = frozenset(tokens("""
+a an the please can could would you me us i we my our tell show give find get list what which
+is are was were do does did of for to in at on about some any all there that this just and hi hey
+"""))
+# filler words count this much of their tf-idf weight in similarities
+FILLER_WEIGHT = 0.2
+
+
+class AnswerEntry:
+    __slots__ = ("question", "answer", "expires_at", "counts")
+
+    def __init__(self, question: str, answer: str, expires_at: float, counts: Counter):
+        self.question = question
+        self.answer = answer
+        self.expires_at = expires_at
+        self.counts = counts
+
+
+class AnswerCache:
+    """Bounded LRU cache of answers by normalized question, with a TTL per question kind.
+
+    Args:
+        max_size: Answers kept; the least recently used are dropped beyond it
+        ttls: Question pattern -> seconds an answer stays valid (DEFAULT_TTLS by default)
+        default_ttl: Seconds for questions matching no pattern
+        similarity: Minimum TF-IDF cosine similarity of a near match (0 disables near matches)
+    """
+
+    def __init__(self, max_size: int = 512, ttls: Optional[Dict[str, float]] = None,
+                 default_ttl: float = DEFAULT_TTL, similarity: float = 0.8):
+        self.max_size = max_size
+        self.ttls = [(re.compile(pattern, re.IGNORECASE), ttl)
+                     for pattern, ttl in (ttls if ttls is not None else DEFAULT_TTLS).items()]
+        self.default_ttl = default_ttl
+        self.similarity = similarity
+        self._entries: "OrderedDict[str, AnswerEntry]" = OrderedDict()
+        # in how many cached questions each word appears, for the idf weights
+        self._df: Counter = Counter()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl_for(self, question: str) -> float:
+        for pattern, ttl in self.ttls:
+            if pattern.search(question):
+                return ttl
+        return self.default_ttl
+
+    def get(self, question: str) -> Optional[str]:
+        """The cached answer to question or a near duplicate of it, None on a miss."""
+        key = normalize(question)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(key)
+                entry = None
+            if entry is None and self.similarity > 0 and key:
+                key = self._nearest(key, now)
+                entry = self._entries.get(key) if key is not None else None
+                if entry is not None:
+                    self.near_hits += 1
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.answer
+
+    def put(self, question: str, answer: str) -> None:
+        key = normalize(question)
+        if not key or not answer:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            counts = Counter(key.split())
+            self._entries[key] = AnswerEntry(question, answer, time.monotonic() + self.ttl_for(question), counts)
+            self._df.update(counts.keys())
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key)
+        self._df.subtract(entry.counts.keys())
+        self._df += Counter()  # drop words no longer in any question
+
+    def _vector(self, counts: Counter) -> Dict[str, float]:
+        n = len(self._entries)
+        vector = {w: c * (math.log((1 + n) / (1 + self._df[w])) + 1) * (FILLER_WEIGHT if w in FILLER_WORDS else 1.0)
+                  for w, c in counts.items()}
+        norm = math.sqrt(sum(v * v for v in vector.values())) or 1.0
+        return {w: v / norm for w, v in vector.items()}
+
+    def _nearest(self, key: str, now: float) -> Optional[str]:
+        counts = Counter(key.split())
+        query = self._vector(counts)
+        best: Tuple[float, Optional[str]] = (self.similarity, None)
+        for candidate, entry in self._entries.items():
+            if entry.expires_at <= now:
+                continue
+            different = set(counts) ^ set(entry.counts)
+            if not different <= FILLER_WORDS:
+                continue
+            vector = self._vector(entry.counts)
+            score = sum(v * vector.get(w, 0.0) for w, v in query.items())
+            if score >= best[0]:
+                best = (score, candidate)
+        return best[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._df.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits,
+                "near_hits": self.near_hits, "misses": self.misses}
@@ -0,0 +1,260 @@
+"""Persistent map between setlist.fm (MusicBrainz) artists and Spotify artists.
+
+Resolving an artist across both services takes a setlist.fm artist search,
+a Spotify artist search and a name comparison. ArtistResolver does that
+once per artist and records the outcome in an ArtistIdentityStore (SQLite),
+so every later cross-service lookup is a local index hit, under the
+canonical name or the spelling first asked for. Failed matches are
+remembered too and retried after retry_after seconds.
+"""
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import unicodedata
+from difflib import SequenceMatcher
+from typing import Optional, Dict, Any, Iterable, List
+
+from semantic_kernel.functions import kernel_function
+
+from setlist_async_client import AsyncSetlistFMClient
+from batch import BatchResult, timed_call_async
+from spotify_async_client import AsyncSpotifyClient
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artist_identity (
+    mbid TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL,
+    spotify_id TEXT,
+    spotify_name TEXT,
+    confidence REAL,
+    resolved_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_identity_name_key ON artist_identity (name_key);
+CREATE INDEX IF NOT EXISTS idx_identity_spotify ON artist_identity (spotify_id);
+CREATE TABLE IF NOT EXISTS artist_alias (
+    name_key TEXT PRIMARY KEY,
+    mbid TEXT NOT NULL
+);
+"""
+# Below this name similarity a Spotify candidate is not accepted.
+MIN_CONFIDENCE = 0.85
+
+
+def name_key(name: str) -> str:
+    """Comparison form of an artist name: no accents, case, punctuation or leading "The".
+
+    Letters of every script are kept (only combining marks go), and a name
+    made of punctuation alone ("!!!") keeps its case-folded text, so only
+    a blank name has an empty key; callers never match on that.
+    """
+    text = "".join(c for c in unicodedata.normalize("NFKD", name) if not unicodedata.combining(c))
+    text = unicodedata.normalize("NFC", text).casefold()
+    text = "".join(c if c.isalnum() else " " for c in text.replace("&", " and "))
+    words = text.split()
+    if len(words) > 1 and words[0] == "the":
+        words = words[1:]
+    return " ".join(words) or " ".join(name.casefold().split())
+
+
+class ArtistIdentityStore:
+    def __init__(self, path: str = "artist_identity.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def by_mbid(self, mbid: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM artist_identity WHERE mbid = ?", (mbid,)).fetchone()
+        return dict(row) if row else None
+
+    def by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        """Best stored identity for a name or alias; matched ones win over unmatched."""
+        key = name_key(name or "")
+        if not key:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM artist_identity WHERE name_key = ? "
+                "OR mbid IN (SELECT mbid FROM artist_alias WHERE name_key = ?) "
+                "ORDER BY spotify_id IS NULL, confidence DESC", (key, key)).fetchone()
+        return dict(row) if row else None
+
+    def add_alias(self, name: str, mbid: str) -> None:
+        """Let by_name find the artist mbid under another spelling ("ACDC" for "AC/DC")."""
+        key = name_key(name or "")
+        if not key:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR REPLACE INTO artist_alias VALUES (?, ?)", (key, mbid))
+
+    def by_spotify_id(self, spotify_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM artist_identity WHERE spotify_id = ?", (spotify_id,)).fetchone()
+        return dict(row) if row else None
+
+    def put(self, mbid: str, name: str, spotify_id: Optional[str], spotify_name: Optional[str],
+            confidence: Optional[float]) -> Dict[str, Any]:
+        row = {"mbid": mbid, "name": name, "name_key": name_key(name), "spotify_id": spotify_id,
+               "spotify_name": spotify_name, "confidence": confidence, "resolved_at": time.time()}
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO artist_identity VALUES "
+                "(:mbid, :name, :name_key, :spotify_id, :spotify_name, :confidence, :resolved_at)", row)
+        return row
+
+
+class ArtistResolver:
+    """Resolve artists to both ids, filling the store lazily.
+
+    Args:
+        setlist_client: AsyncSetlistFMClient returning raw payloads
+        spotify_client: AsyncSpotifyClient
+        store: Where resolutions are persisted
+        retry_after: Seconds before an artist without a Spotify match is searched again
+    """
+
+    def __init__(self, setlist_client: AsyncSetlistFMClient, spotify_client: AsyncSpotifyClient,
+                 store: ArtistIdentityStore, retry_after: float = 7 * 24 * 3600):
+        self.setlist_client = setlist_client
+        self.spotify_client = spotify_client
+        self.store = store
+        self.retry_after = retry_after
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def _usable(self, row: Optional[Dict[str, Any]]) -> bool:
+        return row is not None and (row["spotify_id"] is not None
+                                    or time.time() - row["resolved_at"] < self.retry_after)
+
+    async def resolve(self, artist_name: Optional[str] = None, mbid: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Identity of an artist given its name or MusicBrainz id; None if setlist.fm does not know it.
+
+        The result carries "cached": True when it came from the store.
+        """
+        # SQLite is blocking; store calls stay off the event loop
+        if mbid:
+            row = await asyncio.to_thread(self.store.by_mbid, mbid)
+        else:
+            row = await asyncio.to_thread(self.store.by_name, artist_name)
+        if self._usable(row):
+            return dict(row, cached=True)
+        key = mbid or name_key(artist_name or "")
+        if not key:
+            return None
+        # concurrent resolutions of the same artist share one lookup
+        if key not in self._pending:
+            self._pending[key] = asyncio.ensure_future(self._resolve(artist_name, mbid))
+            self._pending[key].add_done_callback(lambda _: self._pending.pop(key, None))
+        row = await asyncio.shield(self._pending[key])
+        return dict(row, cached=False) if row else None
+
+    async def _resolve(self, artist_name: Optional[str], mbid: Optional[str]) -> Optional[Dict[str, Any]]:
+        if mbid:
+            artist = await self.setlist_client.get_artist(mbid)
+        else:
+            artists = (await self.setlist_client.search_artists(artist_name)).get("artist", [])
+            if not artists:
+                return None
+            wanted = name_key(artist_name)
+            artist = next((a for a in artists if name_key(a["name"]) == wanted), artists[0])
+        name = artist["name"]
+        candidates = (await self.spotify_client.search_artist(name, limit=5)).get("artists", {}).get("items", [])
+        best, confidence = None, 0.0
+        for candidate in candidates:
+            score = SequenceMatcher(None, name_key(name), name_key(candidate["name"])).ratio()
+            # equal names: prefer the more popular artist
+            if (score, candidate.get("popularity", 0)) > (confidence, (best or {}).get("popularity", 0)):
+                best, confidence = candidate, score
+        if best is None or confidence < MIN_CONFIDENCE:
+            logger.info(f"No Spotify match for {name} ({artist['mbid']})")
+            row = await asyncio.to_thread(self.store.put, artist["mbid"], name, None, None,
+                                          round(confidence, 3) if best else None)
+        else:
+            row = await asyncio.to_thread(self.store.put, artist["mbid"], name, best["id"], best["name"],
+                                          round(confidence, 3))
+        # the asked spelling finds this artist locally next time
+        if artist_name and name_key(artist_name) != row["name_key"]:
+            await asyncio.to_thread(self.store.add_alias, artist_name, artist["mbid"])
+        return row
+
+    async def resolve_many(self, artist_names: Iterable[str], concurrency: int = 4) -> BatchResult:
+        """Resolve several artists by name; items are in input order."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(name):
+            async with semaphore:
+                return await timed_call_async(name, self.resolve, name)
+
+        start = time.perf_counter()
+        items = await asyncio.gather(*[run(name) for name in artist_names])
+        return BatchResult(list(items), time.perf_counter() - start, concurrency)
+
+
+class ArtistIdentityPlugin:
+    def __init__(self, resolver: ArtistResolver):
+        self.resolver = resolver
+
+    @staticmethod
+    def _identity(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        return {k: row[k] for k in ("name", "mbid", "spotify_id", "spotify_name", "confidence", "cached")}
+
+    @kernel_function(
+        description="Find both the setlist.fm (MusicBrainz) id and the Spotify id of an artist by name",
+        name="resolve_artist"
+    )
+    async def resolve_artist(self, artist_name: str) -> str:
+        """Resolve one artist to its setlist.fm and Spotify ids.
+
+        Args:
+            artist_name: The name of the artist.
+
+        Returns:
+            A JSON string with name, mbid, spotify_id and match confidence.
+        """
+        try:
+            identity = self._identity(await self.resolver.resolve(artist_name))
+            if identity is None:
+                return f"No artist named {artist_name} found on setlist.fm"
+            return json.dumps(identity, separators=(",", ":"))
+        except Exception as e:
+            return f"Error resolving artist: {str(e)}"
+
+    @kernel_function(
+        description="Find the setlist.fm and Spotify ids of several artists at once, given a comma separated list of names",
+        name="resolve_artists"
+    )
+    async def resolve_artists(self, artist_names: str) -> str:
+        """Resolve several artists in one call.
+
+        Args:
+            artist_names: Comma separated artist names.
+
+        Returns:
+            A JSON list with one identity (or error) per name.
+        """
+        try:
+            names = [n.strip() for n in artist_names.split(",") if n.strip()]
+            result = await self.resolver.resolve_many(names)
+            identities: List[Dict[str, Any]] = []
+            for item in result.items:
+                if not item.ok:
+                    identities.append({"name": item.id, "error": str(item.error)})
+                else:
+                    identities.append(self._identity(item.value) or {"name": item.id, "error": "not found"})
+            return json.dumps(identities, separators=(",", ":"))
+        except Exception as e:
+            return f"Error resolving artists: {str(e)}"
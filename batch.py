@@ -0,0 +1,101 @@
+import time
+from typing import Optional, Dict, Any, Iterable, List
+
+
+class BatchItem:
+    __slots__ = ("id", "value", "error", "elapsed")
+
+    def __init__(self, id: str, value: Any = None, error: Optional[Exception] = None, elapsed: float = 0.0):
+        self.id = id
+        self.value = value
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class NotFound(LookupError):
+    """The service answered the batch but returned nothing for this id."""
+
+
+class BatchResult:
+    """Outcome of a batch lookup, one item per input id in input order."""
+
+    def __init__(self, items: List[BatchItem], elapsed: float, concurrency: int):
+        self.items = items
+        self.elapsed = elapsed
+        self.concurrency = concurrency
+
+    @property
+    def values(self) -> List[Any]:
+        """Resolved values in input order, None where the lookup failed."""
+        return [item.value for item in self.items]
+
+    @property
+    def errors(self) -> Dict[str, Exception]:
+        return {item.id: item.error for item in self.items if not item.ok}
+
+    @property
+    def missing(self) -> List[str]:
+        """Ids the service does not know (as opposed to failed requests)."""
+        return [item.id for item in self.items if isinstance(item.error, NotFound)]
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregate timing, useful to size concurrency."""
+        latencies = [item.elapsed for item in self.items]
+        return {
+            "count": len(self.items),
+            "ok": sum(1 for item in self.items if item.ok),
+            "failed": sum(1 for item in self.items if not item.ok),
+            "concurrency": self.concurrency,
+            "elapsed": self.elapsed,
+            "mean_latency": sum(latencies) / len(latencies) if latencies else 0.0,
+            "max_latency": max(latencies, default=0.0),
+            "throughput": len(self.items) / self.elapsed if self.elapsed else 0.0,
+        }
+
+
+def timed_call(id: str, fn, *args) -> BatchItem:
+    start = time.perf_counter()
+    try:
+        return BatchItem(id, value=fn(*args), elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return BatchItem(id, error=e, elapsed=time.perf_counter() - start)
+
+
+async def timed_call_async(id: str, fn, *args) -> BatchItem:
+    start = time.perf_counter()
+    try:
+        return BatchItem(id, value=await fn(*args), elapsed=time.perf_counter() - start)
+    except Exception as e:
+        return BatchItem(id, error=e, elapsed=time.perf_counter() - start)
+
+
+def chunked(ids: Iterable[str], size: int) -> List[List[str]]:
+    """Split ids into request-sized chunks, each distinct id once, in first-seen order."""
+    unique = list(dict.fromkeys(ids))
+    return [unique[i:i + size] for i in range(0, len(unique), size)]
+
+
+def unchunk(ids: List[str], chunks: List[List[str]], results: List[BatchItem], what: str) -> List[BatchItem]:
+    """Turn per-chunk results (lists aligned with their chunk) back into one item per input id.
+
+    A failed chunk fails all its ids; a null entry in a successful chunk,
+    or an id a short response left out, becomes a NotFound error. When the
+    response length does not match its chunk, values are matched by their
+    "id" instead of by position.
+    """
+    by_id: Dict[str, BatchItem] = {}
+    for chunk, result in zip(chunks, results):
+        values = (result.value or []) if result.ok else [None] * len(chunk)
+        if len(values) != len(chunk):
+            returned = {v.get("id"): v for v in values if isinstance(v, dict)}
+            values = [returned.get(id) for id in chunk]
+        for id, value in zip(chunk, values):
+            error = result.error if not result.ok else None
+            if error is None and value is None:
+                error = NotFound(f"No {what} with id {id}")
+            by_id[id] = BatchItem(id, value, error, result.elapsed)
+    return [by_id.get(id) or BatchItem(id, error=NotFound(f"No {what} with id {id}")) for id in ids]
@@ -0,0 +1,349 @@
+"""Local stand-ins for setlist.fm, the Spotify Web API and the chat model.
+
+StubAPIServer serves deterministic synthetic payloads shaped like the real
+APIs (including Spotify's bulky available_markets and image lists) with a
+configurable network latency. ScriptedChatCompletion is a Semantic Kernel
+chat service that answers from a script of tool calls, with latency that
+grows with prompt size like a real model's. Together they let benchmark.py
+run full agent turns without network access or API keys, and
+StubAgentTestCase wires them to a SetlistFMAgent for the tests.
+"""
+import asyncio
+import hashlib
+import json
+import re
+import threading
+import time
+import unittest
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, ClassVar, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from spotipy.cache_handler import MemoryCacheHandler
+from spotify_token import SpotifyTokenProvider
+from semantic_kernel.connectors.ai.chat_completion_client_base import ChatCompletionClientBase
+from semantic_kernel.contents import (AuthorRole, ChatMessageContent, FunctionCallContent, FunctionResultContent,
+                                     StreamingChatMessageContent, StreamingTextContent, TextContent)
+
+from setlist_agent import SetlistFMAgent, SetlistFMPlugin
+from setlist_async_client import AsyncSetlistFMClient
+
+MARKETS = ["AD", "AE", "AR", "AT", "AU", "BE", "BG", "BO", "BR", "CA", "CH", "CL", "CO", "CR", "CY", "CZ", "DE",
+           "DK", "DO", "EC", "EE", "ES", "FI", "FR", "GB", "GR", "GT", "HK", "HN", "HU", "ID", "IE", "IL", "IS",
+           "IT", "JP", "LI", "LT", "LU", "LV", "MC", "MT", "MX", "MY", "NI", "NL", "NO", "NZ", "PA", "PE", "PH",
+           "PL", "PT", "PY", "RO", "SE", "SG", "SK", "SV", "TH", "TR", "TW", "US", "UY", "VN", "ZA"]
+SONGS = ["Uprising", "Hysteria", "Plug In Baby", "Starlight", "Madness", "Supermassive Black Hole", "Psycho",
+         "Time Is Running Out", "Knights of Cydonia", "Stockholm Syndrome", "New Born", "Resistance",
+         "Undisclosed Desires", "Dig Down", "Thought Contagion", "Pressure", "Bliss", "Citizen Erased",
+         "Map of the Problematique", "Sunburn", "Feeling Good", "Hyper Music", "Dead Inside", "Butterflies and Hurricanes"]
+CITIES = [("London", "GB", "United Kingdom"), ("Paris", "FR", "France"), ("New York", "US", "United States"),
+          ("Berlin", "DE", "Germany"), ("Tokyo", "JP", "Japan"), ("Madrid", "ES", "Spain")]
+
+
+def _seed(*parts: Any) -> int:
+    return int(hashlib.md5("|".join(map(str, parts)).encode()).hexdigest()[:8], 16)
+
+
+def make_artist(name: str) -> Dict[str, Any]:
+    mbid = str(uuid.UUID(int=_seed("artist", name.lower()) << 96 | 0x4000_8000_0000_0000))
+    return {"mbid": mbid, "name": name, "sortName": name, "disambiguation": "",
+            "url": f"https://www.setlist.fm/setlists/{name.lower().replace(' ', '-')}.html"}
+
+
+def make_venue(index: int) -> Dict[str, Any]:
+    city, code, country = CITIES[index % len(CITIES)]
+    return {"id": f"v{index:06x}", "name": f"{city} Arena {index % 7}",
+            "url": f"https://www.setlist.fm/venue/v{index:06x}.html",
+            "city": {"id": str(1000 + index % len(CITIES)), "name": city, "state": "", "stateCode": "",
+                     "coords": {"lat": 40.0 + index % 10, "long": -3.0 + index % 10},
+                     "country": {"code": code, "name": country}}}
+
+
+def make_setlist(artist: Dict[str, Any], index: int) -> Dict[str, Any]:
+    seed = _seed(artist["mbid"], index)
+    count = 14 + seed % 8
+    start = seed % len(SONGS)
+    songs = [{"name": SONGS[(start + i * 5) % len(SONGS)]} for i in range(count)]
+    day = 28 - index % 28
+    month = 12 - (index // 28) % 12
+    year = 2024 - index // (28 * 12)
+    return {"id": f"{seed:08x}", "versionId": f"7{seed % 0xffffff:06x}", "eventDate": f"{day:02d}-{month:02d}-{year}",
+            "lastUpdated": f"{year}-{month:02d}-{day:02d}T23:00:00.000+0000", "artist": artist,
+            "venue": make_venue(seed % 500), "tour": {"name": "Will of the People"},
+            "sets": {"set": [{"song": songs[:-3]}, {"encore": 1, "song": songs[-3:]}]},
+            "url": f"https://www.setlist.fm/setlist/{seed:08x}.html"}
+
+
+def setlist_page(artist: Dict[str, Any], page: int, total: int = 240, per_page: int = 20) -> Dict[str, Any]:
+    items = [make_setlist(artist, i) for i in range((page - 1) * per_page, min(page * per_page, total))]
+    return {"type": "setlists", "itemsPerPage": per_page, "page": page, "total": total, "setlist": items}
+
+
+def make_spotify_artist(artist_id: str) -> Dict[str, Any]:
+    return {"id": artist_id, "name": f"Artist {artist_id[:6]}", "type": "artist", "uri": f"spotify:artist:{artist_id}",
+            "popularity": _seed(artist_id) % 100, "genres": ["alternative rock", "rock"],
+            "followers": {"href": None, "total": _seed(artist_id) % 10_000_000},
+            "external_urls": {"spotify": f"https://open.spotify.com/artist/{artist_id}"},
+            "href": f"https://api.spotify.com/v1/artists/{artist_id}",
+            "images": [{"url": f"https://i.scdn.co/image/{artist_id}{size}", "height": size, "width": size}
+                       for size in (640, 320, 160)]}
+
+
+def make_spotify_album(album_id: str, with_tracks: bool = True) -> Dict[str, Any]:
+    artist = make_spotify_artist(f"ar{album_id[:20]}")
+    album = {"id": album_id, "name": f"Album {album_id[:6]}", "type": "album", "album_type": "album",
+             "uri": f"spotify:album:{album_id}", "release_date": "2022-08-26", "release_date_precision": "day",
+             "total_tracks": 10, "available_markets": MARKETS,
+             "artists": [{k: artist[k] for k in ("id", "name", "type", "uri", "href", "external_urls")}],
+             "external_urls": {"spotify": f"https://open.spotify.com/album/{album_id}"},
+             "href": f"https://api.spotify.com/v1/albums/{album_id}", "images": artist["images"]}
+    if with_tracks:
+        album["tracks"] = {"items": [make_spotify_track(f"{album_id[:14]}t{i:02d}", album=False) for i in range(10)],
+                           "total": 10, "limit": 50, "offset": 0}
+    return album
+
+
+def make_spotify_track(track_id: str, album: bool = True, name: Optional[str] = None) -> Dict[str, Any]:
+    track = {"id": track_id, "name": name or SONGS[_seed(track_id) % len(SONGS)], "type": "track",
+             "uri": f"spotify:track:{track_id}", "duration_ms": 180_000 + _seed(track_id) % 120_000,
+             "explicit": False, "popularity": _seed(track_id) % 100, "track_number": 1 + _seed(track_id) % 12,
+             "disc_number": 1, "available_markets": MARKETS, "preview_url": None, "is_local": False,
+             "external_ids": {"isrc": f"GB{_seed(track_id) % 10**10:010d}"},
+             "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+             "href": f"https://api.spotify.com/v1/tracks/{track_id}",
+             "artists": [{"id": "ar" + track_id[:20], "name": f"Artist {track_id[:4]}", "type": "artist"}]}
+    if album:
+        track["album"] = make_spotify_album(f"al{track_id[:20]}", with_tracks=False)
+    return track
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; without this, Nagle plus
+    # delayed ACKs add ~40 ms to every keep-alive response
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        self.rfile.read(length)
+        self.server.requests += 1
+        time.sleep(self.server.latency)
+        self._send(200, {"access_token": "stub-token", "token_type": "Bearer", "expires_in": 3600})
+
+    def do_HEAD(self):
+        self.server.requests += 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.latency)
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        status, payload = route(parts.path, query)
+        self._send(status, payload)
+
+
+def route(path: str, query: Dict[str, str]) -> Tuple[int, Any]:
+    page = int(query.get("p", 1))
+    rules = [
+        (r"/rest/1.0/search/artists", lambda: {"type": "artists", "itemsPerPage": 30, "page": page, "total": 3,
+                                               "artist": [make_artist(query.get("artistName", "Muse"))] +
+                                               [make_artist(f"{query.get('artistName', 'Muse')} Tribute {i}") for i in (1, 2)]}),
+        (r"/rest/1.0/search/setlists", lambda: setlist_page(make_artist(query.get("artistName", "Various")), page)),
+        (r"/rest/1.0/artist/([^/]+)/setlists", lambda m: setlist_page(
+            dict(make_artist("Muse"), mbid=m.group(1)), page)),
+        (r"/rest/1.0/artist/([^/]+)", lambda m: dict(make_artist("Muse"), mbid=m.group(1))),
+        (r"/rest/1.0/setlist/([^/]+)", lambda m: dict(make_setlist(make_artist("Muse"), _seed(m.group(1)) % 240),
+                                                       id=m.group(1))),
+        (r"/rest/1.0/venue/([^/]+)/setlists", lambda m: setlist_page(make_artist("Muse"), page)),
+        (r"/rest/1.0/venue/([^/]+)", lambda m: dict(make_venue(_seed(m.group(1)) % 500), id=m.group(1))),
+        (r"/v1/search", lambda: _spotify_search(query)),
+        (r"/v1/artists/([^/]+)/albums", lambda m: {"items": [make_spotify_album(f"{m.group(1)[:10]}{i:02d}", False)
+                                                             for i in range(int(query.get("limit", 10)))],
+                                                   "total": 25, "limit": int(query.get("limit", 10))}),
+        (r"/v1/artists/([^/]+)", lambda m: make_spotify_artist(m.group(1))),
+        (r"/v1/artists/?", lambda: {"artists": [make_spotify_artist(i) for i in query["ids"].split(",")]}),
+        (r"/v1/albums/([^/]+)", lambda m: make_spotify_album(m.group(1))),
+        (r"/v1/albums/?", lambda: {"albums": [make_spotify_album(i) for i in query["ids"].split(",")]}),
+        (r"/v1/tracks/([^/]+)", lambda m: make_spotify_track(m.group(1))),
+        (r"/v1/tracks/?", lambda: {"tracks": [make_spotify_track(i) for i in query["ids"].split(",")]}),
+    ]
+    for pattern, build in rules:
+        match = re.fullmatch(pattern, path)
+        if match:
+            return 200, build(match) if match.groups() else build()
+    return 404, {"code": 404, "status": "Not Found", "message": f"unknown path {path}"}
+
+
+def _spotify_search(query: Dict[str, str]) -> Dict[str, Any]:
+    limit = int(query.get("limit", 10))
+    term = query.get("q", "").split(":", 1)[-1]
+    if query.get("type") == "artist":
+        items = [dict(make_spotify_artist(f"{_seed(term, i):022x}"[:22]), name=term if i == 0 else f"{term} {i}")
+                 for i in range(limit)]
+        return {"artists": {"items": items, "total": limit, "limit": limit, "offset": 0}}
+    items = [make_spotify_track(f"{_seed(term, i):022x}"[:22], name=term if i == 0 else f"{term} (Live {i})")
+             for i in range(limit)]
+    return {"tracks": {"items": items, "total": limit, "limit": limit, "offset": 0}}
+
+
+class StubAPIServer:
+    """Threaded local HTTP server answering setlist.fm and Spotify routes."""
+
+    def __init__(self, latency: float = 0.02):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.latency = latency
+        self.httpd.requests = 0
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_port}"
+
+    @property
+    def setlistfm_url(self) -> str:
+        return f"{self.url}/rest/1.0"
+
+    @property
+    def requests(self) -> int:
+        return self.httpd.requests
+
+    def point_spotify(self, sp) -> None:
+        """Redirect a spotipy.Spotify instance (and its credentials manager) or an AsyncSpotifyClient to the stub."""
+        if hasattr(sp, "API_URL"):
+            sp.API_URL = f"{self.url}/v1/"
+            sp.TOKEN_URL = f"{self.url}/api/token"
+            if sp.token_provider is not None:
+                sp.token_provider.token_url = f"{self.url}/api/token"
+            return
+        sp.prefix = f"{self.url}/v1/"
+        if isinstance(sp.auth_manager, SpotifyTokenProvider):
+            sp.auth_manager.token_url = f"{self.url}/api/token"
+            return
+        sp.auth_manager.OAUTH_TOKEN_URL = f"{self.url}/api/token"
+        sp.auth_manager.cache_handler = MemoryCacheHandler()
+
+    def __enter__(self) -> "StubAPIServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+# (pattern on the user message, plugin, function, arguments built from the match groups)
+DEFAULT_SCRIPT: List[Tuple[str, str, str, Dict[str, str]]] = [
+    (r"setlists for (?P<artist_name>.+?) in (?P<city_name>.+)", "SetlistFM", "search_setlists", {}),
+    (r"songs does (?P<artist_name>.+?) play", "SetlistFM", "get_song_statistics", {}),
+    (r"setlist (?P<setlist_id>[0-9a-f]{8})", "SetlistFM", "get_setlist", {}),
+    (r"venue (?P<venue_id>v[0-9a-f]+)", "SetlistFM", "get_venue", {}),
+    (r"about the artist (?P<artist_name>.+)", "SetlistFM", "search_artists", {}),
+]
+
+
+class ScriptedChatCompletion(ChatCompletionClientBase):
+    """Chat service replying from a script instead of a model.
+
+    A user message is answered with one tool call per script match, all in
+    the same step (so "setlist a and setlist b" asks for both at once);
+    once tool results are in the history the service answers with a short
+    text. Each request waits latency + latency_per_1k_chars * prompt size
+    before its first token and latency_per_token for each further word;
+    prompt sizes are recorded so prompt growth can be observed. Streaming
+    requests yield the answer word by word.
+    """
+
+    SUPPORTS_FUNCTION_CALLING: ClassVar[bool] = True
+    script: List[Tuple[str, str, str, Dict[str, str]]] = DEFAULT_SCRIPT
+    latency: float = 0.05
+    latency_per_1k_chars: float = 0.002
+    latency_per_token: float = 0.001
+    prompt_sizes: List[int] = []
+
+    def __init__(self, service_id: str = "Agent", **kwargs: Any):
+        super().__init__(service_id=service_id, ai_model_id="scripted", **kwargs)
+        self.prompt_sizes = []
+
+    def _plan(self, chat_history) -> ChatMessageContent:
+        last = chat_history.messages[-1]
+        if last.role == AuthorRole.USER:
+            calls = [FunctionCallContent(id=f"call_{uuid.uuid4().hex[:12]}", plugin_name=plugin,
+                                         function_name=function, arguments=json.dumps(dict(match.groupdict(), **extra)))
+                     for pattern, plugin, function, extra in self.script
+                     for match in re.finditer(pattern, last.content, re.IGNORECASE)]
+            if calls:
+                return ChatMessageContent(role=AuthorRole.ASSISTANT, items=calls, ai_model_id="scripted")
+            answer = "I can only help with artists, concerts and setlists."
+        else:
+            results = " ".join(str(item.result) for item in last.items if isinstance(item, FunctionResultContent))
+            answer = f"Here is what I found: {results[:200]}"
+        return ChatMessageContent(role=AuthorRole.ASSISTANT, items=[TextContent(text=answer)], ai_model_id="scripted")
+
+    async def _first_token(self, chat_history) -> None:
+        prompt_chars = sum(len(str(m.content or "")) + sum(len(str(getattr(i, "result", "") or "")) for i in m.items)
+                           for m in chat_history.messages)
+        self.prompt_sizes.append(prompt_chars)
+        await asyncio.sleep(self.latency + self.latency_per_1k_chars * prompt_chars / 1000)
+
+    async def _inner_get_chat_message_contents(self, chat_history, settings) -> List[ChatMessageContent]:
+        await self._first_token(chat_history)
+        message = self._plan(chat_history)
+        await asyncio.sleep(self.latency_per_token * len(re.findall(r"\S+", message.content or "")))
+        return [message]
+
+    async def _inner_get_streaming_chat_message_contents(self, chat_history, settings,
+                                                         function_invoke_attempt: int = 0):
+        await self._first_token(chat_history)
+        message = self._plan(chat_history)
+        calls = [item for item in message.items if isinstance(item, FunctionCallContent)]
+        if calls:
+            yield [StreamingChatMessageContent(role=AuthorRole.ASSISTANT, choice_index=0, items=calls,
+                                               ai_model_id="scripted", function_invoke_attempt=function_invoke_attempt)]
+            return
+        for i, word in enumerate(re.findall(r"\S+\s*", message.content)):
+            if i:
+                await asyncio.sleep(self.latency_per_token)
+            yield [StreamingChatMessageContent(role=AuthorRole.ASSISTANT, choice_index=0, ai_model_id="scripted",
+                                               items=[StreamingTextContent(choice_index=0, text=word)],
+                                               function_invoke_attempt=function_invoke_attempt)]
+
+
+class StubAgentTestCase(unittest.IsolatedAsyncioTestCase):
+    """Test case with a StubAPIServer, a setlist.fm client on it and an agent on ScriptedChatCompletion.
+
+    stub_client and stub_agent set self.stub, self.client (and self.plugin,
+    self.service); the server and the connection pool are closed by the
+    test's cleanups.
+    """
+
+    def stub_client(self, latency: float = 0.01, **client_kwargs: Any) -> AsyncSetlistFMClient:
+        """AsyncSetlistFMClient (uncached, unthrottled) talking to a fresh StubAPIServer."""
+        self.stub = self.enterContext(StubAPIServer(latency=latency))
+        self.client = AsyncSetlistFMClient("key", **{"cache_size": 0, "rate_limit": None, **client_kwargs})
+        self.client.BASE_URL = self.stub.setlistfm_url
+        self.addAsyncCleanup(self.client.close)
+        return self.client
+
+    def stub_agent(self, latency: float = 0.01, model_latency: float = 0.02,
+                   client_kwargs: Optional[Dict[str, Any]] = None, **agent_kwargs: Any) -> SetlistFMAgent:
+        """SetlistFMAgent on stub_client(latency) and a ScriptedChatCompletion; agent_kwargs go to the agent."""
+        self.stub_client(latency, **(client_kwargs or {}))
+        self.plugin = SetlistFMPlugin("key", client=self.client)
+        self.service = ScriptedChatCompletion(latency=model_latency)
+        return SetlistFMAgent("key", service=self.service, setlist_plugin=self.plugin, **agent_kwargs)
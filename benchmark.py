@@ -0,0 +1,399 @@
+"""Benchmark suite for the setlist.fm / Spotify clients, plugins and agent turns.
+
+Everything runs against bench_stubs: a local HTTP server standing in for
+setlist.fm and Spotify, and a scripted chat service standing in for the
+model. Each scenario reports p50/p95/p99 latency of sequential calls,
+throughput with --users concurrent callers, and peak traced memory of one
+round of concurrent calls.
+Results are written as JSON so runs can be compared:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+import numpy as np
+
+from agent_pool import AgentPool
+from answer_cache import AnswerCache
+from bench_stubs import ScriptedChatCompletion, StubAPIServer, make_artist
+from fast_path import FastPathRouter
+from setlist_agent import SetlistFMAgent, SetlistFMPlugin
+from setlist_async_client import AsyncSetlistFMClient
+from setlist_client import SetlistFMClient
+from spotify_async_client import AsyncSpotifyClient
+from spotify_client import SpotifyClient
+from spotify_plugin import SpotifyPlugin
+from tool_output import SPOTIFY_PROJECTIONS, ToolOutput
+
+API_KEY = "benchmark-key"
+MBID = make_artist("Muse")["mbid"]
+QUESTIONS = [
+    "Find setlists for Radiohead in London",
+    "What songs does Muse play most?",
+    "Tell me about the artist Adele",
+    "Show me setlist 63de4613",
+]
+# the scripted model asks for all three setlists in one step
+PARALLEL_QUESTION = "Compare setlist 63de4613 with setlist 7bd6aa0c and setlist 2bd6a8e2"
+# questions both the scripted model and the fast path understand
+SIMPLE_QUESTIONS = [
+    "Find setlists for Radiohead in London",
+    "Tell me about venue v0001f4",
+]
+
+
+def summarize(name: str, group: str, latencies: List[float], concurrency: int, concurrent_elapsed: float,
+              concurrent_calls: int, peak_memory: int, **extra: Any) -> Dict[str, Any]:
+    ms = np.asarray(latencies) * 1000
+    return dict({
+        "name": name,
+        "group": group,
+        "calls": len(latencies),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+        "p99_ms": round(float(np.percentile(ms, 99)), 2),
+        "mean_ms": round(float(ms.mean()), 2),
+        "concurrency": concurrency,
+        "throughput_rps": round(concurrent_calls / concurrent_elapsed, 1) if concurrent_elapsed else 0.0,
+        "peak_memory_kb": round(peak_memory / 1024, 1),
+    }, **extra)
+
+
+class Benchmark:
+    def __init__(self, iterations: int, users: int, only: Optional[str] = None):
+        self.iterations = iterations
+        self.users = users
+        self.only = only
+        self.results: List[Dict[str, Any]] = []
+
+    def selected(self, name: str) -> bool:
+        return self.only is None or self.only in name
+
+    def record(self, result: Dict[str, Any]) -> None:
+        self.results.append(result)
+        print(f"{result['name']:<45} p50 {result['p50_ms']:>8.2f} ms  p95 {result['p95_ms']:>8.2f} ms  "
+              f"p99 {result['p99_ms']:>8.2f} ms  {result['throughput_rps']:>8.1f} req/s @{result['concurrency']}  "
+              f"peak {result['peak_memory_kb']:>9.1f} KB")
+
+    def run_sync(self, name: str, group: str, call: Callable[[int], Any], warmup: int = 1, **extra: Any) -> None:
+        if not self.selected(name):
+            return
+        for i in range(warmup):
+            call(i)  # warm up connections (and caches, with warmup = number of keys)
+        latencies = []
+        for i in range(self.iterations):
+            start = time.perf_counter()
+            call(i)
+            latencies.append(time.perf_counter() - start)
+
+        calls = self.iterations * self.users
+        with ThreadPoolExecutor(max_workers=self.users) as pool:
+            start = time.perf_counter()
+            list(pool.map(call, range(calls)))
+            elapsed = time.perf_counter() - start
+            # tracing slows everything down, so memory gets its own pass
+            tracemalloc.start()
+            list(pool.map(call, range(self.users)))
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.record(summarize(name, group, latencies, self.users, elapsed, calls, peak, **extra))
+
+    async def run_async(self, name: str, group: str, call: Callable[[int], Awaitable[Any]], **extra: Any) -> None:
+        if not self.selected(name):
+            return
+        output = await call(0)
+        latencies = []
+        for i in range(self.iterations):
+            start = time.perf_counter()
+            await call(i)
+            latencies.append(time.perf_counter() - start)
+        if isinstance(output, str):
+            extra.setdefault("output_bytes", len(output.encode()))
+
+        calls = self.iterations * self.users
+        semaphore = asyncio.Semaphore(self.users)
+
+        async def bounded(i):
+            async with semaphore:
+                return await call(i)
+
+        start = time.perf_counter()
+        await asyncio.gather(*[bounded(i) for i in range(calls)])
+        elapsed = time.perf_counter() - start
+        tracemalloc.start()
+        await asyncio.gather(*[call(i) for i in range(self.users)])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.record(summarize(name, group, latencies, self.users, elapsed, calls, peak, **extra))
+
+
+async def bench_async_clients(bench: Benchmark, stub: StubAPIServer) -> None:
+    async with AsyncSetlistFMClient(API_KEY, cache_size=0, rate_limit=None, pool_size=bench.users) as client:
+        client.BASE_URL = stub.setlistfm_url
+        await bench.run_async("AsyncSetlistFMClient.get_setlist", "client", lambda i: client.get_setlist(f"{i:08x}"))
+        await bench.run_async("AsyncSetlistFMClient.search_setlists", "client",
+                              lambda i: client.search_setlists(artist_name="Muse", page=1 + i % 5))
+    async with AsyncSpotifyClient("benchmark-id", "benchmark-secret", pool_size=bench.users) as spotify:
+        stub.point_spotify(spotify)
+        await bench.run_async("AsyncSpotifyClient.search_artist", "client", lambda i: spotify.search_artist("Muse"))
+        await bench.run_async("AsyncSpotifyClient.get_artist", "client",
+                              lambda i: spotify.get_artist("12Chz98pHFMPJEknJQMWvI"))
+        await bench.run_async("AsyncSpotifyClient.get_artist_albums", "client",
+                              lambda i: spotify.get_artist_albums("12Chz98pHFMPJEknJQMWvI"))
+        await bench.run_async("AsyncSpotifyClient.get_album", "client", lambda i: spotify.get_album("0eFHYz8NmK75zSplL5qlfM"))
+        await bench.run_async("AsyncSpotifyClient.get_track", "client", lambda i: spotify.get_track("7ouMYWpwJ422jRcDASZB7P"))
+        await bench.run_async("AsyncSpotifyClient.search_track", "client", lambda i: spotify.search_track("Uprising"))
+
+
+def bench_clients(bench: Benchmark, stub: StubAPIServer) -> None:
+    client = SetlistFMClient(API_KEY, cache_size=0, rate_limit=None, pool_size=bench.users)
+    client.BASE_URL = stub.setlistfm_url
+    bench.run_sync("SetlistFMClient.get_artist", "client", lambda i: client.get_artist(MBID))
+    bench.run_sync("SetlistFMClient.get_artist_setlists", "client", lambda i: client.get_artist_setlists(MBID, page=1 + i % 5))
+    bench.run_sync("SetlistFMClient.search_artists", "client", lambda i: client.search_artists("Muse"))
+    bench.run_sync("SetlistFMClient.search_setlists", "client", lambda i: client.search_setlists(artist_name="Muse", page=1 + i % 5))
+    bench.run_sync("SetlistFMClient.get_setlist", "client", lambda i: client.get_setlist(f"{i:08x}"))
+    bench.run_sync("SetlistFMClient.get_venue", "client", lambda i: client.get_venue(f"v{i:06x}"))
+    bench.run_sync("SetlistFMClient.get_venue_setlists", "client", lambda i: client.get_venue_setlists("v000001", page=1 + i % 5))
+
+    cached = SetlistFMClient(API_KEY, rate_limit=None, pool_size=bench.users)
+    cached.BASE_URL = stub.setlistfm_url
+    # every key the timed loop reads is cached before timing starts
+    bench.run_sync("SetlistFMClient.get_setlist[cached]", "client", lambda i: cached.get_setlist(f"{i % 3:08x}"),
+                   warmup=3)
+
+    spotify = SpotifyClient("benchmark-id", "benchmark-secret")
+    stub.point_spotify(spotify.sp)
+    bench.run_sync("SpotifyClient.search_artist", "client", lambda i: spotify.search_artist("Muse"))
+    bench.run_sync("SpotifyClient.get_artist", "client", lambda i: spotify.get_artist("12Chz98pHFMPJEknJQMWvI"))
+    bench.run_sync("SpotifyClient.get_artist_albums", "client", lambda i: spotify.get_artist_albums("12Chz98pHFMPJEknJQMWvI"))
+    bench.run_sync("SpotifyClient.get_album", "client", lambda i: spotify.get_album("0eFHYz8NmK75zSplL5qlfM"))
+    bench.run_sync("SpotifyClient.get_track", "client", lambda i: spotify.get_track("7ouMYWpwJ422jRcDASZB7P"))
+    bench.run_sync("SpotifyClient.search_track", "client", lambda i: spotify.search_track("Uprising"))
+    track_ids = [f"{j:022x}" for j in range(100)]
+    bench.run_sync("SpotifyClient.get_tracks[100 ids]", "client", lambda i: spotify.get_tracks(track_ids))
+    bench.run_sync("SpotifyClient.get_albums[40 ids]", "client", lambda i: spotify.get_albums(track_ids[:40]))
+
+
+async def bench_plugins(bench: Benchmark, stub: StubAPIServer, output: ToolOutput) -> None:
+    client = AsyncSetlistFMClient(API_KEY, cache_size=0, rate_limit=None, pool_size=bench.users)
+    client.BASE_URL = stub.setlistfm_url
+    plugin = SetlistFMPlugin(API_KEY, client=client, output=output)
+    await bench.run_async("SetlistFMPlugin.search_artists", "plugin", lambda i: plugin.search_artists("Muse"))
+    await bench.run_async("SetlistFMPlugin.search_setlists", "plugin",
+                          lambda i: plugin.search_setlists(artist_name="Muse", city_name="London"))
+    await bench.run_async("SetlistFMPlugin.get_setlist", "plugin", lambda i: plugin.get_setlist(f"{i:08x}"))
+    await bench.run_async("SetlistFMPlugin.get_venue", "plugin", lambda i: plugin.get_venue(f"v{i:06x}"))
+    await bench.run_async("SetlistFMPlugin.get_song_statistics", "plugin",
+                          lambda i: plugin.get_song_statistics("Muse", max_shows=100))
+    await bench.run_async("SetlistFMPlugin.get_song_details", "plugin",
+                          lambda i: plugin.get_song_details("Muse", "Uprising", max_shows=100))
+    await plugin.close()
+
+    spotify_client = AsyncSpotifyClient("benchmark-id", "benchmark-secret", pool_size=bench.users)
+    stub.point_spotify(spotify_client)
+    spotify = SpotifyPlugin("benchmark-id", "benchmark-secret", client=spotify_client, output=ToolOutput(
+        compact=output.compact, max_bytes=output.max_bytes, projections=SPOTIFY_PROJECTIONS))
+    await bench.run_async("SpotifyPlugin.search_artist", "plugin", lambda i: spotify.search_artist("Muse"))
+    await bench.run_async("SpotifyPlugin.get_artist", "plugin", lambda i: spotify.get_artist("12Chz98pHFMPJEknJQMWvI"))
+    await bench.run_async("SpotifyPlugin.get_artist_albums", "plugin",
+                          lambda i: spotify.get_artist_albums("12Chz98pHFMPJEknJQMWvI"))
+    await bench.run_async("SpotifyPlugin.get_album", "plugin", lambda i: spotify.get_album("0eFHYz8NmK75zSplL5qlfM"))
+    await bench.run_async("SpotifyPlugin.get_track", "plugin", lambda i: spotify.get_track("7ouMYWpwJ422jRcDASZB7P"))
+    await bench.run_async("SpotifyPlugin.search_track", "plugin", lambda i: spotify.search_track("Uprising"))
+    await spotify.close()
+
+
+async def bench_agent(bench: Benchmark, stub: StubAPIServer, model_latency: float, output: ToolOutput) -> None:
+    client = AsyncSetlistFMClient(API_KEY, cache_size=0, rate_limit=None, pool_size=bench.users)
+    client.BASE_URL = stub.setlistfm_url
+    plugin = SetlistFMPlugin(API_KEY, client=client, output=output)
+    services: List[ScriptedChatCompletion] = []
+    agents: Dict[int, SetlistFMAgent] = {}
+
+    def agent_for(user: int) -> SetlistFMAgent:
+        # one agent (conversation) per simulated user, sharing the plugin and its pool
+        if user not in agents:
+            service = ScriptedChatCompletion(latency=model_latency)
+            services.append(service)
+            agents[user] = SetlistFMAgent(API_KEY, service=service, setlist_plugin=plugin)
+        return agents[user]
+
+    def turn(questions: List[str]) -> Callable[[int], Awaitable[str]]:
+        async def ask(i: int) -> str:
+            agent = agent_for(i % bench.users)
+            agent.thread = None  # single-turn conversations keep the prompt size stable
+            return await agent.chat(questions[i % len(questions)])
+        return ask
+
+    for name, questions in (("SetlistFMAgent.chat", QUESTIONS),
+                            ("SetlistFMAgent.chat[3 parallel tool calls]", [PARALLEL_QUESTION])):
+        for service in services:
+            service.prompt_sizes.clear()
+        count = len(bench.results)
+        await bench.run_async(name, "agent", turn(questions))
+        prompt_sizes = [size for service in services for size in service.prompt_sizes]
+        if len(bench.results) > count and prompt_sizes:
+            bench.results[-1]["mean_prompt_chars"] = round(float(np.mean(prompt_sizes)), 1)
+
+    # long conversations: prompt size per turn with and without a history budget
+    turns = 10
+    for label, history_max_tokens in (("unbounded history", 0), ("history 1000 tokens", 1000)):
+        long_agents: Dict[int, SetlistFMAgent] = {}
+        long_services: List[ScriptedChatCompletion] = []
+
+        async def converse(i: int, long_agents=long_agents, long_services=long_services,
+                           history_max_tokens=history_max_tokens) -> str:
+            user = i % bench.users
+            if user not in long_agents:
+                service = ScriptedChatCompletion(latency=model_latency)
+                long_services.append(service)
+                long_agents[user] = SetlistFMAgent(API_KEY, service=service, setlist_plugin=plugin,
+                                                   history_max_tokens=history_max_tokens)
+            agent = long_agents[user]
+            if len(agent.conversation.prompt_tokens) >= turns:
+                agent.thread = None
+            return await agent.chat(QUESTIONS[i % len(QUESTIONS)])
+
+        count = len(bench.results)
+        await bench.run_async(f"SetlistFMAgent.chat[{turns}-turn, {label}]", "agent", converse)
+        prompt_sizes = [size for service in long_services for size in service.prompt_sizes]
+        if len(bench.results) > count and prompt_sizes:
+            bench.results[-1]["mean_prompt_chars"] = round(float(np.mean(prompt_sizes)), 1)
+            print(f"{'':<45} mean prompt {bench.results[-1]['mean_prompt_chars']:>10.1f} chars")
+
+    # popular first questions: every call is a new conversation asking one of QUESTIONS again
+    cached_agent = SetlistFMAgent(API_KEY, service=ScriptedChatCompletion(latency=model_latency),
+                                  setlist_plugin=plugin, answer_cache=AnswerCache())
+
+    async def ask_again(i: int) -> str:
+        return await cached_agent.chat(QUESTIONS[i % len(QUESTIONS)], conversation=cached_agent.new_conversation())
+
+    if bench.selected("SetlistFMAgent.chat[answer cache]"):
+        for i in range(len(QUESTIONS)):
+            await ask_again(i)
+    await bench.run_async("SetlistFMAgent.chat[answer cache]", "agent", ask_again)
+
+    # simple questions through the model versus the deterministic fast path
+    for name, fast_path in (("SetlistFMAgent.chat[simple questions]", None),
+                            ("SetlistFMAgent.chat[simple questions, fast path]", FastPathRouter(client))):
+        simple_agent = SetlistFMAgent(API_KEY, service=ScriptedChatCompletion(latency=model_latency),
+                                      setlist_plugin=plugin, fast_path=fast_path)
+
+        async def ask_simple(i: int, simple_agent=simple_agent) -> str:
+            return await simple_agent.chat(SIMPLE_QUESTIONS[i % len(SIMPLE_QUESTIONS)],
+                                           conversation=simple_agent.new_conversation())
+
+        await bench.run_async(name, "agent", ask_simple)
+
+    # time to first token is what a user of the streaming UI waits for
+    first_tokens: List[float] = []
+
+    async def stream(i: int) -> str:
+        agent = agent_for(i % bench.users)
+        agent.thread = None
+        async for event in agent.chat_stream(QUESTIONS[i % len(QUESTIONS)]):
+            if event.kind == "done":
+                if event.ttft is not None:
+                    first_tokens.append(event.ttft)
+                return event.text
+        return ""
+
+    count = len(bench.results)
+    await bench.run_async("SetlistFMAgent.chat_stream", "agent", stream)
+    if len(bench.results) > count and first_tokens:
+        ms = np.asarray(first_tokens) * 1000
+        bench.results[-1].update(ttft_p50_ms=round(float(np.percentile(ms, 50)), 2),
+                                 ttft_p95_ms=round(float(np.percentile(ms, 95)), 2))
+        print(f"{'':<45} time to first token p50 {bench.results[-1]['ttft_p50_ms']:>8.2f} ms  "
+              f"p95 {bench.results[-1]['ttft_p95_ms']:>8.2f} ms")
+
+    # what a model switch costs: building an agent versus taking it from the pool
+    bench.run_sync("SetlistFMAgent()", "agent", lambda i: SetlistFMAgent(
+        API_KEY, service=ScriptedChatCompletion(latency=model_latency), setlist_plugin=plugin))
+    pool = AgentPool(API_KEY, service_factory=lambda model: ScriptedChatCompletion(latency=model_latency),
+                     setlist_plugin=plugin)
+    models = ["gpt-4o", "gpt-4o-mini"]
+    for model in models:
+        pool.get(model)
+    bench.run_sync("AgentPool.get", "agent", lambda i: pool.get(models[i % len(models)]))
+    await plugin.close()
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str) -> None:
+    with open(baseline_path) as f:
+        baseline = {r["name"]: r for r in json.load(f)["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        before = baseline.get(result["name"])
+        if before is None:
+            continue
+        change = (result["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+        print(f"{result['name']:<45} p50 {before['p50_ms']:>8.2f} -> {result['p50_ms']:>8.2f} ms ({change:+.1f}%)  "
+              f"throughput {before['throughput_rps']:>8.1f} -> {result['throughput_rps']:>8.1f} req/s")
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=30, help="sequential calls per scenario")
+    parser.add_argument("--users", type=int, default=8, help="concurrent callers for the throughput phase")
+    parser.add_argument("--latency", type=float, default=0.02, help="stub API latency in seconds")
+    parser.add_argument("--model-latency", type=float, default=0.05, help="scripted model base latency in seconds")
+    parser.add_argument("--full-output", action="store_true",
+                        help="render plugin results as full indented JSON instead of compact output")
+    parser.add_argument("--max-output-bytes", type=int, default=None, help="byte budget per compact tool result")
+    parser.add_argument("--groups", default="client,plugin,agent", help="comma separated: client, plugin, agent")
+    parser.add_argument("--only", help="run only scenarios whose name contains this text")
+    parser.add_argument("--output", default="bench_results.json", help="where to write JSON results")
+    parser.add_argument("--compare", help="previous results file to compare against")
+    args = parser.parse_args(argv)
+
+    groups = set(args.groups.split(","))
+    output = ToolOutput(compact=not args.full_output)
+    if args.max_output_bytes is not None:
+        output.max_bytes = args.max_output_bytes
+    bench = Benchmark(args.iterations, args.users, args.only)
+    with StubAPIServer(latency=args.latency) as stub:
+        if "client" in groups:
+            bench_clients(bench, stub)
+            asyncio.run(bench_async_clients(bench, stub))
+        if "plugin" in groups:
+            asyncio.run(bench_plugins(bench, stub, output))
+        if "agent" in groups:
+            asyncio.run(bench_agent(bench, stub, args.model_latency, output))
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "config": vars(args),
+        "results": bench.results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(bench.results)} results to {args.output}")
+    if args.compare:
+        compare(bench.results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""Deterministic answers to simple setlist.fm questions, without the model.
+
+"Last setlist of Muse", "concerts in Berlin" or "venue info for
+6bd6ca6e" need one or two setlist.fm calls and a fixed-format answer, yet
+through the agent they cost at least two model round trips around the
+tool call. FastPathRouter recognises such questions with anchored
+patterns, calls the setlist.fm client itself and renders a templated
+Markdown answer.
+
+It only answers when it is confident: the whole message must match an
+intent, the artist must be found under exactly that name, results must be
+non-empty (and in the asked city). Anything else returns None so the
+caller falls back to the agent. Every decision is logged with its reason,
+and routed answers with the time saved against the running average of
+agent turns.
+"""
+import asyncio
+import logging
+import re
+import time
+from collections import Counter
+from typing import Optional, Dict, Any, List, Callable, Awaitable
+
+from artist_identity import name_key
+from setlist_async_client import AsyncSetlistFMClient
+from setlist_client import SetlistFMClient
+
+logger = logging.getLogger(__name__)
+
+_POLITE = re.compile(r"^(?:(?:hi|hey|hello|please|ok|okay)[,!]?\s+|(?:can|could|would) you\s+)+", re.IGNORECASE)
+_SHOW = r"(?:(?:please\s+)?(?:show|give|tell|find|get|list)(?:\s+me)?\s+)?(?:what\s+(?:was|were|is|are)\s+)?(?:the\s+)?"
+_SHOWS = r"(?:setlists?|concerts?|shows?|gigs?)"
+
+INTENTS = [
+    ("last_setlist", re.compile(
+        rf"^{_SHOW}(?:last|latest|most\s+recent)\s+{_SHOWS}\s+(?:of|by|for|from)\s+(?P<artist>.+)$", re.IGNORECASE)),
+    ("last_setlist", re.compile(
+        rf"^{_SHOW}(?P<artist>.+?)(?:'s|’s)\s+(?:last|latest|most\s+recent)\s+{_SHOWS}$", re.IGNORECASE)),
+    ("city_setlists", re.compile(
+        rf"^{_SHOW}(?:recent\s+)?{_SHOWS}\s+(?:(?:of|by|for|from)\s+(?P<artist>.+?)\s+)?in\s+(?P<city>[^\d,;:!?]+)$",
+        re.IGNORECASE)),
+    ("venue_info", re.compile(
+        rf"^{_SHOW}(?:(?:(?:info(?:rmation)?|details)\s+)?(?:on|about|for|of)\s+(?:the\s+)?venue"
+        rf"|venue(?:\s+(?:info(?:rmation)?|details))?)\s+(?:(?:for|of|about|id)\s+)?(?P<venue_id>[0-9a-z]*\d[0-9a-z]*)$",
+        re.IGNORECASE)),
+]
+
+# words that refer back to the conversation; only the agent can resolve them
+_REFERENCES = {"it", "them", "they", "him", "her", "he", "she", "this band", "that band", "this artist",
+               "that artist", "the band", "the artist", "this venue", "that venue"}
+
+
+def parse(message: str) -> Optional[Dict[str, str]]:
+    """Intent and arguments of a simple question, None if it is not one."""
+    text = _POLITE.sub("", " ".join(str(message).split())).rstrip(" ?.!")
+    for intent, pattern in INTENTS:
+        match = pattern.match(text)
+        if match:
+            arguments = {k: v.strip(" \"'") for k, v in match.groupdict().items() if v}
+            if any(v.casefold() in _REFERENCES for v in arguments.values()):
+                return None
+            return dict(arguments, intent=intent)
+    return None
+
+
+def _place(setlist: Dict[str, Any]) -> str:
+    venue = setlist.get("venue") or {}
+    city = venue.get("city") or {}
+    country = (city.get("country") or {}).get("name")
+    return ", ".join(part for part in (venue.get("name"), city.get("name"), country) if part)
+
+
+def _songs(setlist: Dict[str, Any]) -> List[str]:
+    lines = []
+    for block in (setlist.get("sets") or {}).get("set", []):
+        songs = [s["name"] for s in block.get("song", []) if s.get("name") and not s.get("tape")]
+        if not songs:
+            continue
+        if block.get("encore"):
+            label = "Encore" if block["encore"] == 1 else f"Encore {block['encore']}"
+            # a blank line ends the numbered list
+            lines.append(f"\n**{label}:** " + ", ".join(songs))
+        else:
+            lines.extend(f"{len(lines) + 1}. {song}" for song in songs)
+    return lines
+
+
+class FastPathRouter:
+    """Answers simple setlist.fm questions directly; None means "ask the agent".
+
+    Args:
+        client: setlist.fm client returning JSON (an AsyncSetlistFMClient is awaited)
+        max_items: Setlists listed in a city answer
+    """
+
+    def __init__(self, client: SetlistFMClient, max_items: int = 10):
+        self.client = client
+        self.max_items = max_items
+        self.handlers: Dict[str, Callable[..., Awaitable[Optional[str]]]] = {
+            "last_setlist": self._last_setlist, "city_setlists": self._city_setlists, "venue_info": self._venue_info}
+        self.decisions: Counter = Counter()
+        self.saved = 0.0
+        # running average of agent turns, what a routed question would have cost
+        self.agent_turn = 0.0
+
+    async def _call(self, method: Callable, *args, **kwargs) -> Any:
+        if isinstance(self.client, AsyncSetlistFMClient):
+            return await method(*args, **kwargs)
+        # a blocking SetlistFMClient stays off the event loop
+        return await asyncio.to_thread(method, *args, **kwargs)
+
+    async def answer(self, message: str) -> Optional[str]:
+        """Templated answer to message, or None to fall back to the agent."""
+        start = time.perf_counter()
+        request = parse(message)
+        if request is None:
+            return self._decline("no_intent", message)
+        if getattr(self.client, "typed", False):
+            return self._decline("typed_client", message)
+        intent = request.pop("intent")
+        try:
+            answer = await self.handlers[intent](**request)
+        except Exception as e:
+            logger.warning(f"Fast path {intent} failed, falling back to the agent: {e}")
+            return self._decline(f"{intent}:error", message)
+        if answer is None:
+            return self._decline(f"{intent}:low_confidence", message)
+        elapsed = time.perf_counter() - start
+        saved = max(0.0, self.agent_turn - elapsed)
+        self.saved += saved
+        self.decisions[intent] += 1
+        logger.info(f"Fast path {intent} {request} answered in {elapsed * 1000:.1f} ms "
+                    f"(~{saved * 1000:.0f} ms saved against an agent turn)")
+        return answer
+
+    def _decline(self, reason: str, message: str) -> None:
+        self.decisions[f"agent:{reason}"] += 1
+        logger.info(f"Routing to agent ({reason}): {message}")
+        return None
+
+    def observe_agent_turn(self, elapsed: float) -> None:
+        """Record how long a turn through the agent took."""
+        self.agent_turn = elapsed if not self.agent_turn else 0.8 * self.agent_turn + 0.2 * elapsed
+
+    async def _artist(self, artist: str) -> Optional[Dict[str, Any]]:
+        key = name_key(artist)
+        if not key:
+            return None
+        page = await self._call(self.client.search_artists, artist)
+        matches = [a for a in (page or {}).get("artist", []) if name_key(a.get("name", "")) == key]
+        # an ambiguous name (two artists called the same) is left to the agent
+        return matches[0] if len(matches) == 1 else None
+
+    async def _last_setlist(self, artist: str) -> Optional[str]:
+        found = await self._artist(artist)
+        if found is None:
+            return None
+        setlists = (await self._call(self.client.get_artist_setlists, found["mbid"]) or {}).get("setlist", [])
+        if not setlists:
+            return None
+        # newest first; a show whose songs are not in yet is passed over for the last complete one
+        setlist = next((s for s in setlists if _songs(s)), setlists[0])
+        lines = [f"The last setlist of **{found['name']}** on setlist.fm is from **{setlist.get('eventDate')}** "
+                 f"at {_place(setlist)}" + (f" ({setlist['tour']['name']})" if setlist.get("tour") else "") + "."]
+        songs = _songs(setlist)
+        lines.append("\n".join(songs) if songs else "No songs have been entered for it yet.")
+        if setlist.get("url"):
+            lines.append(f"[Full setlist on setlist.fm]({setlist['url']})")
+        return "\n\n".join(lines)
+
+    async def _city_setlists(self, city: str, artist: Optional[str] = None) -> Optional[str]:
+        key = name_key(city)
+        if not key:
+            return None
+        found = None
+        if artist is not None:
+            found = await self._artist(artist)
+            if found is None:
+                return None
+        page = await self._call(self.client.search_setlists, artist_mbid=found["mbid"] if found else None,
+                                city_name=city)
+        # setlist.fm matches city names loosely; only shows in that very city are listed
+        setlists = [s for s in (page or {}).get("setlist", [])
+                    if name_key(((s.get("venue") or {}).get("city") or {}).get("name", "")) == key]
+        if not setlists:
+            return None
+        city_name = setlists[0]["venue"]["city"]["name"]
+        subject = f"**{found['name']}** setlists in {city_name}" if found else f"Setlists in {city_name}"
+        lines = [f"{subject} on setlist.fm, most recent first:", ""]
+        for setlist in setlists[:self.max_items]:
+            show = (setlist.get("venue") or {}).get("name", "")
+            if not found:
+                show = f"**{(setlist.get('artist') or {}).get('name', '?')}** at {show}"
+            link = f" ([setlist]({setlist['url']}))" if setlist.get("url") else ""
+            lines.append(f"- {setlist.get('eventDate')}: {show}{link}")
+        return "\n".join(lines)
+
+    async def _venue_info(self, venue_id: str) -> Optional[str]:
+        venue = await self._call(self.client.get_venue, venue_id)
+        if not venue or not venue.get("name"):
+            return None
+        city = venue.get("city") or {}
+        place = ", ".join(p for p in (city.get("name"), city.get("state"), (city.get("country") or {}).get("name")) if p)
+        lines = [f"**{venue['name']}**" + (f" is a venue in {place}." if place else ".")]
+        coords = city.get("coords") or {}
+        if coords.get("lat") is not None and coords.get("long") is not None:
+            lines.append(f"Coordinates (city): {coords['lat']}, {coords['long']}")
+        if venue.get("url"):
+            lines.append(f"[Venue page on setlist.fm]({venue['url']})")
+        return "\n\n".join(lines)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"decisions": dict(self.decisions), "saved_seconds": round(self.saved, 3),
+                "agent_turn_seconds": round(self.agent_turn, 3)}
@@ -0,0 +1,161 @@
+"""Function-calling run loop for Azure AI Foundry agents.
+
+FoundryRunner drives a run to completion: it polls with adaptive backoff
+(short intervals right after a state change, growing while nothing
+happens), executes every tool call of a requires_action step concurrently
+in a thread pool, and reports per-run timings. BackgroundLoop lets the
+synchronous tool functions share one async plugin (and its connection
+pool) instead of building a new one per call.
+"""
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+ACTIVE_STATUSES = ("queued", "in_progress", "requires_action")
+
+
+class BackgroundLoop:
+    """An event loop running on a daemon thread.
+
+    Synchronous code (tool functions run in worker threads) submits
+    coroutines with run(); they all execute on this one loop, so an async
+    plugin's session is created once and reused.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="foundry-tools", daemon=True)
+        self._thread.start()
+
+    def run(self, coro: Awaitable[Any], timeout: Optional[float] = None) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def close(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+class RunTimings:
+    """Where the wall time of one run went."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.elapsed = 0.0
+        self.polls = 0
+        self.poll_wait = 0.0
+        self.tool_rounds: List[Dict[str, Any]] = []
+
+    def stats(self) -> Dict[str, Any]:
+        tool_time = sum(r["elapsed"] for r in self.tool_rounds)
+        return {
+            "elapsed": self.elapsed,
+            "polls": self.polls,
+            "poll_wait": self.poll_wait,
+            "tool_rounds": len(self.tool_rounds),
+            "tool_calls": sum(r["calls"] for r in self.tool_rounds),
+            "tool_time": tool_time,
+            # time spent in the service (model, queueing) rather than in our tools
+            "service_time": self.elapsed - tool_time,
+        }
+
+
+class RunResult:
+    def __init__(self, run: Any, timings: RunTimings):
+        self.run = run
+        self.timings = timings
+
+    @property
+    def status(self) -> str:
+        return self.run.status
+
+
+class FoundryRunner:
+    """Run an agent on a thread, executing its function tool calls.
+
+    Args:
+        agents: The project client's agents operations (create_run, get_run, submit_tool_outputs_to_run)
+        execute: Runs one function tool call and returns its output, e.g. FunctionTool.execute
+        make_output: Builds the submitted output from (tool_call_id, output), e.g. ToolOutput
+        max_workers: Tool calls executed at the same time
+        poll_interval: First polling delay after a state change
+        max_poll_interval: Upper bound for the polling delay
+        backoff: Factor applied to the delay while the run status does not change
+    """
+
+    def __init__(self, agents: Any, execute: Callable[[Any], str],
+                 make_output: Optional[Callable[[str, str], Any]] = None, max_workers: int = 8,
+                 poll_interval: float = 0.2, max_poll_interval: float = 2.0, backoff: float = 1.5):
+        self.agents = agents
+        self.execute = execute
+        self.make_output = make_output or (lambda tool_call_id, output: {"tool_call_id": tool_call_id,
+                                                                         "output": output})
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="foundry-tool")
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self) -> "FoundryRunner":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def run(self, thread_id: str, agent_id: str, **kwargs: Any) -> RunResult:
+        """Create a run and drive it until it leaves the active statuses."""
+        timings = RunTimings()
+        run = self.agents.create_run(thread_id=thread_id, agent_id=agent_id, **kwargs)
+        delay = self.poll_interval
+        while run.status in ACTIVE_STATUSES:
+            if run.status == "requires_action":
+                tool_calls = _tool_calls(run)
+                if not tool_calls:
+                    logger.warning(f"Run {run.id} requires action without tool calls, cancelling")
+                    run = self.agents.cancel_run(thread_id=thread_id, run_id=run.id)
+                    break
+                outputs = self._execute_all(tool_calls, timings)
+                run = self.agents.submit_tool_outputs_to_run(
+                    thread_id=thread_id, run_id=run.id, tool_outputs=outputs)
+                delay = self.poll_interval
+                continue
+            time.sleep(delay)
+            timings.poll_wait += delay
+            timings.polls += 1
+            previous = run.status
+            run = self.agents.get_run(thread_id=thread_id, run_id=run.id)
+            # poll quickly right after a transition, back off while waiting
+            delay = self.poll_interval if run.status != previous else min(delay * self.backoff,
+                                                                          self.max_poll_interval)
+        timings.elapsed = time.perf_counter() - timings.started
+        logger.info(f"Run {run.id} finished with status {run.status}: {timings.stats()}")
+        return RunResult(run, timings)
+
+    def _execute_all(self, tool_calls: List[Any], timings: RunTimings) -> List[Any]:
+        start = time.perf_counter()
+        outputs = list(self._executor.map(self._execute_one, tool_calls))
+        timings.tool_rounds.append({"calls": len(tool_calls), "elapsed": time.perf_counter() - start})
+        return outputs
+
+    def _execute_one(self, tool_call: Any) -> Any:
+        try:
+            output = self.execute(tool_call)
+        except Exception as e:
+            # the run would stall waiting for a missing output, so report the error instead
+            logger.error(f"Error executing tool_call {tool_call.id}: {e}")
+            output = f"Error executing {tool_call.function.name}: {str(e)}"
+        return self.make_output(tool_call_id=tool_call.id, output=output)
+
+
+def _tool_calls(run: Any) -> List[Any]:
+    """Function tool calls of a requires_action run."""
+    action = getattr(run, "required_action", None)
+    submit = getattr(action, "submit_tool_outputs", None)
+    return [call for call in getattr(submit, "tool_calls", None) or [] if getattr(call, "function", None)]
@@ -2,7 +2,9 @@ import os
 import asyncio
 import gradio as gr
 from dotenv import load_dotenv
-from setlist_agent import SetlistFMAgent
+from agent_pool import AgentPool
+from answer_cache import AnswerCache
+from session_manager import SessionManager
 from config import enable_telemetry, get_logger
 
 # Configure logging
@@ -27,54 +29,80 @@ if not openai_api_key:
 DEFAULT_MODEL = "gpt-4o"  # Default model
 
 
+# Repeated first questions (the example prompts especially) are answered without a model turn
+answer_cache_size = int(os.environ.get("ANSWER_CACHE_SIZE", "512"))
+answer_cache = AnswerCache(max_size=answer_cache_size) if answer_cache_size > 0 else None
+
+# Agents per model deployment, sharing plugins, connection pools and the answer cache
+agent_pool = AgentPool(setlistfm_api_key, api_key_env="OPENAI_API", answer_cache=answer_cache)
+
+
 def create_agent(model_name=DEFAULT_MODEL):
-    """Create a new instance of the SetlistFM agent with specified model"""
-    logger.info(f"Creating new agent with model: {model_name}")
-    return SetlistFMAgent(setlistfm_api_key, model_name=model_name, api_key_env="OPENAI_API")
+    """Get the SetlistFM agent for the specified model, building it on first use"""
+    logger.info(f"Using agent with model: {model_name}")
+    return agent_pool.get(model_name)
 
 
 # Initialize the agent with the default model
 agent = create_agent(DEFAULT_MODEL)
 
-# Store conversation history
-conversation_history = []
+# One conversation per browser session over the shared agent
+sessions = SessionManager(agent)
 
 
-async def process_message(message, history):
-    """Process user message and get response from agent"""
-    # Update history with user message
-    history.append({"role": "user", "content": message})
+async def process_message(message, history, request: gr.Request):
+    """Process user message and stream the agent's response into the chat"""
+    # Update history with user message and an assistant message filled as the answer streams in
+    history = history + [{"role": "user", "content": message}, {"role": "assistant", "content": ""}]
 
     # Log the incoming message
     logger.info(f"Received message: {message}")
 
     try:
-        # Get response from agent
-        response = await agent.chat(message)
-
-        # Update history with assistant's response
-        conversation_history.append({"role": "assistant", "content": response})
-
-        return response
+        answer = ""
+        async for event in sessions.chat_stream(request.session_hash, message):
+            if event.kind == "tool_start" and not answer:
+                # show which lookups are running until the first token arrives
+                history[-1]["content"] = f"_Looking up {event.tool.replace('-', '.')}…_"
+            elif event.kind == "token":
+                answer += event.text
+                history[-1]["content"] = answer
+            elif event.kind == "done":
+                ttft = f"{event.ttft:.2f}s" if event.ttft is not None else "n/a"
+                logger.info(f"Turn finished in {event.elapsed:.2f}s, first token after {ttft}; {sessions.stats()}")
+            yield history
     except Exception as e:
         error_message = f"Error processing your request: {str(e)}"
         logger.error(f"Error in process_message: {e}")
-        return error_message
+        history[-1]["content"] = error_message
+        yield history
 
 
-def clear_conversation():
-    """Clear the conversation history"""
-    conversation_history.clear()
-    return None
+def clear_conversation(request: gr.Request):
+    """Clear the conversation history of this session"""
+    sessions.end(request.session_hash)
+    return []
+
+
+def end_session(request: gr.Request):
+    """Forget the conversation of a closed browser tab"""
+    sessions.end(request.session_hash)
 
 
 async def change_model(model_name):
-    """Change the model used by the agent"""
+    """Change the model used by the agent; conversations carry over"""
     global agent
     agent = create_agent(model_name)
+    sessions.agent = agent
+    await agent_pool.warm()
     return f"Model changed to {model_name}"
 
 
+async def warm_connections():
+    """Open connections to setlist.fm, Spotify and the model before the first message"""
+    await agent_pool.warm()
+
+
 def create_demo():
     """Create the Gradio Blocks interface"""
     with gr.Blocks(title="Setlistfm Music Assistant", theme=gr.themes.Soft()) as demo:
@@ -106,11 +134,11 @@ def create_demo():
 
                 with gr.Row():
                     clear_btn = gr.Button("Clear Chat History")
-                    clear_btn.click(fn=clear_conversation, outputs=[])
 
         with gr.Row():
             with gr.Column(scale=3):
                 chatbot = gr.Chatbot(
+                    type="messages",
                     height=500,
                     show_label=False,
                     avatar_images=("👤", "🎸"),
@@ -140,6 +168,10 @@ def create_demo():
                     )
 
         # Set up event handlers
+        clear_btn.click(fn=clear_conversation, outputs=[chatbot])
+        demo.unload(end_session)
+        demo.load(warm_connections)
+
         msg.submit(
             fn=process_message,
             inputs=[msg, chatbot],
@@ -181,7 +213,8 @@ async def fetch_trending_artists():
         results = []
         # Limit to top 3 to avoid rate limits
         for artist in trending_artists[:3]:
-            response = await agent.chat(f"Give me a one sentence summary about {artist} without mentioning setlists")
+            response = await agent.chat(f"Give me a one sentence summary about {artist} without mentioning setlists",
+                                        conversation=agent.new_conversation())
             results.append(f"**{artist}**: {response}")
 
         return "\n\n".join(results)
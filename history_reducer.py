@@ -0,0 +1,105 @@
+"""Token-budgeted compaction of a conversation's chat history.
+
+Every turn resends the whole thread, and most of it is tool results:
+setlist and search JSON of several KB each that the model already
+answered from. ToolResultReducer keeps the thread under max_tokens
+(estimated like tool_output, BYTES_PER_TOKEN per token):
+
+1. tool results older than the last keep_turns turns are replaced by a
+   short preview, oldest first, until the history fits;
+2. if it still does not fit, whole old turns (user message, tool calls,
+   results and answer) are dropped, oldest first.
+
+Recent turns stay verbatim, system messages are never touched, and call
+and result pairs are never separated.
+"""
+import logging
+from typing import Optional, Dict, Any, List
+
+from pydantic import Field
+from semantic_kernel.contents import AuthorRole, ChatMessageContent, FunctionCallContent, FunctionResultContent
+from semantic_kernel.contents.history_reducer.chat_history_reducer import ChatHistoryReducer
+
+from tool_output import BYTES_PER_TOKEN
+
+logger = logging.getLogger(__name__)
+
+# role, name and separators the API adds around every message
+MESSAGE_OVERHEAD_TOKENS = 4
+_PINNED = (AuthorRole.SYSTEM, AuthorRole.DEVELOPER)
+
+
+def message_chars(message: ChatMessageContent) -> int:
+    """Characters a message contributes to the prompt: text, tool call arguments and tool results."""
+    size = len(str(message.content or ""))
+    for item in message.items:
+        if isinstance(item, FunctionResultContent):
+            size += len(str(item.result))
+        elif isinstance(item, FunctionCallContent):
+            size += len(str(item.arguments or "")) + len(item.name or "")
+    return size
+
+
+def estimate_tokens(messages: List[ChatMessageContent]) -> int:
+    return sum(message_chars(m) // BYTES_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS for m in messages)
+
+
+def elide(result: Any, preview_chars: int) -> str:
+    text = str(result)
+    if len(text) <= preview_chars:
+        return text
+    return (f"[earlier result, {len(text)} chars elided; call the tool again if the details are needed] "
+            f"{text[:preview_chars]}…")
+
+
+class ToolResultReducer(ChatHistoryReducer):
+    """ChatHistory that compacts itself to a token budget on reduce()."""
+
+    max_tokens: int = Field(default=8000, gt=0, description="Token budget for the history.")
+    keep_turns: int = Field(default=2, ge=1, description="Most recent turns kept verbatim.")
+    preview_chars: int = Field(default=200, ge=0, description="Characters kept of an elided tool result.")
+    # message counts are not the budget here; required by ChatHistoryReducer
+    target_count: int = Field(default=1, gt=0)
+    last_reduction: Dict[str, int] = Field(default_factory=dict)
+
+    def estimated_tokens(self) -> int:
+        return estimate_tokens(self.messages)
+
+    async def reduce(self) -> Optional["ToolResultReducer"]:
+        before = tokens = self.estimated_tokens()
+        if tokens <= self.max_tokens:
+            return None
+        turns = [i for i, m in enumerate(self.messages) if m.role == AuthorRole.USER]
+        # messages from index recent on belong to the turns kept verbatim
+        recent = turns[max(0, len(turns) - self.keep_turns)] if turns else 0
+        elided = 0
+        for i in range(recent):
+            if tokens <= self.max_tokens:
+                break
+            message = self.messages[i]
+            if message.role != AuthorRole.TOOL:
+                continue
+            compact = message.model_copy(update={"items": [
+                item.model_copy(update={"result": elide(item.result, self.preview_chars)})
+                if isinstance(item, FunctionResultContent) else item for item in message.items]})
+            tokens += estimate_tokens([compact]) - estimate_tokens([message])
+            self.messages[i] = compact
+            elided += 1
+        dropped = 0
+        old_turns = [i for i in turns if i < recent]
+        while tokens > self.max_tokens and old_turns:
+            start = old_turns.pop(0)
+            end = old_turns[0] if old_turns else recent
+            turn = [m for m in self.messages[start:end] if m.role not in _PINNED]
+            tokens -= estimate_tokens(turn)
+            self.messages[start:end] = [m for m in self.messages[start:end] if m.role in _PINNED]
+            # later indices shift by what was removed
+            removed = len(turn)
+            old_turns = [i - removed for i in old_turns]
+            recent -= removed
+            dropped += 1
+        self.last_reduction = {"tokens_before": before, "tokens_after": tokens, "elided_results": elided,
+                               "dropped_turns": dropped}
+        logger.info(f"History reduced from ~{before} to ~{tokens} tokens "
+                    f"({elided} tool results elided, {dropped} turns dropped)")
+        return self
@@ -0,0 +1,141 @@
+"""Many chat users over one shared SetlistFMAgent.
+
+SessionManager maps a session id (the Gradio session hash) to its own
+Conversation, so users never see each other's history while the kernel,
+plugins and connection pools stay shared. Sessions idle for idle_timeout
+seconds are dropped, at most max_sessions are kept (least recently used
+go first) and the estimated size of all histories and tool memos is kept
+under max_bytes, so a long running server's memory stays flat however
+many users come by.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, Any, AsyncIterator
+
+from history_reducer import message_chars
+from setlist_agent import ChatEvent, Conversation, SetlistFMAgent
+
+logger = logging.getLogger(__name__)
+
+# rough per-message overhead of ChatMessageContent objects, in bytes
+MESSAGE_OVERHEAD = 400
+
+
+class Session:
+    __slots__ = ("id", "conversation", "lock", "created", "last_used", "turns", "bytes")
+
+    def __init__(self, id: str, conversation: Conversation):
+        self.id = id
+        self.conversation = conversation
+        # one turn at a time per session (e.g. two tabs sharing a session)
+        self.lock = asyncio.Lock()
+        self.created = self.last_used = time.monotonic()
+        self.turns = 0
+        self.bytes = 0
+
+
+async def conversation_bytes(conversation: Conversation) -> int:
+    """Estimated memory held by a conversation's history and tool memo."""
+    size = conversation.memo.approx_bytes() if conversation.memo is not None else 0
+    if conversation.thread is None:
+        return size
+    async for message in conversation.thread.get_messages():
+        size += MESSAGE_OVERHEAD + message_chars(message)
+    return size
+
+
+class SessionManager:
+    """Per-session conversations with LRU, idle-time and memory bounds.
+
+    Args:
+        agent: The shared SetlistFMAgent
+        max_sessions: Sessions kept at once; the least recently used is dropped beyond it
+        idle_timeout: Seconds without a message after which a session is dropped
+        max_bytes: Budget for the estimated size of all sessions
+    """
+
+    def __init__(self, agent: SetlistFMAgent, max_sessions: int = 500, idle_timeout: float = 1800.0,
+                 max_bytes: int = 64 * 1024 * 1024):
+        self.agent = agent
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.max_bytes = max_bytes
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(s.bytes for s in self._sessions.values())
+
+    def get(self, session_id: str) -> Session:
+        """The session for session_id, created on first use."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = Session(session_id, self.agent.new_conversation())
+            self._sessions[session_id] = session
+            logger.info(f"Session {session_id} started ({len(self._sessions)} active)")
+        session.last_used = time.monotonic()
+        self._sessions.move_to_end(session_id)
+        self.evict()
+        return session
+
+    def end(self, session_id: str) -> bool:
+        """Forget a session (cleared chat, closed tab)."""
+        return self._sessions.pop(session_id, None) is not None
+
+    def evict(self) -> int:
+        """Drop idle sessions, then least recently used ones while over the caps."""
+        now = time.monotonic()
+        newest = next(reversed(self._sessions), None)
+        # sessions in the middle of a turn and the one just used are never dropped
+        candidates = [s for s in self._sessions.values() if not s.lock.locked() and s.id != newest]
+        dropped = {s.id for s in candidates if now - s.last_used > self.idle_timeout}
+        remaining = len(self._sessions) - len(dropped)
+        total = sum(s.bytes for s in self._sessions.values() if s.id not in dropped)
+        for session in candidates:
+            if remaining <= self.max_sessions and total <= self.max_bytes:
+                break
+            if session.id not in dropped:
+                dropped.add(session.id)
+                remaining -= 1
+                total -= session.bytes
+        for session_id in dropped:
+            del self._sessions[session_id]
+        if dropped:
+            self.evictions += len(dropped)
+            logger.info(f"Evicted {len(dropped)} sessions ({len(self._sessions)} active, {total} bytes)")
+        return len(dropped)
+
+    async def chat(self, session_id: str, user_message: str) -> str:
+        session = self.get(session_id)
+        async with session.lock:
+            result = await self.agent.chat(user_message, conversation=session.conversation)
+            await self._account(session)
+        return result
+
+    async def chat_stream(self, session_id: str, user_message: str) -> AsyncIterator[ChatEvent]:
+        session = self.get(session_id)
+        async with session.lock:
+            try:
+                async for event in self.agent.chat_stream(user_message, conversation=session.conversation):
+                    yield event
+            finally:
+                await self._account(session)
+
+    async def _account(self, session: Session) -> None:
+        session.turns += 1
+        session.last_used = time.monotonic()
+        session.bytes = await conversation_bytes(session.conversation)
+        self.evict()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"sessions": len(self._sessions), "max_sessions": self.max_sessions,
+                "bytes": self.total_bytes, "max_bytes": self.max_bytes, "evictions": self.evictions}
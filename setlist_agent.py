@@ -3,13 +3,30 @@
 from semantic_kernel.connectors.ai.function_choice_behavior import FunctionChoiceBehavior
 from semantic_kernel.functions import KernelArguments
 from semantic_kernel.agents import ChatCompletionAgent, ChatHistoryAgentThread
-import json
+import asyncio
 import os
 import logging
+import time
+from contextvars import ContextVar
+from typing import Optional, Dict, Any, AsyncIterator, List
 import semantic_kernel as sk
 from semantic_kernel.functions import kernel_function
 from dotenv import load_dotenv
+from setlist_async_client import AsyncSetlistFMClient
 from setlist_client import SetlistFMClient
+from setlist_mirror import SetlistMirror
+from setlist_stats import SongStats
+from tool_output import BYTES_PER_TOKEN, ToolOutput
+from tool_memo import ToolMemo
+from history_reducer import MESSAGE_OVERHEAD_TOKENS, ToolResultReducer, estimate_tokens
+from answer_cache import AnswerCache
+from fast_path import FastPathRouter
+from artist_identity import ArtistIdentityPlugin, ArtistIdentityStore, ArtistResolver
+from spotify_async_client import AsyncSpotifyClient
+from spotify_token import SpotifyTokenProvider
+from setlist_spotify import SetlistSpotifyPlugin, SetlistTrackResolver
+from semantic_kernel.filters import FilterTypes
+from semantic_kernel.contents import AuthorRole, ChatMessageContent
 from opentelemetry.trace import get_tracer
 from opentelemetry import trace
 from semantic_kernel.connectors.ai.open_ai import AzureChatCompletion
@@ -26,15 +43,32 @@ tracer = get_tracer(__name__)
 
 
 class SetlistFMPlugin:
-    def __init__(self, api_key):
-        """Initialize the SetlistFMPlugin with a valid API key."""
-        self.client = SetlistFMClient(api_key=api_key)
+    def __init__(self, api_key, client: AsyncSetlistFMClient = None, mirror: SetlistMirror = None,
+                 mirror_max_age: float = 24 * 3600, output: ToolOutput = None):
+        """Initialize the SetlistFMPlugin with a valid API key.
+
+        Args:
+            api_key: Setlist.fm API key
+            client: Optional pre-configured AsyncSetlistFMClient to share its connection pool
+            mirror: Optional local SetlistMirror answered first for mirrored artists
+            mirror_max_age: Seconds after a sync during which mirrored data is trusted
+            output: How results are rendered for the model; compact and size-bounded by default
+        """
+        self.client = client if client is not None else AsyncSetlistFMClient(
+            api_key=api_key)
+        self.mirror = mirror
+        self.mirror_max_age = mirror_max_age
+        self.output = output if output is not None else ToolOutput()
+
+    async def close(self):
+        """Release the HTTP connection pool held by the client."""
+        await self.client.close()
 
     @kernel_function(
         description="Search for an artist by name",
         name="search_artists"
     )
-    def search_artists(self, artist_name: str) -> str:
+    async def search_artists(self, artist_name: str) -> str:
         """Search for artists matching a given name.
 
         Args:
@@ -45,9 +79,8 @@ class SetlistFMPlugin:
         """
         trace.get_current_span().set_attribute("artist_name", artist_name)
         try:
-            result = self.client.search_artists(artist_name)
-            # Format the output nicely for the agent
-            return json.dumps(result, indent=2)
+            result = await self.client.search_artists(artist_name)
+            return self.output.render("search_artists", result)
         except Exception as e:
             return f"Error searching for artist: {str(e)}"
 
@@ -55,13 +88,15 @@ class SetlistFMPlugin:
         description="Search for setlists by artist name, city name, or country code",
         name="search_setlists"
     )
-    def search_setlists(self, artist_name: str = "", city_name: str = "", country_code: str = "") -> str:
+    async def search_setlists(self, artist_name: str = "", city_name: str = "", country_code: str = "",
+                              page: int = 1) -> str:
         """Search for setlists by artist name, city name, or country code.
 
         Args:
             artist_name: Optional name of the artist.
             city_name: Optional name of the city.
             country_code: Optional country code.
+            page: Page of results, for when a previous answer had a next_page.
 
         Returns:
             A JSON string containing information about matching setlists.
@@ -74,12 +109,22 @@ class SetlistFMPlugin:
                 "city_name", city_name if city_name else 'empty')
             span.set_attribute(
                 "country_code", country_code if country_code else 'empty')
-            result = self.client.search_setlists(
+            # the mirror's SQLite queries block, so they run off the event loop
+            mbid = await asyncio.to_thread(
+                self.mirror.find_artist, artist_name, self.mirror_max_age) if self.mirror and artist_name else None
+            span.set_attribute("mirror_hit", mbid is not None)
+            if mbid is not None:
+                result = await asyncio.to_thread(
+                    self.mirror.search_setlists, mbid, city_name=city_name or None,
+                    country_code=country_code or None, page=page)
+                return self.output.render("search_setlists", result)
+            result = await self.client.search_setlists(
                 artist_name=artist_name if artist_name else None,
                 city_name=city_name if city_name else None,
-                country_code=country_code if country_code else None
+                country_code=country_code if country_code else None,
+                page=page
             )
-            return json.dumps(result, indent=2)
+            return self.output.render("search_setlists", result)
         except Exception as e:
             return f"Error searching for setlists: {str(e)}"
 
@@ -87,7 +132,7 @@ class SetlistFMPlugin:
         description="Get a specific setlist by its ID",
         name="get_setlist"
     )
-    def get_setlist(self, setlist_id: str) -> str:
+    async def get_setlist(self, setlist_id: str) -> str:
         """Get details of a specific setlist by its ID.
 
         Args:
@@ -98,8 +143,10 @@ class SetlistFMPlugin:
         """
         try:
             trace.get_current_span().set_attribute("setlist_id", setlist_id)
-            result = self.client.get_setlist(setlist_id)
-            return json.dumps(result, indent=2)
+            result = await asyncio.to_thread(self.mirror.get_setlist, setlist_id) if self.mirror else None
+            if result is None:
+                result = await self.client.get_setlist(setlist_id)
+            return self.output.render("get_setlist", result)
         except Exception as e:
             return f"Error getting setlist: {str(e)}"
 
@@ -107,7 +154,7 @@ class SetlistFMPlugin:
         description="Get venue information by venue ID",
         name="get_venue"
     )
-    def get_venue(self, venue_id: str) -> str:
+    async def get_venue(self, venue_id: str) -> str:
         """Get details of a specific venue by its ID.
 
         Args:
@@ -118,14 +165,167 @@ class SetlistFMPlugin:
         """
         try:
             trace.get_current_span().set_attribute("venue_id", venue_id)
-            result = self.client.get_venue(venue_id)
-            return json.dumps(result, indent=2)
+            result = await self.client.get_venue(venue_id)
+            return self.output.render("get_venue", result)
         except Exception as e:
             return f"Error getting venue: {str(e)}"
 
+    async def _song_stats(self, artist_name: str, max_shows: int) -> SongStats:
+        mbid = await asyncio.to_thread(
+            self.mirror.find_artist, artist_name, self.mirror_max_age) if self.mirror else None
+        if mbid is not None:
+            setlists = (await asyncio.to_thread(
+                self.mirror.search_setlists, mbid, items_per_page=max_shows))["setlist"]
+        else:
+            setlists = [s async for s in self.client.iter_search_setlists(
+                artist_name=artist_name, max_items=max_shows)]
+        return SongStats(setlists)
+
+    @kernel_function(
+        description="Get song statistics for an artist's recent shows: most played songs, openers, closers, encores and rarities",
+        name="get_song_statistics"
+    )
+    async def get_song_statistics(self, artist_name: str, max_shows: int = 100) -> str:
+        """Summarize which songs an artist plays across recent setlists.
+
+        Args:
+            artist_name: The name of the artist.
+            max_shows: How many of the most recent shows to analyse.
+
+        Returns:
+            A JSON string with a small statistics summary.
+        """
+        try:
+            span = trace.get_current_span()
+            span.set_attribute("artist_name", artist_name)
+            stats = await self._song_stats(artist_name, max_shows)
+            span.set_attribute("shows", stats.show_count)
+            return self.output.render("get_song_statistics", stats.summary())
+        except Exception as e:
+            return f"Error computing song statistics: {str(e)}"
+
+    @kernel_function(
+        description="Get how often an artist plays a given song, its usual position and how often it is the opener, closer or an encore",
+        name="get_song_details"
+    )
+    async def get_song_details(self, artist_name: str, song_name: str, max_shows: int = 100) -> str:
+        """Statistics for one song across an artist's recent setlists.
+
+        Args:
+            artist_name: The name of the artist.
+            song_name: The title of the song.
+            max_shows: How many of the most recent shows to analyse.
+
+        Returns:
+            A JSON string with the song's statistics.
+        """
+        try:
+            span = trace.get_current_span()
+            span.set_attribute("artist_name", artist_name)
+            span.set_attribute("song_name", song_name)
+            stats = await self._song_stats(artist_name, max_shows)
+            details = stats.song(song_name)
+            if details is None:
+                return f"{song_name} was not played in the last {stats.show_count} shows of {artist_name}"
+            details["shows"] = stats.show_count
+            return self.output.render("get_song_details", details)
+        except Exception as e:
+            return f"Error computing song statistics: {str(e)}"
+
+
+class ChatEvent:
+    """One item of SetlistFMAgent.chat_stream.
+
+    kind is "token" (text is the next piece of the answer), "tool_start" or
+    "tool_end" (tool is "Plugin-function", arguments its arguments, elapsed
+    the call time once it ended) or "done" (text is the whole answer; ttft
+    and elapsed are seconds from the message to the first token and to the
+    end of the turn, prompt_tokens the estimated history sent with it).
+    """
+    __slots__ = ("kind", "text", "tool", "arguments", "elapsed", "ttft", "prompt_tokens")
+
+    def __init__(self, kind: str, text: str = "", tool: Optional[str] = None,
+                 arguments: Optional[Dict[str, Any]] = None, elapsed: Optional[float] = None,
+                 ttft: Optional[float] = None, prompt_tokens: Optional[int] = None):
+        self.kind = kind
+        self.text = text
+        self.tool = tool
+        self.arguments = arguments
+        self.elapsed = elapsed
+        self.ttft = ttft
+        self.prompt_tokens = prompt_tokens
+
+
+class Conversation:
+    """One user's conversation with a SetlistFMAgent: its thread and tool memo.
+
+    The agent (kernel, plugins, connection pools) is shared by any number
+    of conversations; chat and chat_stream take the one to continue. With
+    history_max_tokens set, the history is compacted to that budget before
+    every turn (see history_reducer).
+    """
+
+    def __init__(self, memo: Optional[ToolMemo] = None, history_max_tokens: int = 0,
+                 history_keep_turns: int = 2):
+        self.thread: Optional[ChatHistoryAgentThread] = None
+        self.memo = memo
+        self.history_max_tokens = history_max_tokens
+        self.history_keep_turns = history_keep_turns
+        # estimated prompt tokens of each turn, for logs and benchmarks
+        self.prompt_tokens: List[int] = []
+        # tool calls of the running turn that returned an error
+        self.failed_tools = 0
+        # tool progress of the running chat_stream turn
+        self.events: Optional[asyncio.Queue] = None
+
+    def reset(self) -> None:
+        self.thread = None
+        self.prompt_tokens = []
+        if self.memo is not None:
+            self.memo.clear()
+
+    async def start_turn(self, user_message: str) -> int:
+        """Compact the history to its budget; returns the turn's estimated prompt tokens.
+
+        The system prompt is added by the agent on every call and is not part
+        of the estimate.
+        """
+        if self.thread is None:
+            self._start()
+        self.failed_tools = 0
+        await self.thread.reduce()
+        messages = [m async for m in self.thread.get_messages()]
+        tokens = estimate_tokens(messages) + len(str(user_message)) // BYTES_PER_TOKEN + MESSAGE_OVERHEAD_TOKENS
+        self.prompt_tokens.append(tokens)
+        return tokens
+
+    async def record(self, user_message: str, answer: str) -> None:
+        """Add a turn answered without the model (e.g. from the answer cache) to the history."""
+        if self.thread is None:
+            self._start()
+        await self.thread.on_new_message(ChatMessageContent(role=AuthorRole.USER, content=str(user_message)))
+        await self.thread.on_new_message(ChatMessageContent(role=AuthorRole.ASSISTANT, content=answer))
+        self.prompt_tokens.append(0)
+
+    def _start(self) -> None:
+        # a new conversation starts with an empty memo
+        self.reset()
+        history = None
+        if self.history_max_tokens > 0:
+            history = ToolResultReducer(max_tokens=self.history_max_tokens, keep_turns=self.history_keep_turns)
+        self.thread = ChatHistoryAgentThread(chat_history=history)
+
+
+# conversation of the turn being processed, seen by the kernel filters
+_conversation: ContextVar[Optional[Conversation]] = ContextVar("setlist_conversation", default=None)
+
 
 class SetlistFMAgent:
-    def __init__(self, api_key, model_name="gpt-3.5-turbo", api_key_env="OPENAI_API_KEY"):
+    def __init__(self, api_key, model_name="gpt-3.5-turbo", api_key_env="OPENAI_API_KEY", service=None,
+                 setlist_plugin: SetlistFMPlugin = None, memo_size: int = 128, memo_ttl: float = 600.0,
+                 identity_plugin: ArtistIdentityPlugin = None, tracks_plugin: SetlistSpotifyPlugin = None,
+                 history_max_tokens: int = 8000, history_keep_turns: int = 2,
+                 answer_cache: AnswerCache = None, fast_path: FastPathRouter = None):
         """
         Initialize the Setlist.fm Agent.
 
@@ -133,23 +333,86 @@ class SetlistFMAgent:
             api_key: Setlist.fm API key
             model_name: Name of the OpenAI model to use
             api_key_env: Name of the environment variable containing the OpenAI API key
+            service: Optional chat completion service registered as 'Agent' instead of AzureChatCompletion
+            setlist_plugin: Optional pre-built SetlistFMPlugin to share between agents
+            memo_size: Tool results remembered per conversation (0 disables the memo)
+            memo_ttl: Seconds a remembered tool result stays valid
+            identity_plugin: Optional ArtistIdentityPlugin mapping setlist.fm artists to Spotify ids
+            tracks_plugin: Optional SetlistSpotifyPlugin resolving whole setlists to Spotify tracks
+            history_max_tokens: Estimated token budget of a conversation's history (0 keeps it all)
+            history_keep_turns: Most recent turns never compacted
+            answer_cache: Optional AnswerCache answering repeated first questions without a model turn
+            fast_path: Optional FastPathRouter answering simple setlist.fm questions without the model
         """
         # Set up the Semantic Kernel
         self.kernel = sk.Kernel()
 
-        # Configure OpenAI chat service
-        openai_api_key = os.environ.get(api_key_env)
-        if not openai_api_key:
-            raise ValueError(
-                f"Please set the {api_key_env} environment variable")
-
-        self.kernel.add_service(AzureChatCompletion(
-            service_id='Agent', deployment_name=model_name))
-
-        # Import the SetlistFM plugin
-        self.setlist_plugin = SetlistFMPlugin(api_key)
+        if service is None:
+            # Configure OpenAI chat service
+            openai_api_key = os.environ.get(api_key_env)
+            if not openai_api_key:
+                raise ValueError(
+                    f"Please set the {api_key_env} environment variable")
+            service = AzureChatCompletion(
+                service_id='Agent', deployment_name=model_name)
+        self.kernel.add_service(service)
+
+        # Import the SetlistFM plugin, answering from the local mirror when configured
+        if setlist_plugin is None:
+            mirror_path = os.environ.get("SETLISTFM_MIRROR")
+            mirror = SetlistMirror(SetlistFMClient(api_key), mirror_path) if mirror_path else None
+            setlist_plugin = SetlistFMPlugin(api_key, mirror=mirror)
+        self.setlist_plugin = setlist_plugin
         self.kernel.add_plugin(self.setlist_plugin, "SetlistFM")
 
+        # Cross-service artist ids, persisted locally when configured
+        spotify_id, spotify_secret = os.environ.get("SPOTIPY_CLIENT_ID"), os.environ.get("SPOTIPY_CLIENT_SECRET")
+        identity_path = os.environ.get("ARTIST_IDENTITY_DB")
+        spotify_client = None
+        # only plugins built here use the client; passed-in ones bring their own
+        if spotify_id and spotify_secret and (tracks_plugin is None or (identity_plugin is None and identity_path)):
+            spotify_client = AsyncSpotifyClient(spotify_id, spotify_secret,
+                                                token_provider=SpotifyTokenProvider.shared(spotify_id, spotify_secret))
+        if identity_plugin is None and identity_path and spotify_client is None:
+            logging.error("ARTIST_IDENTITY_DB is set but SPOTIPY_CLIENT_ID/SPOTIPY_CLIENT_SECRET are not; "
+                          "the ArtistIdentity plugin is disabled")
+        elif identity_plugin is None and identity_path:
+            identity_plugin = ArtistIdentityPlugin(ArtistResolver(
+                self.setlist_plugin.client, spotify_client, ArtistIdentityStore(identity_path)))
+        self.identity_plugin = identity_plugin
+        if self.identity_plugin is not None:
+            self.kernel.add_plugin(self.identity_plugin, "ArtistIdentity")
+
+        # Setlist -> Spotify track links in a single tool call
+        if tracks_plugin is None and spotify_client is not None:
+            tracks_plugin = SetlistSpotifyPlugin(self.setlist_plugin.client, SetlistTrackResolver(spotify_client))
+        self.tracks_plugin = tracks_plugin
+        if self.tracks_plugin is not None:
+            self.kernel.add_plugin(self.tracks_plugin, "SetlistSpotify")
+
+        # Tool progress for chat_stream; registered first so memo hits are reported too
+        self.kernel.add_filter(FilterTypes.AUTO_FUNCTION_INVOCATION, self._tool_progress)
+
+        # Answer repeated tool calls within a conversation from memory
+        self.memo_size = memo_size
+        self.memo_ttl = memo_ttl
+        if memo_size > 0:
+            self.kernel.add_filter(FilterTypes.AUTO_FUNCTION_INVOCATION, self._tool_memo)
+        # Old tool results are compacted first once a history outgrows its budget
+        self.history_max_tokens = history_max_tokens
+        self.history_keep_turns = history_keep_turns
+
+        # Repeated first questions are answered from the cache; answers built on failed tool calls are not kept
+        self.answer_cache = answer_cache
+        if answer_cache is not None:
+            self.kernel.add_filter(FilterTypes.AUTO_FUNCTION_INVOCATION, self._tool_failures)
+
+        # Simple questions ("last setlist of X", "concerts in Y") answered by templates when enabled
+        if fast_path is None and os.environ.get("SETLISTFM_FAST_PATH", "").lower() in ("1", "true", "yes"):
+            fast_path = FastPathRouter(self.setlist_plugin.client)
+        self.fast_path = fast_path
+        self.conversation = self.new_conversation()
+
         execution_settings = self.kernel.get_prompt_execution_settings_from_service_id(
             service_id='Agent')
         execution_settings.function_choice_behavior = FunctionChoiceBehavior.Auto()
@@ -171,28 +434,185 @@ class SetlistFMAgent:
             arguments=KernelArguments(
                 settings=execution_settings,
             ))
-        self.thread: ChatHistoryAgentThread = None
 
-    async def chat(self, user_message):
+    def new_conversation(self) -> Conversation:
+        return Conversation(ToolMemo(self.memo_size, self.memo_ttl) if self.memo_size > 0 else None,
+                            history_max_tokens=self.history_max_tokens, history_keep_turns=self.history_keep_turns)
+
+    @property
+    def thread(self) -> Optional[ChatHistoryAgentThread]:
+        """Thread of the agent's default conversation."""
+        return self.conversation.thread
+
+    @thread.setter
+    def thread(self, thread: Optional[ChatHistoryAgentThread]) -> None:
+        self.conversation.thread = thread
+
+    @property
+    def memo(self) -> Optional[ToolMemo]:
+        return self.conversation.memo
+
+    async def chat(self, user_message, conversation: Conversation = None):
         """Send a message to the agent and get a response.
 
         Args:
             user_message: The message to send to the agent.
+            conversation: Conversation to continue; the agent's default one if omitted.
 
         Returns:
             The agent's response.       
 
         """
         logging.info(f"chat called with message: {user_message}")
+        conversation = conversation or self.conversation
+        start = time.perf_counter()
+        first = conversation.thread is None
+        cached = await self._cached_answer(user_message, conversation)
+        if cached is None:
+            cached = await self._fast_answer(user_message, conversation)
+        if cached is not None:
+            return cached
+        prompt_tokens = await conversation.start_turn(user_message)
+        logging.info(f"chat prompt: ~{prompt_tokens} tokens of history and message")
         responses = []
-        async for response in self.agent.invoke(messages=user_message, thread=self.thread):
-            responses.append(response.content)
-            self.thread = response.thread
+        token = _conversation.set(conversation)
+        try:
+            async for response in self.agent.invoke(messages=user_message, thread=conversation.thread):
+                responses.append(response.content)
+                conversation.thread = response.thread
+        finally:
+            _conversation.reset(token)
 
         result = "\n".join([r.content for r in responses])
         logging.info(f"chat result: {result}")
+        if self.fast_path is not None:
+            self.fast_path.observe_agent_turn(time.perf_counter() - start)
+        if first:
+            self._cache_answer(user_message, str(result), conversation)
         return str(result)
 
+    async def _cached_answer(self, user_message, conversation: Conversation) -> Optional[str]:
+        """Answer a conversation's first question from the answer cache; follow-ups always go to the model."""
+        if self.answer_cache is None or conversation.thread is not None:
+            return None
+        start = time.perf_counter()
+        answer = self.answer_cache.get(str(user_message))
+        if answer is None:
+            return None
+        await conversation.record(user_message, answer)
+        logging.info(f"Answered from cache in {(time.perf_counter() - start) * 1000:.2f} ms: {user_message}")
+        return answer
+
+    async def _fast_answer(self, user_message, conversation: Conversation) -> Optional[str]:
+        """Answer a simple question through the fast path, recording it in the conversation."""
+        if self.fast_path is None:
+            return None
+        answer = await self.fast_path.answer(str(user_message))
+        if answer is not None:
+            await conversation.record(user_message, answer)
+        return answer
+
+    def _cache_answer(self, user_message, answer: str, conversation: Conversation) -> None:
+        if self.answer_cache is not None and conversation.failed_tools == 0:
+            self.answer_cache.put(str(user_message), answer)
+
+    async def _tool_failures(self, context, next):
+        conversation = _conversation.get() or self.conversation
+        try:
+            await next(context)
+        except Exception:
+            conversation.failed_tools += 1
+            raise
+        value = context.function_result.value if context.function_result is not None else None
+        if isinstance(value, str) and value.startswith("Error"):
+            conversation.failed_tools += 1
+
+    async def _tool_memo(self, context, next):
+        memo = (_conversation.get() or self.conversation).memo
+        if memo is None:
+            await next(context)
+        else:
+            await memo.filter(context, next)
+
+    async def _tool_progress(self, context, next):
+        events = (_conversation.get() or self.conversation).events
+        if events is None:
+            await next(context)
+            return
+        tool = context.function.fully_qualified_name
+        arguments = {k: v for k, v in context.arguments.items() if isinstance(v, (str, int, float, bool))}
+        events.put_nowait(ChatEvent("tool_start", tool=tool, arguments=arguments))
+        start = time.perf_counter()
+        try:
+            await next(context)
+        finally:
+            events.put_nowait(ChatEvent("tool_end", tool=tool, arguments=arguments,
+                                        elapsed=time.perf_counter() - start))
+
+    async def chat_stream(self, user_message, conversation: Conversation = None) -> AsyncIterator[ChatEvent]:
+        """Send a message to the agent and stream the response.
+
+        Args:
+            user_message: The message to send to the agent.
+            conversation: Conversation to continue; the agent's default one if omitted.
+
+        Yields:
+            ChatEvents: tool progress and answer tokens as they happen, then
+            one "done" event with the full answer and its timings.
+        """
+        logging.info(f"chat_stream called with message: {user_message}")
+        conversation = conversation or self.conversation
+        start = time.perf_counter()
+        first = conversation.thread is None
+        cached = await self._cached_answer(user_message, conversation)
+        if cached is None:
+            cached = await self._fast_answer(user_message, conversation)
+        if cached is not None:
+            elapsed = time.perf_counter() - start
+            yield ChatEvent("token", text=cached)
+            yield ChatEvent("done", text=cached, ttft=elapsed, elapsed=elapsed, prompt_tokens=0)
+            return
+        prompt_tokens = await conversation.start_turn(user_message)
+        events: asyncio.Queue = asyncio.Queue()
+
+        async def produce():
+            # set inside the task: an async generator must not leave it set in its caller's context
+            _conversation.set(conversation)
+            try:
+                async for response in self.agent.invoke_stream(messages=user_message, thread=conversation.thread):
+                    conversation.thread = response.thread
+                    if response.message.content:
+                        events.put_nowait(ChatEvent("token", text=str(response.message.content)))
+            finally:
+                events.put_nowait(None)
+
+        conversation.events = events
+        task = asyncio.ensure_future(produce())
+        parts = []
+        ttft = None
+        try:
+            while (event := await events.get()) is not None:
+                if event.kind == "token":
+                    if ttft is None:
+                        ttft = time.perf_counter() - start
+                    parts.append(event.text)
+                yield event
+            # surface errors raised by the agent
+            await task
+        finally:
+            conversation.events = None
+            if not task.done():
+                task.cancel()
+        elapsed = time.perf_counter() - start
+        result = "".join(parts)
+        logging.info(f"chat_stream result: {result} (first token {ttft if ttft is None else round(ttft, 3)}s, "
+                     f"turn {elapsed:.3f}s, prompt ~{prompt_tokens} tokens)")
+        if self.fast_path is not None:
+            self.fast_path.observe_agent_turn(elapsed)
+        if first:
+            self._cache_answer(user_message, result, conversation)
+        yield ChatEvent("done", text=result, ttft=ttft, elapsed=elapsed, prompt_tokens=prompt_tokens)
+
 
 if __name__ == "__main__":
     # Load environment variables from .env file
@@ -208,8 +628,6 @@ if __name__ == "__main__":
     print("Welcome to the Setlist.fm Agent! Type 'exit' to quit.")
 
     # Simple interaction loop
-    import asyncio
-
     async def main():
         while True:
             user_input = input("\nYou: ")
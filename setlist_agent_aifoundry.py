@@ -25,15 +25,14 @@ USAGE:
        messages, which may contain personal data. False by default.
 """
 from setlist_agent import SetlistFMPlugin
+from foundry_runner import BackgroundLoop, FoundryRunner
 from typing import Any, Callable, Set
 
 import os
-import time
-import json
 from azure.ai.projects import AIProjectClient
 from azure.ai.projects.telemetry import trace_function
 from azure.identity import DefaultAzureCredential
-from azure.ai.projects.models import FunctionTool, RequiredFunctionToolCall, SubmitToolOutputsAction, ToolOutput
+from azure.ai.projects.models import FunctionTool, ToolOutput
 from opentelemetry import trace
 from azure.monitor.opentelemetry import configure_azure_monitor
 from dotenv import load_dotenv
@@ -63,19 +62,30 @@ tracer = trace.get_tracer(__name__)
 setlist_api_key = os.environ.get("SETLISTFM_API_KEY", "YOUR_API_KEY")
 
 
+# One plugin (and HTTP connection pool) shared by all tool calls; the
+# synchronous FunctionTool callbacks hand its coroutines to a background loop.
+tool_loop = BackgroundLoop()
+plugin = SetlistFMPlugin(setlist_api_key)
+
+
+def run_plugin(call):
+    """Run an async SetlistFMPlugin call from the synchronous FunctionTool."""
+    return tool_loop.run(call(plugin))
+
+
 @trace_function()
 def search_artists(artist_name: str) -> str:
-    return SetlistFMPlugin(setlist_api_key).search_artists(artist_name)
+    return run_plugin(lambda plugin: plugin.search_artists(artist_name))
 
 
 @trace_function()
-def search_setlists(self, artist_name: str = "", city_name: str = "", country_code: str = "") -> str:
-    return SetlistFMPlugin(setlist_api_key).search_setlists(artist_name, city_name, country_code)
+def search_setlists(artist_name: str = "", city_name: str = "", country_code: str = "", page: int = 1) -> str:
+    return run_plugin(lambda plugin: plugin.search_setlists(artist_name, city_name, country_code, page))
 
 
 @trace_function()
 def get_setlist(setlist_id: str) -> str:
-    return SetlistFMPlugin(setlist_api_key).get_setlist(setlist_id)
+    return run_plugin(lambda plugin: plugin.get_setlist(setlist_id))
 
 
 # Statically defined user functions for fast reference
@@ -87,7 +97,7 @@ setlistfm_functions: Set[Callable[..., Any]] = {
 functions = FunctionTool(functions=setlistfm_functions)
 
 
-instructions = f"""
+instructions = """
         You are a helpful music assistant that provides information about artists, concerts, and setlists.
         You can search for artists, find setlists from concerts, and provide venue information.
         
@@ -118,47 +128,10 @@ with tracer.start_as_current_span(scenario):
         )
         print(f"Created message, ID: {message.id}")
 
-        run = project_client.agents.create_run(
-            thread_id=thread.id, agent_id=agent.id)
-        print(f"Created run, ID: {run.id}")
-
-        while run.status in ["queued", "in_progress", "requires_action"]:
-            time.sleep(1)
-            run = project_client.agents.get_run(
-                thread_id=thread.id, run_id=run.id)
-
-            if run.status == "requires_action" and isinstance(run.required_action, SubmitToolOutputsAction):
-                tool_calls = run.required_action.submit_tool_outputs.tool_calls
-                if not tool_calls:
-                    print("No tool calls provided - cancelling run")
-                    project_client.agents.cancel_run(
-                        thread_id=thread.id, run_id=run.id)
-                    break
-
-                tool_outputs = []
-                for tool_call in tool_calls:
-                    if isinstance(tool_call, RequiredFunctionToolCall):
-                        try:
-                            output = functions.execute(tool_call)
-                            tool_outputs.append(
-                                ToolOutput(
-                                    tool_call_id=tool_call.id,
-                                    output=output,
-                                )
-                            )
-                        except Exception as e:
-                            print(
-                                f"Error executing tool_call {tool_call.id}: {e}")
-
-                print(f"Tool outputs: {tool_outputs}")
-                if tool_outputs:
-                    project_client.agents.submit_tool_outputs_to_run(
-                        thread_id=thread.id, run_id=run.id, tool_outputs=tool_outputs
-                    )
-
-            print(f"Current run status: {run.status}")
-
-        print(f"Run completed with status: {run.status}")
+        with FoundryRunner(project_client.agents, functions.execute, make_output=ToolOutput) as runner:
+            result = runner.run(thread_id=thread.id, agent_id=agent.id)
+        print(f"Run completed with status: {result.status}")
+        print(f"Run timings: {result.timings.stats()}")
 
         # Delete the agent when done
         project_client.agents.delete_agent(agent.id)
@@ -167,3 +140,6 @@ with tracer.start_as_current_span(scenario):
         # Fetch and log all messages
         messages = project_client.agents.list_messages(thread_id=thread.id)
         print(f"Messages: {messages}")
+
+tool_loop.run(plugin.close())
+tool_loop.close()
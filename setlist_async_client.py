@@ -0,0 +1,225 @@
+import asyncio
+import logging
+import time
+import aiohttp
+from collections import deque
+from datetime import date
+from typing import Optional, Dict, Any, AsyncIterator, Awaitable, Callable, Iterable
+
+from batch import BatchResult, timed_call_async
+from setlist_cache import ResponseCache, CacheEntry
+from setlist_client import SetlistFMClient, before_since, page_count, search_setlists_params
+from setlist_models import Setlist, to_model
+from setlist_ratelimit import RETRY_STATUSES, AsyncSingleFlight, retry_delay, shared_limiter
+
+logger = logging.getLogger(__name__)
+
+
+async def open_connections(session: aiohttp.ClientSession, url: str, count: int) -> int:
+    """Open count keep-alive connections to url's host with concurrent HEAD requests.
+
+    Whatever status the server answers with, the connection (DNS lookup, TCP
+    and TLS handshakes) stays in the pool for the next real request.
+    Returns how many connections were opened.
+    """
+    async def open_one():
+        try:
+            async with session.head(url, allow_redirects=False) as response:
+                await response.read()
+            return True
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Could not open a connection to {url}: {e}")
+            return False
+
+    return sum(await asyncio.gather(*[open_one() for _ in range(max(1, count))]))
+
+
+class AsyncSetlistFMClient(SetlistFMClient):
+    """asyncio-native setlist.fm client.
+
+    Exposes the same methods as SetlistFMClient (get_artist, search_setlists,
+    get_venue_setlists, ...) but every call returns an awaitable. All requests
+    go through a single keep-alive connection pool, so waiting on setlist.fm
+    never blocks the event loop. Caching, rate limiting, retries and request
+    coalescing behave as in SetlistFMClient; the rate limiter is shared with
+    sync clients using the same API key.
+    """
+
+    def __init__(self, api_key: str, language: str = "en", pool_size: int = 20,
+                 keepalive_timeout: float = 30.0, timeout: float = 10.0, connect_timeout: float = 5.0,
+                 cache_size: int = 256, cache_ttls: Optional[Dict[str, float]] = None,
+                 rate_limit: Optional[float] = 2.0, burst: int = 2, max_retries: int = 3, typed: bool = False,
+                 transport=None):
+        self.api_key = api_key
+        self.language = language
+        self.cache = ResponseCache(max_size=cache_size, ttls=cache_ttls) if cache_size > 0 else None
+        self.limiter = shared_limiter(api_key, rate_limit, burst) if rate_limit else None
+        self.max_retries = max_retries
+        self.typed = typed
+        self.transport = transport
+        self._inflight = AsyncSingleFlight()
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(
+            total=timeout, connect=connect_timeout)
+        self.headers = self._default_headers()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # A session is bound to the loop it was created on; build a new one if
+        # the client is reused from another loop (e.g. successive asyncio.run).
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(
+                headers=self.headers, connector=connector, timeout=self.timeout)
+            if self.transport is not None:
+                self._session = self.transport.wrap_async(self._session)
+            self._loop = loop
+        return self._session
+
+    async def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, model=None) -> Any:
+        return to_model(model if self.typed else None, await self._get_json(endpoint, params))
+
+    async def _get_json(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        key = ResponseCache.make_key(endpoint, params, self.language)
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(key)
+            if entry is not None and entry.fresh:
+                return entry.value
+        return await self._inflight.do(key, lambda: self._fetch(key, endpoint, params, entry))
+
+    async def _fetch(self, key: tuple, endpoint: str, params: Optional[Dict[str, Any]], entry: Optional[CacheEntry]) -> Any:
+        url = f"{self.BASE_URL}{endpoint}"
+        headers = ResponseCache.conditional_headers(entry)
+        session = self._get_session()
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                await self.limiter.acquire_async()
+            async with session.get(url, params=params, headers=headers) as response:
+                if response.status in RETRY_STATUSES and attempt < self.max_retries:
+                    delay = retry_delay(
+                        attempt, response.headers.get("Retry-After"))
+                    logger.warning(
+                        f"setlist.fm returned {response.status} for {endpoint}, retrying in {delay:.2f}s")
+                else:
+                    if response.status == 304 and entry is not None:
+                        return self.cache.revalidated(key, entry)
+                    response.raise_for_status()
+                    data = await response.json()
+                    if self.cache is not None:
+                        self.cache.store(key, data, response.headers.get(
+                            "ETag"), response.headers.get("Last-Modified"))
+                    return data
+            await asyncio.sleep(delay)
+
+    async def _batch(self, fetch: Callable[[str], Awaitable[Any]], ids: Iterable[str], concurrency: int) -> BatchResult:
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def run(id):
+            async with semaphore:
+                return await timed_call_async(id, fetch, id)
+
+        start = time.perf_counter()
+        items = await asyncio.gather(*[run(id) for id in ids])
+        return BatchResult(list(items), time.perf_counter() - start, concurrency)
+
+    async def get_setlists(self, setlist_ids: Iterable[str], concurrency: int = 8) -> BatchResult:
+        """Get many setlists by id over the shared pool (see SetlistFMClient.get_setlists)."""
+        return await self._batch(self.get_setlist, setlist_ids, concurrency)
+
+    async def get_artists(self, mbids: Iterable[str], concurrency: int = 8) -> BatchResult:
+        """Get many artists by Musicbrainz ID."""
+        return await self._batch(self.get_artist, mbids, concurrency)
+
+    async def get_venues(self, venue_ids: Iterable[str], concurrency: int = 8) -> BatchResult:
+        """Get many venues by venueId."""
+        return await self._batch(self.get_venue, venue_ids, concurrency)
+
+    async def _iter_pages(self, fetch_page: Callable[[int], Awaitable[Any]], prefetch: int, max_items: Optional[int],
+                          since: Optional[date], stop: Optional[Callable[[Dict[str, Any]], bool]]) -> AsyncIterator[Dict[str, Any]]:
+        try:
+            page = await fetch_page(1)
+        except aiohttp.ClientResponseError as e:
+            # setlist.fm answers 404 when a listing has no setlists
+            if e.status == 404:
+                return
+            raise
+        pages = page_count(page, max_items)
+        next_page = 2
+        pending = deque()
+        yielded = 0
+        try:
+            while True:
+                while next_page <= pages and len(pending) < prefetch:
+                    pending.append(asyncio.ensure_future(fetch_page(next_page)))
+                    next_page += 1
+                for setlist in page.get("setlist", []):
+                    if before_since(setlist, since):
+                        return
+                    item = to_model(Setlist if self.typed else None, setlist)
+                    if stop is not None and stop(item):
+                        return
+                    yield item
+                    yielded += 1
+                    if max_items is not None and yielded >= max_items:
+                        return
+                if pending:
+                    page = await pending.popleft()
+                elif next_page <= pages:
+                    page = await fetch_page(next_page)
+                    next_page += 1
+                else:
+                    return
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def iter_artist_setlists(self, mbid: str, prefetch: int = 2, max_items: Optional[int] = None,
+                             since: Optional[date] = None, stop: Optional[Callable[[Dict[str, Any]], bool]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterate an artist's setlists across all pages, newest first.
+
+        See SetlistFMClient.iter_artist_setlists; prefetched pages are
+        concurrent tasks on the event loop.
+        """
+        return self._iter_pages(lambda p: self._get_json(f"/artist/{mbid}/setlists", {"p": p}), prefetch, max_items, since, stop)
+
+    def iter_search_setlists(self, artist_mbid: Optional[str] = None, artist_name: Optional[str] = None, city_name: Optional[str] = None,
+                             country_code: Optional[str] = None, prefetch: int = 2, max_items: Optional[int] = None,
+                             since: Optional[date] = None, stop: Optional[Callable[[Dict[str, Any]], bool]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterate setlist search results across all pages."""
+        return self._iter_pages(lambda p: self._get_json("/search/setlists", search_setlists_params(artist_mbid, artist_name, city_name, country_code, p)),
+                                prefetch, max_items, since, stop)
+
+    def iter_venue_setlists(self, venue_id: str, prefetch: int = 2, max_items: Optional[int] = None,
+                            since: Optional[date] = None, stop: Optional[Callable[[Dict[str, Any]], bool]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """Async-iterate a venue's setlists across all pages."""
+        return self._iter_pages(lambda p: self._get_json(f"/venue/{venue_id}/setlists", {"p": p}), prefetch, max_items, since, stop)
+
+    async def warm(self, connections: int = 2) -> int:
+        """Open keep-alive connections ahead of the first request; nothing to do with a transport.
+
+        HEAD requests to the API root are neither rate limited nor cached.
+        """
+        if self.transport is not None:
+            return 0
+        return await open_connections(self._get_session(), self.BASE_URL, min(connections, self.pool_size))
+
+    async def close(self) -> None:
+        """Close the underlying connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    async def __aenter__(self) -> "AsyncSetlistFMClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -0,0 +1,116 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
+
+
+# TTL in seconds by endpoint pattern; the first matching pattern wins.
+DEFAULT_TTLS: Dict[str, float] = {
+    r"^/setlist/": 7 * 24 * 3600,        # a setlist by id almost never changes
+    r"^/(artist|venue)/[^/]+$": 24 * 3600,
+    r"/setlists$": 3600,
+    r"^/search/": 15 * 60,
+}
+DEFAULT_TTL = 10 * 60
+
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at", "etag", "last_modified")
+
+    def __init__(self, value: Any, expires_at: float, etag: Optional[str] = None, last_modified: Optional[str] = None):
+        self.value = value
+        self.expires_at = expires_at
+        self.etag = etag
+        self.last_modified = last_modified
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires_at
+
+
+class ResponseCache:
+    """Bounded LRU cache of setlist.fm responses with a TTL per endpoint.
+
+    Expired entries are kept until evicted so they can be revalidated with
+    If-None-Match / If-Modified-Since instead of being downloaded again.
+    """
+
+    def __init__(self, max_size: int = 256, ttls: Optional[Dict[str, float]] = None, default_ttl: float = DEFAULT_TTL):
+        self.max_size = max_size
+        self.ttls = [(re.compile(pattern), ttl)
+                     for pattern, ttl in (ttls if ttls is not None else DEFAULT_TTLS).items()]
+        self.default_ttl = default_ttl
+        self._entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.revalidations = 0
+
+    @staticmethod
+    def make_key(endpoint: str, params: Optional[Dict[str, Any]], language: str) -> Tuple:
+        items = tuple(sorted((k, str(v)) for k, v in (params or {}).items()))
+        return (endpoint, items, language)
+
+    def ttl_for(self, endpoint: str) -> float:
+        for pattern, ttl in self.ttls:
+            if pattern.search(endpoint):
+                return ttl
+        return self.default_ttl
+
+    def lookup(self, key: Tuple) -> Optional[CacheEntry]:
+        """Return the entry for key (fresh or stale) and count a hit or miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            if entry.fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return entry
+
+    @staticmethod
+    def conditional_headers(entry: Optional[CacheEntry]) -> Dict[str, str]:
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key: Tuple, value: Any, etag: Optional[str] = None, last_modified: Optional[str] = None) -> None:
+        if self.max_size <= 0:
+            return
+        entry = CacheEntry(value, time.monotonic() + self.ttl_for(key[0]), etag, last_modified)
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def revalidated(self, key: Tuple, entry: CacheEntry) -> Any:
+        """Extend a stale entry after a 304 Not Modified and return its value."""
+        with self._lock:
+            entry.expires_at = time.monotonic() + self.ttl_for(key[0])
+            self.revalidations += 1
+        return entry.value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "revalidations": self.revalidations,
+        }
@@ -1,61 +1,245 @@
-
+import math
+import time
+import logging
 import requests
-from typing import Optional, Dict, Any
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Optional, Dict, Any, Callable, Iterable, Iterator
+from requests.adapters import HTTPAdapter
+
+from batch import BatchResult, timed_call
+from setlist_cache import ResponseCache, CacheEntry
+from setlist_models import Artist, ArtistPage, Setlist, SetlistPage, Venue, parse_event_date, to_model
+from setlist_ratelimit import RETRY_STATUSES, SingleFlight, retry_delay, shared_limiter
+
+logger = logging.getLogger(__name__)
+
+
+def page_count(first_page: Dict[str, Any], max_items: Optional[int] = None) -> int:
+    """Number of pages to read given the first page of a listing.
+
+    When max_items is set, pages that could only hold items past that limit
+    are never fetched.
+    """
+    per_page = first_page.get("itemsPerPage") or len(
+        first_page.get("setlist", [])) or 1
+    total = first_page.get("total", 0)
+    if max_items is not None:
+        total = min(total, max_items)
+    return max(1, math.ceil(total / per_page))
+
+
+def before_since(setlist: Dict[str, Any], since: Optional[date]) -> bool:
+    """Whether a raw setlist is older than since.
+
+    Listings are ordered newest first, so the first such show ends an
+    iteration.
+    """
+    return since is not None and bool(setlist.get("eventDate")) and parse_event_date(setlist["eventDate"]) < since
+
+
+def search_setlists_params(artist_mbid: Optional[str] = None, artist_name: Optional[str] = None, city_name: Optional[str] = None,
+                           country_code: Optional[str] = None, page: int = 1) -> Dict[str, Any]:
+    params = {"p": page}
+    if artist_name:
+        params["artistName"] = artist_name
+    if artist_mbid:
+        params["artistMbid"] = artist_mbid
+    if city_name:
+        params["cityName"] = city_name
+    if country_code:
+        params["countryCode"] = country_code
+    return params
 
 
 class SetlistFMClient:
     BASE_URL = "https://api.setlist.fm/rest/1.0"
 
-    def __init__(self, api_key: str, language: str = "en"):
+    def __init__(self, api_key: str, language: str = "en", cache_size: int = 256,
+                 cache_ttls: Optional[Dict[str, float]] = None, rate_limit: Optional[float] = 2.0,
+                 burst: int = 2, max_retries: int = 3, pool_size: int = 10, typed: bool = False,
+                 transport=None):
+        """Create a client.
+
+        Responses are cached in-process (LRU, TTL per endpoint pattern);
+        pass cache_size=0 to disable the cache. Requests are throttled by a
+        token bucket shared by every client using the same API key
+        (rate_limit requests per second, None to disable; the first client
+        of a key sets the rate for all of them), throttled or
+        unavailable responses are retried up to max_retries times, and
+        identical concurrent requests are collapsed into one. pool_size
+        bounds the keep-alive connections used by concurrent batch calls.
+        With typed=True methods return the compact models of setlist_models
+        instead of raw dicts. transport (see transport.py) records or
+        replays HTTP traffic instead of only hitting the network.
+        """
         self.api_key = api_key
         self.language = language
+        self.cache = ResponseCache(max_size=cache_size, ttls=cache_ttls) if cache_size > 0 else None
+        self.limiter = shared_limiter(api_key, rate_limit, burst) if rate_limit else None
+        self.max_retries = max_retries
+        self.typed = typed
+        self._inflight = SingleFlight()
         self.session = requests.Session()
-        self.session.headers.update({
+        self.session.headers.update(self._default_headers())
+        self.session.mount("https://", HTTPAdapter(pool_maxsize=pool_size))
+        if transport is not None:
+            transport.mount(self.session)
+
+    def _default_headers(self) -> Dict[str, str]:
+        return {
             "x-api-key": self.api_key,
             "Accept": "application/json",
             "Accept-Language": self.language,
             "User-Agent": "setlistfm-python-client/1.0"
-        })
+        }
 
-    def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    def _get(self, endpoint: str, params: Optional[Dict[str, Any]] = None, model=None) -> Any:
+        return to_model(model if self.typed else None, self._get_json(endpoint, params))
+
+    def _get_json(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        key = ResponseCache.make_key(endpoint, params, self.language)
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(key)
+            if entry is not None and entry.fresh:
+                return entry.value
+        return self._inflight.do(key, lambda: self._fetch(key, endpoint, params, entry))
+
+    def _fetch(self, key: tuple, endpoint: str, params: Optional[Dict[str, Any]], entry: Optional[CacheEntry]) -> Any:
         url = f"{self.BASE_URL}{endpoint}"
-        response = self.session.get(url, params=params)
+        headers = ResponseCache.conditional_headers(entry)
+        for attempt in range(self.max_retries + 1):
+            if self.limiter is not None:
+                self.limiter.acquire()
+            response = self.session.get(url, params=params, headers=headers)
+            if response.status_code not in RETRY_STATUSES or attempt == self.max_retries:
+                break
+            delay = retry_delay(attempt, response.headers.get("Retry-After"))
+            logger.warning(
+                f"setlist.fm returned {response.status_code} for {endpoint}, retrying in {delay:.2f}s")
+            time.sleep(delay)
+
+        if response.status_code == 304 and entry is not None:
+            return self.cache.revalidated(key, entry)
         response.raise_for_status()
-        return response.json()
+        data = response.json()
+        if self.cache is not None:
+            self.cache.store(key, data, response.headers.get(
+                "ETag"), response.headers.get("Last-Modified"))
+        return data
 
     def get_artist(self, mbid: str) -> Any:
         """Get artist info by Musicbrainz ID (mbid)."""
-        return self._get(f"/artist/{mbid}")
+        return self._get(f"/artist/{mbid}", model=Artist)
 
     def get_artist_setlists(self, mbid: str, page: int = 1) -> Any:
         """Get setlists for an artist by Musicbrainz ID (mbid)."""
-        return self._get(f"/artist/{mbid}/setlists", params={"p": page})
+        return self._get(f"/artist/{mbid}/setlists", params={"p": page}, model=SetlistPage)
 
     def search_artists(self, artist_name: str, sort: str = "relevance", page: int = 1) -> Any:
         """Search for artists by name."""
-        return self._get("/search/artists", params={"artistName": artist_name, "p": page, "sort": sort})
+        return self._get("/search/artists", params={"artistName": artist_name, "p": page, "sort": sort}, model=ArtistPage)
 
     def search_setlists(self, artist_mbid: Optional[str] = None, artist_name: Optional[str] = None, city_name: Optional[str] = None, country_code: Optional[str] = None, page: int = 1) -> Any:
         """Search for setlists by artist, city, or country."""
-        params = {"p": page}
-        if artist_name:
-            params["artistName"] = artist_name
-        if artist_mbid:
-            params["artistMbid"] = artist_mbid
-        if city_name:
-            params["cityName"] = city_name
-        if country_code:
-            params["countryCode"] = country_code
-        return self._get("/search/setlists", params=params)
+        params = search_setlists_params(
+            artist_mbid, artist_name, city_name, country_code, page)
+        return self._get("/search/setlists", params=params, model=SetlistPage)
 
     def get_setlist(self, setlist_id: str) -> Any:
         """Get a setlist by its unique setlistId."""
-        return self._get(f"/setlist/{setlist_id}")
+        return self._get(f"/setlist/{setlist_id}", model=Setlist)
 
     def get_venue(self, venue_id: str) -> Any:
         """Get venue info by venueId."""
-        return self._get(f"/venue/{venue_id}")
+        return self._get(f"/venue/{venue_id}", model=Venue)
 
     def get_venue_setlists(self, venue_id: str, page: int = 1) -> Any:
         """Get setlists for a venue by venueId."""
-        return self._get(f"/venue/{venue_id}/setlists", params={"p": page})
+        return self._get(f"/venue/{venue_id}/setlists", params={"p": page}, model=SetlistPage)
+
+    def _batch(self, fetch: Callable[[str], Any], ids: Iterable[str], concurrency: int) -> BatchResult:
+        ids = list(ids)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+            items = list(pool.map(lambda id: timed_call(id, fetch, id), ids))
+        return BatchResult(items, time.perf_counter() - start, concurrency)
+
+    def get_setlists(self, setlist_ids: Iterable[str], concurrency: int = 8) -> BatchResult:
+        """Get many setlists by id with bounded concurrency.
+
+        Results keep input order; a failed lookup is reported on its item
+        instead of aborting the batch.
+        """
+        return self._batch(self.get_setlist, setlist_ids, concurrency)
+
+    def get_artists(self, mbids: Iterable[str], concurrency: int = 8) -> BatchResult:
+        """Get many artists by Musicbrainz ID (see get_setlists)."""
+        return self._batch(self.get_artist, mbids, concurrency)
+
+    def get_venues(self, venue_ids: Iterable[str], concurrency: int = 8) -> BatchResult:
+        """Get many venues by venueId (see get_setlists)."""
+        return self._batch(self.get_venue, venue_ids, concurrency)
+
+    def _iter_pages(self, fetch_page: Callable[[int], Any], prefetch: int, max_items: Optional[int],
+                    since: Optional[date], stop: Optional[Callable[[Dict[str, Any]], bool]]) -> Iterator[Dict[str, Any]]:
+        try:
+            page = fetch_page(1)
+        except requests.HTTPError as e:
+            # setlist.fm answers 404 when a listing has no setlists
+            if e.response is not None and e.response.status_code == 404:
+                return
+            raise
+        pages = page_count(page, max_items)
+        next_page = 2
+        pending = deque()
+        pool = ThreadPoolExecutor(max_workers=max(1, prefetch))
+        yielded = 0
+        try:
+            while True:
+                while next_page <= pages and len(pending) < prefetch:
+                    pending.append(pool.submit(fetch_page, next_page))
+                    next_page += 1
+                for setlist in page.get("setlist", []):
+                    if before_since(setlist, since):
+                        return
+                    item = to_model(Setlist if self.typed else None, setlist)
+                    if stop is not None and stop(item):
+                        return
+                    yield item
+                    yielded += 1
+                    if max_items is not None and yielded >= max_items:
+                        return
+                if pending:
+                    page = pending.popleft().result()
+                elif next_page <= pages:
+                    page = fetch_page(next_page)
+                    next_page += 1
+                else:
+                    return
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def iter_artist_setlists(self, mbid: str, prefetch: int = 2, max_items: Optional[int] = None,
+                             since: Optional[date] = None, stop: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield an artist's setlists across all pages, newest first.
+
+        The next prefetch pages are fetched concurrently while the current one
+        is consumed. Iteration ends after max_items setlists, at the first show
+        before since, or at the first setlist for which stop returns True.
+        """
+        return self._iter_pages(lambda p: self._get_json(f"/artist/{mbid}/setlists", {"p": p}), prefetch, max_items, since, stop)
+
+    def iter_search_setlists(self, artist_mbid: Optional[str] = None, artist_name: Optional[str] = None, city_name: Optional[str] = None,
+                             country_code: Optional[str] = None, prefetch: int = 2, max_items: Optional[int] = None,
+                             since: Optional[date] = None, stop: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield setlist search results across all pages (see iter_artist_setlists)."""
+        return self._iter_pages(lambda p: self._get_json("/search/setlists", search_setlists_params(artist_mbid, artist_name, city_name, country_code, p)),
+                                prefetch, max_items, since, stop)
+
+    def iter_venue_setlists(self, venue_id: str, prefetch: int = 2, max_items: Optional[int] = None,
+                            since: Optional[date] = None, stop: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Iterator[Dict[str, Any]]:
+        """Yield a venue's setlists across all pages (see iter_artist_setlists)."""
+        return self._iter_pages(lambda p: self._get_json(f"/venue/{venue_id}/setlists", {"p": p}), prefetch, max_items, since, stop)
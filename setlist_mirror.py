@@ -0,0 +1,156 @@
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Optional, Dict, Any, List
+
+from setlist_client import SetlistFMClient
+from setlist_models import parse_event_date
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artists (
+    mbid TEXT PRIMARY KEY,
+    name TEXT NOT NULL COLLATE NOCASE,
+    synced_at REAL
+);
+CREATE TABLE IF NOT EXISTS setlists (
+    id TEXT PRIMARY KEY,
+    artist_mbid TEXT NOT NULL,
+    event_date TEXT NOT NULL,
+    last_updated TEXT,
+    venue_id TEXT,
+    venue_name TEXT,
+    city_name TEXT COLLATE NOCASE,
+    country_code TEXT COLLATE NOCASE,
+    tour TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_setlists_artist_date ON setlists (artist_mbid, event_date DESC);
+CREATE INDEX IF NOT EXISTS idx_setlists_date ON setlists (event_date);
+CREATE INDEX IF NOT EXISTS idx_setlists_venue ON setlists (venue_id);
+CREATE INDEX IF NOT EXISTS idx_setlists_city ON setlists (city_name);
+CREATE INDEX IF NOT EXISTS idx_artists_name ON artists (name);
+"""
+
+
+class SetlistMirror:
+    """Local SQLite mirror of the full setlist history of selected artists.
+
+    sync() walks SetlistFMClient.iter_artist_setlists newest first and stops
+    as soon as it reaches shows that are already stored and unchanged, so
+    after the first crawl only new pages are fetched.
+    """
+
+    def __init__(self, client: SetlistFMClient, path: str = "setlists.db"):
+        if client.typed:
+            raise ValueError("SetlistMirror needs a client returning raw payloads (typed=False)")
+        self.client = client
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def sync(self, mbid: str, name: Optional[str] = None) -> int:
+        """Mirror new and updated setlists of an artist; return how many were written."""
+        with self._lock:
+            stored = {row["id"]: row["last_updated"] for row in self._conn.execute(
+                "SELECT id, last_updated FROM setlists WHERE artist_mbid = ?", (mbid,))}
+            newest = self._conn.execute(
+                "SELECT MAX(event_date) FROM setlists WHERE artist_mbid = ?", (mbid,)).fetchone()[0]
+
+        def up_to_date(setlist: Dict[str, Any]) -> bool:
+            # Shows on the newest stored date may still be edited, so only
+            # stop once an unchanged show older than that is reached.
+            return (newest is not None and _iso_date(setlist) < newest
+                    and stored.get(setlist["id"]) == setlist.get("lastUpdated"))
+
+        # prefetch only helps the first full crawl; incremental syncs usually
+        # end within the first page
+        prefetch = 2 if newest is None else 0
+        rows = []
+        for setlist in self.client.iter_artist_setlists(mbid, prefetch=prefetch, stop=up_to_date):
+            if stored.get(setlist["id"]) != setlist.get("lastUpdated"):
+                rows.append(_row(mbid, setlist))
+            if name is None:
+                name = (setlist.get("artist") or {}).get("name")
+
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO setlists VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT INTO artists (mbid, name, synced_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(mbid) DO UPDATE SET name = COALESCE(excluded.name, artists.name), synced_at = excluded.synced_at",
+                (mbid, name or mbid, time.time()))
+        logger.info(f"Mirrored {len(rows)} new or updated setlists for {name or mbid}")
+        return len(rows)
+
+    def find_artist(self, artist_name: str, max_age: Optional[float] = None) -> Optional[str]:
+        """Return the mbid of a mirrored artist by name, if synced within max_age seconds."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT mbid, synced_at FROM artists WHERE name = ?", (artist_name,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row["synced_at"] > max_age):
+            return None
+        return row["mbid"]
+
+    def get_setlist(self, setlist_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload FROM setlists WHERE id = ?", (setlist_id,)).fetchone()
+        return json.loads(row["payload"]) if row else None
+
+    def search_setlists(self, artist_mbid: str, city_name: Optional[str] = None, country_code: Optional[str] = None,
+                        page: int = 1, items_per_page: int = 20) -> Dict[str, Any]:
+        """Query mirrored setlists, shaped like setlist.fm's /search/setlists answer."""
+        where = ["artist_mbid = ?"]
+        args: List[Any] = [artist_mbid]
+        if city_name:
+            where.append("city_name = ?")
+            args.append(city_name)
+        if country_code:
+            where.append("country_code = ?")
+            args.append(country_code)
+        clause = " AND ".join(where)
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM setlists WHERE {clause}", args).fetchone()[0]
+            rows = self._conn.execute(
+                f"SELECT payload FROM setlists WHERE {clause} ORDER BY event_date DESC LIMIT ? OFFSET ?",
+                args + [items_per_page, (page - 1) * items_per_page]).fetchall()
+        return {"type": "setlists", "itemsPerPage": items_per_page, "page": page, "total": total,
+                "setlist": [json.loads(row["payload"]) for row in rows]}
+
+
+def _iso_date(setlist: Dict[str, Any]) -> str:
+    return parse_event_date(setlist["eventDate"]).isoformat()
+
+
+def _row(mbid: str, setlist: Dict[str, Any]) -> tuple:
+    venue = setlist.get("venue") or {}
+    city = venue.get("city") or {}
+    return (setlist["id"], mbid, _iso_date(setlist), setlist.get("lastUpdated"), venue.get("id"), venue.get("name"),
+            city.get("name"), (city.get("country") or {}).get("code"), (setlist.get("tour") or {}).get("name"),
+            json.dumps(setlist, separators=(",", ":")))
+
+
+if __name__ == "__main__":
+    import os
+    import sys
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    client = SetlistFMClient(api_key=os.environ.get("SETLISTFM_API_KEY", "YOUR_API_KEY"))
+    mirror = SetlistMirror(client, os.environ.get("SETLISTFM_MIRROR", "setlists.db"))
+    # Usage: python setlist_mirror.py "Artist Name" ...
+    for artist_name in sys.argv[1:]:
+        artist = client.search_artists(artist_name)["artist"][0]
+        mirror.sync(artist["mbid"], artist["name"])
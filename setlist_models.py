@@ -0,0 +1,215 @@
+"""Compact typed models for setlist.fm payloads (see setlistfm_openapi.json).
+
+Models use __slots__ and interned strings for the values repeated across
+thousands of shows (artist, city and country names). The sets and songs of a
+Setlist are only parsed when first accessed.
+"""
+import sys
+from datetime import date, datetime
+from typing import Optional, Dict, Any, List, Tuple
+
+
+def parse_event_date(event_date: str) -> date:
+    """Parse setlist.fm's dd-MM-yyyy eventDate."""
+    return datetime.strptime(event_date, "%d-%m-%Y").date()
+
+
+def _intern(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+class Model:
+    __slots__ = ()
+
+    @classmethod
+    def fields(cls) -> Tuple[str, ...]:
+        """Public slot names, including inherited ones."""
+        return tuple(name for klass in reversed(cls.__mro__) for name in getattr(klass, "__slots__", ())
+                     if not name.startswith("_"))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.fields())
+        return f"{type(self).__name__}({fields})"
+
+    def __eq__(self, other) -> bool:
+        return type(self) is type(other) and all(
+            getattr(self, name) == getattr(other, name) for name in self.fields())
+
+
+class Artist(Model):
+    __slots__ = ("mbid", "name", "sort_name", "disambiguation", "url", "tmid")
+
+    def __init__(self, mbid: str, name: str, sort_name: Optional[str] = None, disambiguation: Optional[str] = None,
+                 url: Optional[str] = None, tmid: Optional[int] = None):
+        self.mbid = mbid
+        self.name = name
+        self.sort_name = sort_name
+        self.disambiguation = disambiguation
+        self.url = url
+        self.tmid = tmid
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Artist":
+        return cls(data.get("mbid"), _intern(data.get("name")), _intern(data.get("sortName")),
+                   data.get("disambiguation") or None, data.get("url"), data.get("tmid"))
+
+
+class City(Model):
+    __slots__ = ("id", "name", "state", "state_code", "country_code", "country_name", "lat", "long")
+
+    def __init__(self, id: str, name: str, state: Optional[str] = None, state_code: Optional[str] = None,
+                 country_code: Optional[str] = None, country_name: Optional[str] = None,
+                 lat: Optional[float] = None, long: Optional[float] = None):
+        self.id = id
+        self.name = name
+        self.state = state
+        self.state_code = state_code
+        self.country_code = country_code
+        self.country_name = country_name
+        self.lat = lat
+        self.long = long
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "City":
+        country = data.get("country") or {}
+        coords = data.get("coords") or {}
+        return cls(data.get("id"), _intern(data.get("name")), _intern(data.get("state")), _intern(data.get("stateCode")),
+                   _intern(country.get("code")), _intern(country.get("name")), coords.get("lat"), coords.get("long"))
+
+
+class Venue(Model):
+    __slots__ = ("id", "name", "url", "city")
+
+    def __init__(self, id: str, name: str, url: Optional[str] = None, city: Optional[City] = None):
+        self.id = id
+        self.name = name
+        self.url = url
+        self.city = city
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Venue":
+        city = data.get("city")
+        return cls(data.get("id"), _intern(data.get("name")), data.get("url"), City.from_json(city) if city else None)
+
+
+class Song(Model):
+    __slots__ = ("name", "info", "tape", "cover", "with_artist")
+
+    def __init__(self, name: str, info: Optional[str] = None, tape: bool = False,
+                 cover: Optional[Artist] = None, with_artist: Optional[Artist] = None):
+        self.name = name
+        self.info = info
+        self.tape = tape
+        self.cover = cover
+        self.with_artist = with_artist
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Song":
+        cover = data.get("cover")
+        with_artist = data.get("with")
+        return cls(_intern(data.get("name")), data.get("info"), bool(data.get("tape", False)),
+                   Artist.from_json(cover) if cover else None,
+                   Artist.from_json(with_artist) if with_artist else None)
+
+
+class Set(Model):
+    __slots__ = ("name", "encore", "songs")
+
+    def __init__(self, songs: Tuple[Song, ...], name: Optional[str] = None, encore: Optional[int] = None):
+        self.songs = songs
+        self.name = name
+        self.encore = encore
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Set":
+        return cls(tuple(Song.from_json(song) for song in data.get("song", [])),
+                   data.get("name"), data.get("encore"))
+
+
+class Setlist(Model):
+    __slots__ = ("id", "version_id", "event_date", "last_updated", "url", "info", "tour", "artist", "venue",
+                 "_raw_sets", "_sets")
+
+    def __init__(self, id: str, event_date: str, artist: Optional[Artist] = None, venue: Optional[Venue] = None,
+                 version_id: Optional[str] = None, last_updated: Optional[str] = None, url: Optional[str] = None,
+                 info: Optional[str] = None, tour: Optional[str] = None, raw_sets: Optional[List[Dict[str, Any]]] = None):
+        self.id = id
+        self.version_id = version_id
+        self.event_date = event_date
+        self.last_updated = last_updated
+        self.url = url
+        self.info = info
+        self.tour = tour
+        self.artist = artist
+        self.venue = venue
+        self._raw_sets = raw_sets or []
+        self._sets = None
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Setlist":
+        # the API nests sets as {"sets": {"set": [...]}}, the schema as {"set": [...]}
+        raw_sets = (data.get("sets") or {}).get("set") or data.get("set")
+        artist = data.get("artist")
+        venue = data.get("venue")
+        return cls(data.get("id"), data.get("eventDate"),
+                   Artist.from_json(artist) if artist else None,
+                   Venue.from_json(venue) if venue else None,
+                   data.get("versionId"), data.get("lastUpdated"), data.get("url"), data.get("info"),
+                   _intern((data.get("tour") or {}).get("name")), raw_sets)
+
+    @property
+    def sets(self) -> Tuple[Set, ...]:
+        if self._sets is None:
+            self._sets = tuple(Set.from_json(s) for s in self._raw_sets)
+            self._raw_sets = None
+        return self._sets
+
+    @property
+    def songs(self) -> List[Song]:
+        """All songs of the show in order, across sets and encores."""
+        return [song for s in self.sets for song in s.songs]
+
+    @property
+    def date(self) -> Optional[date]:
+        return parse_event_date(self.event_date) if self.event_date else None
+
+
+class Page(Model):
+    """One page of a listing endpoint."""
+    __slots__ = ("items", "total", "page", "items_per_page")
+    KEY = ""
+    ITEM = Model
+
+    def __init__(self, items: List[Model], total: int = 0, page: int = 1, items_per_page: int = 0):
+        self.items = items
+        self.total = total
+        self.page = page
+        self.items_per_page = items_per_page
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "Page":
+        return cls([cls.ITEM.from_json(item) for item in data.get(cls.KEY, [])],
+                   data.get("total", 0), data.get("page", 1), data.get("itemsPerPage", 0))
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+
+class ArtistPage(Page):
+    __slots__ = ()
+    KEY = "artist"
+    ITEM = Artist
+
+
+class SetlistPage(Page):
+    __slots__ = ()
+    KEY = "setlist"
+    ITEM = Setlist
+
+
+def to_model(model, data: Any) -> Any:
+    """Convert a raw payload with model.from_json, or return it unchanged when model is None."""
+    return data if model is None else model.from_json(data)
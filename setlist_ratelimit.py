@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Dict, Any, Callable, Awaitable, Hashable
+
+
+# Statuses worth retrying: rate limited or a transient upstream failure.
+RETRY_STATUSES = (429, 502, 503, 504)
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Thread-safe token bucket usable from both threads and coroutines.
+
+    Callers reserve a token and then sleep until it is due, so waiters are
+    served in order and never spin on the lock.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens +
+                               (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+_limiters: Dict[str, TokenBucket] = {}
+_limiters_lock = threading.Lock()
+
+
+def shared_limiter(api_key: str, rate: float = 2.0, burst: int = 2) -> TokenBucket:
+    """Return the process-wide limiter for an API key, creating it on first use.
+
+    setlist.fm enforces its quota per key, so every client using the same key
+    in this process draws from the same bucket. The first caller decides its
+    rate and burst; a later caller asking for different ones gets the
+    existing bucket and a warning.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(api_key)
+        if limiter is None:
+            limiter = _limiters[api_key] = TokenBucket(rate, burst)
+        elif (limiter.rate, limiter.burst) != (rate, burst):
+            logger.warning(f"Rate limiter for this API key already runs at {limiter.rate}/s (burst "
+                           f"{limiter.burst}); ignoring the requested {rate}/s (burst {burst})")
+        return limiter
+
+
+def retry_delay(attempt: int, retry_after: Optional[str] = None, base: float = 0.5, cap: float = 30.0) -> float:
+    """Seconds to wait before retry number attempt (0-based).
+
+    Honours a Retry-After header (seconds or HTTP date) when present, otherwise
+    uses exponential backoff. Jitter is added in both cases so that clients
+    throttled together do not retry together.
+    """
+    if retry_after:
+        try:
+            delay = float(retry_after)
+        except ValueError:
+            try:
+                delay = parsedate_to_datetime(
+                    retry_after).timestamp() - time.time()
+            except (TypeError, ValueError):
+                delay = None
+        if delay is not None:
+            return min(cap, max(0.0, delay)) + random.uniform(0, base)
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent identical calls into a single execution."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+
+class AsyncSingleFlight:
+    """asyncio flavour of SingleFlight; followers await the leader's task."""
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._tasks[key] = task
+            task.add_done_callback(lambda _: self._tasks.pop(key, None))
+        # shield so one cancelled caller does not cancel the shared request
+        return await asyncio.shield(task)
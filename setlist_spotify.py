@@ -0,0 +1,173 @@
+"""Resolve every song of a setlist to a Spotify track in one pass.
+
+SetlistTrackResolver searches Spotify for all songs of a setlist
+concurrently, each search scoped to the performing artist (or to the
+original artist for covers). Tape entries are skipped. Candidates are
+accepted on fuzzy title similarity, ignoring remaster/live/feat. suffixes,
+plus a matching artist. Song -> track results, misses included, are
+cached, so the same songs in the next show of the tour cost nothing.
+"""
+import asyncio
+import logging
+import re
+from collections import OrderedDict
+from difflib import SequenceMatcher
+from typing import Optional, Dict, Any, List, Tuple
+
+from semantic_kernel.functions import kernel_function
+
+from artist_identity import name_key
+from setlist_async_client import AsyncSetlistFMClient
+from spotify_async_client import AsyncSpotifyClient
+from tool_output import fit
+
+logger = logging.getLogger(__name__)
+
+# Below this title similarity a Spotify track is not taken as the song.
+MIN_TITLE_SCORE = 0.8
+# " - Remastered 2011", " (Live at Wembley)", " [feat. X]" and the like
+_SUFFIX = re.compile(r"\s*(\(|\[|\s-\s).*?(remaster|live|version|edit|mix|feat\.?|ft\.|mono|stereo|acoustic|demo).*$",
+                     re.IGNORECASE)
+
+
+def title_key(title: str) -> str:
+    return name_key(_SUFFIX.sub("", title))
+
+
+def setlist_songs(setlist: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Played songs of a raw setlist in order, with position, encore flag and the artist to search."""
+    performer = (setlist.get("artist") or {}).get("name", "")
+    songs = []
+    for s in (setlist.get("sets") or {}).get("set", []):
+        for song in s.get("song", []):
+            if not song.get("name") or song.get("tape"):
+                continue
+            cover = (song.get("cover") or {}).get("name")
+            songs.append({"position": len(songs) + 1, "song": song["name"], "encore": bool(s.get("encore")),
+                          "artist": cover or performer, "cover": bool(cover)})
+    return songs
+
+
+class SetlistTrackResolver:
+    """Match setlist songs to Spotify tracks.
+
+    Args:
+        spotify_client: AsyncSpotifyClient used for the searches
+        cache_size: Song -> track results kept (LRU)
+        concurrency: Spotify searches in flight at once
+    """
+
+    def __init__(self, spotify_client: AsyncSpotifyClient, cache_size: int = 2048, concurrency: int = 8):
+        self.spotify_client = spotify_client
+        self.cache_size = cache_size
+        self.concurrency = concurrency
+        self._cache: "OrderedDict[Tuple[str, str], Optional[Dict[str, Any]]]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+
+    async def resolve_setlist(self, setlist: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """One entry per played song: the song plus its Spotify track (or spotify_id None).
+
+        A failed search only marks its own song with an "error".
+        """
+        songs = setlist_songs(setlist)
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def resolve(song):
+            try:
+                track = await self.resolve_song(song["song"], song["artist"], semaphore)
+            except Exception as e:
+                logger.warning(f"Spotify search failed for {song['song']}: {e}")
+                track = {"spotify_id": None, "error": str(e)}
+            entry = {"position": song["position"], "song": song["song"]}
+            if song["encore"]:
+                entry["encore"] = True
+            if song["cover"]:
+                entry["cover_of"] = song["artist"]
+            entry.update(track or {"spotify_id": None})
+            return entry
+
+        return list(await asyncio.gather(*[resolve(song) for song in songs]))
+
+    async def resolve_song(self, title: str, artist: str,
+                           semaphore: Optional[asyncio.Semaphore] = None) -> Optional[Dict[str, Any]]:
+        key = (name_key(artist), title_key(title))
+        if not all(key):
+            return None
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return self._cache[key]
+        # reprises and repeated songs within one batch share a search
+        if key not in self._pending:
+            self.misses += 1
+            self._pending[key] = asyncio.ensure_future(self._search(title, artist, key, semaphore))
+            self._pending[key].add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(self._pending[key])
+
+    async def _search(self, title: str, artist: str, key: Tuple[str, str],
+                      semaphore: Optional[asyncio.Semaphore]) -> Optional[Dict[str, Any]]:
+        async with semaphore or asyncio.Semaphore(1):
+            result = await self.spotify_client.search(f'track:"{title}" artist:"{artist}"', "track", limit=5)
+            candidates = (result.get("tracks") or {}).get("items") or []
+            if not candidates:
+                # field filters are strict about punctuation; retry as free text
+                result = await self.spotify_client.search(f"{title} {artist}", "track", limit=5)
+                candidates = (result.get("tracks") or {}).get("items") or []
+        track = self._best(key, candidates)
+        self._cache[key] = track
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return track
+
+    @staticmethod
+    def _best(key: Tuple[str, str], candidates: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        artist, title = key
+        best, best_score = None, 0.0
+        for candidate in candidates:
+            if not candidate or not any(name_key(a.get("name", "")) == artist for a in candidate.get("artists", [])):
+                continue
+            score = SequenceMatcher(None, title, title_key(candidate.get("name", ""))).ratio()
+            if score > best_score or (score == best_score and best is not None
+                                      and candidate.get("popularity", 0) > best.get("popularity", 0)):
+                best, best_score = candidate, score
+        if best is None or best_score < MIN_TITLE_SCORE:
+            return None
+        return {"spotify_id": best["id"], "title": best["name"],
+                "url": (best.get("external_urls") or {}).get("spotify", f"https://open.spotify.com/track/{best['id']}"),
+                "match": round(best_score, 2)}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._cache), "max_size": self.cache_size, "hits": self.hits, "misses": self.misses}
+
+
+class SetlistSpotifyPlugin:
+    def __init__(self, setlist_client: AsyncSetlistFMClient, resolver: SetlistTrackResolver,
+                 max_output_bytes: int = 6000):
+        self.setlist_client = setlist_client
+        self.resolver = resolver
+        self.max_output_bytes = max_output_bytes
+
+    @kernel_function(
+        description="Get Spotify tracks and links for every song played in a setlist, given the setlist ID",
+        name="get_setlist_spotify_tracks"
+    )
+    async def get_setlist_spotify_tracks(self, setlist_id: str) -> str:
+        """Resolve all songs of a setlist against Spotify in one call.
+
+        Args:
+            setlist_id: The ID of the setlist.
+
+        Returns:
+            A JSON string listing each song with its Spotify track id and link.
+        """
+        try:
+            setlist = await self.setlist_client.get_setlist(setlist_id)
+            tracks = await self.resolver.resolve_setlist(setlist)
+            result = {"setlist_id": setlist_id, "artist": (setlist.get("artist") or {}).get("name"),
+                      "date": setlist.get("eventDate"), "resolved": sum(1 for t in tracks if t["spotify_id"]),
+                      "songs": len(tracks), "items": tracks}
+            return fit(result, self.max_output_bytes)
+        except Exception as e:
+            return f"Error resolving setlist tracks: {str(e)}"
@@ -0,0 +1,141 @@
+"""Song statistics over a collection of setlists, computed in batch with NumPy.
+
+The setlists are turned once into a song x show incidence matrix plus
+matching matrices for normalised position, opener, closer and encore flags;
+every statistic is then a vectorised reduction over those arrays.
+"""
+from typing import Optional, Dict, Any, Iterable, List, Union
+
+import numpy as np
+
+from setlist_models import Setlist
+
+
+def _show_songs(setlist: Union[Dict[str, Any], Setlist]):
+    """Yield (name, encore) for the played (non-tape) songs of a show."""
+    if isinstance(setlist, Setlist):
+        for s in setlist.sets:
+            for song in s.songs:
+                if song.name and not song.tape:
+                    yield song.name, bool(s.encore)
+        return
+    for s in (setlist.get("sets") or {}).get("set", []):
+        for song in s.get("song", []):
+            if song.get("name") and not song.get("tape"):
+                yield song["name"], bool(s.get("encore"))
+
+
+class SongStats:
+    def __init__(self, setlists: Iterable[Union[Dict[str, Any], Setlist]]):
+        """Build the incidence matrices; shows without any played song are skipped."""
+        index: Dict[str, int] = {}
+        self.songs: List[str] = []
+        self.show_ids: List[str] = []
+        rows, cols, positions, encores = [], [], [], []
+        openers, closers = [], []
+        for setlist in setlists:
+            played = list(_show_songs(setlist))
+            if not played:
+                continue
+            show = len(self.show_ids)
+            self.show_ids.append(setlist.id if isinstance(setlist, Setlist) else setlist.get("id"))
+            last = max(len(played) - 1, 1)
+            for position, (name, encore) in enumerate(played):
+                key = name.casefold()
+                song = index.get(key)
+                if song is None:
+                    song = index[key] = len(self.songs)
+                    self.songs.append(name)
+                rows.append(song)
+                cols.append(show)
+                positions.append(position / last)
+                encores.append(encore)
+            openers.append(rows[-len(played)])
+            closers.append(rows[-1])
+
+        self._index = index
+        shape = (len(self.songs), len(self.show_ids))
+        rows = np.asarray(rows, dtype=np.int32)
+        cols = np.asarray(cols, dtype=np.int32)
+        self.incidence = np.zeros(shape, dtype=bool)
+        self.incidence[rows, cols] = True
+        # a song played twice in a show keeps its first position
+        self.position = np.full(shape, np.nan, dtype=np.float32)
+        first = np.unique(np.stack([rows, cols]), axis=1, return_index=True)[1] if len(rows) else []
+        self.position[rows[first], cols[first]] = np.asarray(positions, dtype=np.float32)[first]
+        self.encore = np.zeros(shape, dtype=bool)
+        encores = np.asarray(encores, dtype=bool)
+        self.encore[rows[encores], cols[encores]] = True
+        show_idx = np.arange(len(self.show_ids))
+        self.opener = np.zeros(shape, dtype=bool)
+        self.opener[np.asarray(openers, dtype=np.int32), show_idx] = True
+        self.closer = np.zeros(shape, dtype=bool)
+        self.closer[np.asarray(closers, dtype=np.int32), show_idx] = True
+
+    @property
+    def show_count(self) -> int:
+        return len(self.show_ids)
+
+    def play_counts(self) -> np.ndarray:
+        return self.incidence.sum(axis=1)
+
+    def frequencies(self) -> np.ndarray:
+        """Share of shows in which each song was played."""
+        return self.play_counts() / max(self.show_count, 1)
+
+    def opener_counts(self) -> np.ndarray:
+        return self.opener.sum(axis=1)
+
+    def closer_counts(self) -> np.ndarray:
+        return self.closer.sum(axis=1)
+
+    def encore_counts(self) -> np.ndarray:
+        return self.encore.sum(axis=1)
+
+    def mean_positions(self) -> np.ndarray:
+        """Mean position in the show, 0 = opener, 1 = closer."""
+        with np.errstate(invalid="ignore"):
+            return np.nanmean(np.where(self.incidence, self.position, np.nan), axis=1) if self.show_count else np.array([])
+
+    def rarity(self) -> np.ndarray:
+        """Surprisal of each song, -log2(frequency): 0 for a song played every night."""
+        return 0.0 - np.log2(np.clip(self.frequencies(), 1e-12, None))
+
+    def _song_row(self, i: int) -> Dict[str, Any]:
+        plays = int(self.incidence[i].sum())
+        return {
+            "song": self.songs[i],
+            "plays": plays,
+            "frequency": round(plays / max(self.show_count, 1), 3),
+            "mean_position": round(float(self.mean_positions()[i]), 3),
+            "opener": int(self.opener[i].sum()),
+            "closer": int(self.closer[i].sum()),
+            "encore": int(self.encore[i].sum()),
+            "rarity": round(float(self.rarity()[i]), 2),
+        }
+
+    def song(self, name: str) -> Optional[Dict[str, Any]]:
+        i = self._index.get(name.casefold())
+        return None if i is None else self._song_row(i)
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """Small digest: most played songs, top openers/closers/encores and rarities."""
+        if not self.songs:
+            return {"shows": self.show_count, "distinct_songs": 0}
+
+        def ranked(values: np.ndarray, n: int, ascending: bool = False) -> List[str]:
+            order = np.argsort(values if ascending else -values, kind="stable")[:n]
+            return [self.songs[i] for i in order if values[i] > 0 or ascending]
+
+        counts = self.play_counts()
+        order = np.argsort(-counts, kind="stable")[:top]
+        return {
+            "shows": self.show_count,
+            "distinct_songs": len(self.songs),
+            "average_songs_per_show": round(float(counts.sum()) / self.show_count, 1),
+            "most_played": [{"song": self.songs[i], "plays": int(counts[i])} for i in order],
+            "top_openers": ranked(self.opener_counts(), 3),
+            "top_closers": ranked(self.closer_counts(), 3),
+            "top_encores": ranked(self.encore_counts(), 5),
+            "rarest": ranked(counts, 5, ascending=True),
+        }
@@ -3,6 +3,7 @@ import asyncio
 import gradio as gr
 from dotenv import load_dotenv
 from setlist_agent import SetlistFMAgent
+from session_manager import SessionManager
 
 # Load environment variables
 load_dotenv()
@@ -20,18 +21,23 @@ if not openai_api_key:
 agent = SetlistFMAgent(
     setlistfm_api_key, model_name="gpt-4o", api_key_env="OPENAI_API")
 
-# Store conversation history
-conversation_history = []
+# One conversation per browser session over the shared agent
+sessions = SessionManager(agent)
 
 
-async def process_message(message, history):
-    """Process user message and get response from agent"""
+async def process_message(message, history, request: gr.Request):
+    """Process user message and stream the response from agent"""
     try:
-        # Get response from agent
-        response = await agent.chat(message)
-        return response
+        # Stream the response from agent, showing tool lookups until the first token
+        answer = ""
+        async for event in sessions.chat_stream(request.session_hash, message):
+            if event.kind == "tool_start" and not answer:
+                yield f"_Looking up {event.tool.replace('-', '.')}…_"
+            elif event.kind == "token":
+                answer += event.text
+                yield answer
     except Exception as e:
-        return f"Error processing your request: {str(e)}"
+        yield f"Error processing your request: {str(e)}"
 
 # Create a simple Gradio chat interface
 demo = gr.ChatInterface(
@@ -0,0 +1,181 @@
+import asyncio
+import base64
+import logging
+import time
+from typing import Optional, Dict, Any, Iterable
+
+import aiohttp
+
+from setlist_async_client import open_connections
+from batch import BatchResult, chunked, timed_call_async, unchunk
+from setlist_ratelimit import RETRY_STATUSES, retry_delay
+from spotify_client import BATCH_LIMITS
+from spotify_token import SpotifyTokenProvider
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSpotifyClient:
+    """asyncio-native Spotify Web API client (client credentials flow).
+
+    Mirrors SpotifyClient's methods, but every call returns an awaitable and
+    all requests share one keep-alive aiohttp connection pool, so several
+    Spotify lookups can be awaited concurrently. The access token is fetched
+    once, shared by concurrent callers and refreshed shortly before it
+    expires or when Spotify answers 401. With a token_provider (see
+    spotify_token.py) the token comes from that shared provider instead.
+    """
+    API_URL = "https://api.spotify.com/v1/"
+    TOKEN_URL = "https://accounts.spotify.com/api/token"
+    # refresh this many seconds before the token's stated expiry
+    TOKEN_MARGIN = 60
+
+    def __init__(self, client_id: str, client_secret: str, pool_size: int = 20, keepalive_timeout: float = 30.0,
+                 timeout: float = 10.0, connect_timeout: float = 5.0, max_retries: int = 3, transport=None,
+                 token_provider: Optional[SpotifyTokenProvider] = None):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.pool_size = pool_size
+        self.keepalive_timeout = keepalive_timeout
+        self.timeout = aiohttp.ClientTimeout(total=timeout, connect=connect_timeout)
+        self.max_retries = max_retries
+        self.transport = transport
+        self.token_provider = token_provider
+        self._token: Optional[str] = None
+        self._token_expires = 0.0
+        self._token_lock: Optional[asyncio.Lock] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Same loop handling as AsyncSetlistFMClient: sessions and locks are
+        # bound to the loop they were created on.
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            if self.transport is not None:
+                self._session = self.transport.wrap_async(self._session)
+            self._token_lock = asyncio.Lock()
+            self._loop = loop
+        return self._session
+
+    async def _access_token(self, expired: Optional[str] = None) -> str:
+        """Return a valid token; expired names a token the API just rejected."""
+        if self.token_provider is not None:
+            token = self.token_provider.current()
+            if token is not None and token != expired:
+                return token
+            # only a cold start or a rejected token gets here; the exchange itself is blocking
+            return await asyncio.to_thread(self.token_provider.get_token, expired)
+        session = self._get_session()
+        async with self._token_lock:
+            if self._token is not None and self._token != expired and time.time() < self._token_expires:
+                return self._token
+            credentials = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+            async with session.post(self.TOKEN_URL, data={"grant_type": "client_credentials"},
+                                    headers={"Authorization": f"Basic {credentials}"}) as response:
+                response.raise_for_status()
+                data = await response.json()
+            self._token = data["access_token"]
+            self._token_expires = time.time() + data.get("expires_in", 3600) - self.TOKEN_MARGIN
+            return self._token
+
+    async def _get(self, path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        url = f"{self.API_URL}{path}"
+        session = self._get_session()
+        token = await self._access_token()
+        refreshed = False
+        attempt = 0
+        while True:
+            async with session.get(url, params=params, headers={"Authorization": f"Bearer {token}"}) as response:
+                if response.status == 401 and not refreshed:
+                    refreshed = True
+                    delay = None
+                elif response.status in RETRY_STATUSES and attempt < self.max_retries:
+                    delay = retry_delay(attempt, response.headers.get("Retry-After"))
+                    logger.warning(f"Spotify returned {response.status} for {path}, retrying in {delay:.2f}s")
+                    attempt += 1
+                else:
+                    response.raise_for_status()
+                    return await response.json()
+            if delay is None:
+                token = await self._access_token(expired=token)
+            else:
+                await asyncio.sleep(delay)
+
+    async def search_artist(self, artist_name: str, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        """Search for an artist by name."""
+        return await self._get("search", {"q": f"artist:{artist_name}", "type": "artist", "limit": limit,
+                                          "offset": offset})
+
+    async def get_artist(self, artist_id: str) -> Dict[str, Any]:
+        """Get artist information by Spotify artist ID."""
+        return await self._get(f"artists/{artist_id}")
+
+    async def get_artist_albums(self, artist_id: str, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        """Get albums for an artist by Spotify artist ID."""
+        return await self._get(f"artists/{artist_id}/albums", {"limit": limit, "offset": offset})
+
+    async def get_album(self, album_id: str) -> Dict[str, Any]:
+        """Get album information by Spotify album ID."""
+        return await self._get(f"albums/{album_id}")
+
+    async def get_track(self, track_id: str) -> Dict[str, Any]:
+        """Get track information by Spotify track ID."""
+        return await self._get(f"tracks/{track_id}")
+
+    async def search_track(self, track_name: str, limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        """Search for a track by name."""
+        return await self.search(f"track:{track_name}", "track", limit, offset)
+
+    async def search(self, query: str, type: str = "track", limit: int = 10, offset: int = 0) -> Dict[str, Any]:
+        """Search with a raw query, field filters (track:, artist:, year:) included as given."""
+        return await self._get("search", {"q": query, "type": type, "limit": limit, "offset": offset})
+
+    async def _batch(self, kind: str, ids: Iterable[str], concurrency: int) -> BatchResult:
+        ids = list(ids)
+        chunks = chunked(ids, BATCH_LIMITS[kind])
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def fetch(chunk):
+            async with semaphore:
+                return (await self._get(kind, {"ids": ",".join(chunk)}))[kind]
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*[timed_call_async(",".join(chunk), fetch, chunk) for chunk in chunks])
+        return BatchResult(unchunk(ids, chunks, list(results), kind[:-1]), time.perf_counter() - start, concurrency)
+
+    async def get_tracks(self, track_ids: Iterable[str], concurrency: int = 4) -> BatchResult:
+        """Get many tracks in requests of 50 (see SpotifyClient.get_tracks)."""
+        return await self._batch("tracks", track_ids, concurrency)
+
+    async def get_artists(self, artist_ids: Iterable[str], concurrency: int = 4) -> BatchResult:
+        """Get many artists in requests of 50."""
+        return await self._batch("artists", artist_ids, concurrency)
+
+    async def get_albums(self, album_ids: Iterable[str], concurrency: int = 4) -> BatchResult:
+        """Get many albums in requests of 20."""
+        return await self._batch("albums", album_ids, concurrency)
+
+    async def warm(self, connections: int = 2) -> int:
+        """Fetch the access token and open keep-alive connections ahead of the first request."""
+        await self._access_token()
+        if self.transport is not None:
+            return 0
+        return await open_connections(self._get_session(), self.API_URL, min(connections, self.pool_size))
+
+    async def close(self) -> None:
+        """Close the connection pool."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    async def __aenter__(self) -> "AsyncSpotifyClient":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
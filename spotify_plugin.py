@@ -1,25 +1,38 @@
 from semantic_kernel.functions import kernel_function
-import spotipy
-from spotipy.oauth2 import SpotifyClientCredentials
 from typing import Optional, Dict, Any
+from spotify_async_client import AsyncSpotifyClient
+from spotify_token import SpotifyTokenProvider
+from tool_output import SPOTIFY_PROJECTIONS, ToolOutput
 
 class SpotifyPlugin:
-    def __init__(self, client_id: str, client_secret: str):
+    def __init__(self, client_id: str, client_secret: str, output: ToolOutput = None,
+                 client: AsyncSpotifyClient = None):
+        """Args:
+            client_id: Spotify client id
+            client_secret: Spotify client secret
+            output: How results are rendered for the model; compact JSON with a size budget by default
+            client: Optional pre-configured AsyncSpotifyClient to share its connection pool
+        """
+        self.output = output if output is not None else ToolOutput(projections=SPOTIFY_PROJECTIONS)
         self.client_id = client_id
         self.client_secret = client_secret
-        self.auth_manager = SpotifyClientCredentials(
-            client_id=self.client_id, client_secret=self.client_secret)
-        self.sp = spotipy.Spotify(auth_manager=self.auth_manager)
+        self.client = client if client is not None else AsyncSpotifyClient(
+            client_id=self.client_id, client_secret=self.client_secret,
+            token_provider=SpotifyTokenProvider.shared(self.client_id, self.client_secret))
+
+    async def close(self):
+        """Release the HTTP connection pool held by the client."""
+        await self.client.close()
 
     @kernel_function(
         description="Search for an artist by name on Spotify",
         name="search_artist"
     )
-    def search_artist(self, artist_name: str, limit: int = 10) -> str:
+    async def search_artist(self, artist_name: str, limit: int = 10, offset: int = 0) -> str:
         """Search for an artist by name."""
         try:
-            result = self.sp.search(q=f"artist:{artist_name}", type="artist", limit=limit)
-            return str(result)
+            result = await self.client.search_artist(artist_name, limit=limit, offset=offset)
+            return self.output.render("search_artist", result)
         except Exception as e:
             return f"Error searching for artist: {str(e)}"
 
@@ -27,10 +40,10 @@ class SpotifyPlugin:
         description="Get artist information by Spotify artist ID",
         name="get_artist"
     )
-    def get_artist(self, artist_id: str) -> str:
+    async def get_artist(self, artist_id: str) -> str:
         try:
-            result = self.sp.artist(artist_id)
-            return str(result)
+            result = await self.client.get_artist(artist_id)
+            return self.output.render("get_artist", result)
         except Exception as e:
             return f"Error getting artist: {str(e)}"
 
@@ -38,10 +51,10 @@ class SpotifyPlugin:
         description="Get albums for an artist by Spotify artist ID",
         name="get_artist_albums"
     )
-    def get_artist_albums(self, artist_id: str, limit: int = 10) -> str:
+    async def get_artist_albums(self, artist_id: str, limit: int = 10, offset: int = 0) -> str:
         try:
-            result = self.sp.artist_albums(artist_id, limit=limit)
-            return str(result)
+            result = await self.client.get_artist_albums(artist_id, limit=limit, offset=offset)
+            return self.output.render("get_artist_albums", result)
         except Exception as e:
             return f"Error getting artist albums: {str(e)}"
 
@@ -49,10 +62,10 @@ class SpotifyPlugin:
         description="Get album information by Spotify album ID",
         name="get_album"
     )
-    def get_album(self, album_id: str) -> str:
+    async def get_album(self, album_id: str) -> str:
         try:
-            result = self.sp.album(album_id)
-            return str(result)
+            result = await self.client.get_album(album_id)
+            return self.output.render("get_album", result)
         except Exception as e:
             return f"Error getting album: {str(e)}"
 
@@ -60,10 +73,10 @@ class SpotifyPlugin:
         description="Get track information by Spotify track ID",
         name="get_track"
     )
-    def get_track(self, track_id: str) -> str:
+    async def get_track(self, track_id: str) -> str:
         try:
-            result = self.sp.track(track_id)
-            return str(result)
+            result = await self.client.get_track(track_id)
+            return self.output.render("get_track", result)
         except Exception as e:
             return f"Error getting track: {str(e)}"
 
@@ -71,9 +84,9 @@ class SpotifyPlugin:
         description="Search for a track by name on Spotify",
         name="search_track"
     )
-    def search_track(self, track_name: str, limit: int = 10) -> str:
+    async def search_track(self, track_name: str, limit: int = 10, offset: int = 0) -> str:
         try:
-            result = self.sp.search(q=f"track:{track_name}", type="track", limit=limit)
-            return str(result)
+            result = await self.client.search_track(track_name, limit=limit, offset=offset)
+            return self.output.render("search_track", result)
         except Exception as e:
             return f"Error searching for track: {str(e)}"
@@ -0,0 +1,190 @@
+"""Process-wide Spotify access token, shared between workers through a file.
+
+SpotifyTokenProvider does the client credentials exchange for every Spotify
+client of a process (SpotifyTokenProvider.shared returns one instance per
+process and client id). With a cache_path, the token is also written to
+disk under an exclusive file lock: sibling worker processes adopt a token
+another one fetched instead of doing their own exchange, and only one of
+them refreshes it. A background thread refreshes refresh_margin seconds
+before expiry, so callers normally never wait for the OAuth round trip.
+
+The provider is a spotipy auth manager (get_access_token) and can be
+passed to AsyncSpotifyClient as token_provider.
+"""
+import base64
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple
+
+import requests
+
+try:
+    import fcntl
+except ImportError:  # Windows: tokens are still shared, but refreshes are not serialized
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class SpotifyTokenProvider:
+    """Client credentials token for one Spotify app.
+
+    Args:
+        client_id: Spotify client id
+        client_secret: Spotify client secret
+        cache_path: Optional JSON file shared by all processes using this app
+        refresh_margin: Seconds before expiry the background thread refreshes
+        expiry_margin: Seconds before expiry a token is no longer handed out
+        timeout: Timeout of the token request
+    """
+    TOKEN_URL = "https://accounts.spotify.com/api/token"
+    # seconds between attempts after a failed background refresh
+    RETRY_INTERVAL = 5.0
+
+    _shared: Dict[Tuple[int, str, Optional[str]], "SpotifyTokenProvider"] = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, client_id: str, client_secret: str, cache_path: Optional[str] = None,
+                 refresh_margin: float = 300.0, expiry_margin: float = 30.0, timeout: float = 10.0):
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.cache_path = cache_path
+        self.refresh_margin = refresh_margin
+        self.expiry_margin = expiry_margin
+        self.timeout = timeout
+        self.token_url = self.TOKEN_URL
+        # token exchanges done by this process, for tests and monitoring
+        self.exchanges = 0
+        self._token: Optional[str] = None
+        self._expires_at = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def shared(cls, client_id: str, client_secret: str, cache_path: Optional[str] = None) -> "SpotifyTokenProvider":
+        """The provider of this process for client_id; cache_path defaults to $SPOTIFY_TOKEN_CACHE."""
+        cache_path = cache_path or os.environ.get("SPOTIFY_TOKEN_CACHE") or None
+        # keyed by pid: a forked worker must not reuse its parent's refresh thread
+        key = (os.getpid(), client_id, cache_path)
+        with cls._shared_lock:
+            if key not in cls._shared:
+                cls._shared[key] = cls(client_id, client_secret, cache_path)
+            return cls._shared[key]
+
+    def current(self) -> Optional[str]:
+        """The in-memory token if it is still safe to use, without blocking."""
+        if self._token is not None and time.time() < self._expires_at - self.expiry_margin:
+            return self._token
+        return None
+
+    def get_token(self, expired: Optional[str] = None) -> str:
+        """A valid token; expired names a token the API just rejected."""
+        token = self.current()
+        if token is not None and token != expired:
+            return token
+        with self._lock:
+            token = self.current()
+            if token is None or token == expired:
+                self._refresh(expired)
+            self._start()
+            return self._token
+
+    def get_access_token(self, as_dict: bool = False, check_cache: bool = True):
+        """spotipy auth manager interface."""
+        token = self.get_token()
+        if as_dict:
+            return {"access_token": token, "token_type": "Bearer",
+                    "expires_in": int(self._expires_at - time.time()), "expires_at": int(self._expires_at)}
+        return token
+
+    def close(self) -> None:
+        """Stop the background refresh."""
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1)
+        self._thread = None
+
+    def _start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._refresh_loop, name="spotify-token-refresh", daemon=True)
+            self._thread.start()
+
+    def _refresh_loop(self) -> None:
+        delay = max(0.0, self._expires_at - self.refresh_margin - time.time())
+        while not self._stop.wait(delay):
+            try:
+                with self._lock:
+                    self._refresh()
+                delay = max(1.0, self._expires_at - self.refresh_margin - time.time())
+            except Exception as e:
+                logger.warning(f"Background Spotify token refresh failed: {e}")
+                delay = self.RETRY_INTERVAL
+
+    def _refresh(self, expired: Optional[str] = None) -> None:
+        """Adopt a fresh token from the cache file or exchange for a new one. Caller holds self._lock."""
+        with self._file_lock():
+            cached = self._read_cache()
+            if (cached is not None and cached["access_token"] != expired
+                    and time.time() < cached["expires_at"] - self.refresh_margin):
+                self._token, self._expires_at = cached["access_token"], cached["expires_at"]
+                return
+            credentials = base64.b64encode(f"{self.client_id}:{self.client_secret}".encode()).decode()
+            response = requests.post(self.token_url, data={"grant_type": "client_credentials"},
+                                     headers={"Authorization": f"Basic {credentials}"}, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            self.exchanges += 1
+            self._token = data["access_token"]
+            self._expires_at = time.time() + data.get("expires_in", 3600)
+            self._write_cache()
+
+    @property
+    def _app(self) -> str:
+        return hashlib.sha256(self.client_id.encode()).hexdigest()[:16]
+
+    @contextlib.contextmanager
+    def _file_lock(self):
+        if self.cache_path is None or fcntl is None:
+            yield
+            return
+        fd = os.open(f"{self.cache_path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)
+
+    def _read_cache(self) -> Optional[Dict[str, Any]]:
+        if self.cache_path is None:
+            return None
+        try:
+            with open(self.cache_path) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(cached, dict) or cached.get("app") != self._app or "access_token" not in cached:
+            return None
+        return cached
+
+    def _write_cache(self) -> None:
+        if self.cache_path is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.cache_path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".spotify-token-")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"app": self._app, "access_token": self._token, "expires_at": self._expires_at}, f)
+            # readers never see a half written file
+            os.replace(tmp, self.cache_path)
+        except OSError as e:
+            logger.warning(f"Could not write Spotify token cache {self.cache_path}: {e}")
+            with contextlib.suppress(OSError):
+                os.remove(tmp)
@@ -0,0 +1,63 @@
+import os
+import time
+import unittest
+from unittest import mock
+
+from agent_pool import AgentPool
+from bench_stubs import ScriptedChatCompletion, StubAgentTestCase
+from setlist_agent import SetlistFMPlugin
+from spotify_async_client import AsyncSpotifyClient
+
+
+class AgentPoolTest(StubAgentTestCase):
+    async def asyncSetUp(self):
+        client = self.stub_client()
+        self.built = []
+
+        def service(model_name):
+            self.built.append(model_name)
+            return ScriptedChatCompletion(latency=0.01)
+
+        self.pool = AgentPool("key", service_factory=service, setlist_plugin=SetlistFMPlugin("key", client=client))
+
+    async def asyncTearDown(self):
+        await self.pool.close()
+
+    async def test_agents_are_built_once_and_share_plugins(self):
+        first = self.pool.get("gpt-4o")
+        second = self.pool.get("gpt-4o-mini")
+        self.assertIs(self.pool.get("gpt-4o"), first)
+        self.assertIsNot(first.kernel, second.kernel)
+        self.assertIs(first.setlist_plugin, second.setlist_plugin)
+        self.assertEqual(self.built, ["gpt-4o", "gpt-4o-mini"])
+        start = time.perf_counter()
+        for _ in range(1000):
+            self.pool.get("gpt-4o-mini")
+        self.assertLess((time.perf_counter() - start) / 1000, 0.0001)
+
+    async def test_later_models_build_no_spotify_client(self):
+        env = {"SPOTIPY_CLIENT_ID": "id", "SPOTIPY_CLIENT_SECRET": "secret", "ARTIST_IDENTITY_DB": ""}
+        with mock.patch.dict(os.environ, env), \
+                mock.patch("setlist_agent.AsyncSpotifyClient", wraps=AsyncSpotifyClient) as spotify_client:
+            first = self.pool.get("gpt-4o")
+            second = self.pool.get("gpt-4o-mini")
+        self.assertIs(second.tracks_plugin, first.tracks_plugin)
+        self.assertEqual(spotify_client.call_count, 1)
+
+    async def test_switching_models_keeps_the_conversation(self):
+        conversation = self.pool.get("gpt-4o").new_conversation()
+        await self.pool.get("gpt-4o").chat("Show me setlist 63de4613", conversation=conversation)
+        await self.pool.get("gpt-4o-mini").chat("Show me setlist 7bd6aa0c", conversation=conversation)
+        self.assertEqual(len([m async for m in conversation.thread.get_messages()]), 8)
+
+    async def test_warm_opens_connections_once(self):
+        timings = await self.pool.warm(["gpt-4o"], connections=3)
+        self.assertEqual(set(timings), {"setlistfm", "model:gpt-4o"})
+        self.assertEqual(self.stub.requests, 3)
+        # warmed on this loop recently: only a new model is left to warm
+        self.assertEqual(set(await self.pool.warm(["gpt-4o", "gpt-4o-mini"])), {"model:gpt-4o-mini"})
+        self.assertEqual(self.stub.requests, 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+import time
+import unittest
+
+from answer_cache import AnswerCache, normalize
+from bench_stubs import StubAgentTestCase
+
+
+class AnswerCacheTest(unittest.TestCase):
+    def test_normalized_questions_share_an_answer(self):
+        cache = AnswerCache(similarity=0)
+        cache.put("Find setlists for Radiohead in London", "answer")
+        self.assertEqual(normalize("find  setlist for RADIOHEAD in London!"),
+                         normalize("Find setlists for Radiohead in London"))
+        self.assertEqual(cache.get("find  setlist for RADIOHEAD in London!"), "answer")
+        self.assertIsNone(cache.get("Can you find setlists for Radiohead in London?"))
+
+    def test_near_matches_differ_only_in_filler_words(self):
+        cache = AnswerCache()
+        cache.put("Find setlists for Radiohead in London", "london")
+        cache.put("Find concerts in New York", "new york")
+        self.assertEqual(cache.get("Can you show me setlists for Radiohead in London?"), "london")
+        self.assertEqual(cache.get("concerts in new york please"), "new york")
+        self.assertIsNone(cache.get("Find setlists for Radiohead in Paris"))
+        self.assertIsNone(cache.get("Find setlists for Radiohead"))
+        self.assertEqual(cache.stats()["near_hits"], 2)
+
+    def test_ttl_follows_data_freshness(self):
+        cache = AnswerCache()
+        self.assertEqual(cache.ttl_for("What songs did Metallica play at their last concert?"), 15 * 60)
+        self.assertEqual(cache.ttl_for("Find setlists for Radiohead in London"), 3600)
+        self.assertEqual(cache.ttl_for("Tell me about the artist Adele"), 24 * 3600)
+        cache = AnswerCache(ttls={}, default_ttl=0.05)
+        cache.put("Tell me about the artist Adele", "answer")
+        time.sleep(0.06)
+        self.assertIsNone(cache.get("Tell me about the artist Adele"))
+        self.assertEqual(len(cache), 0)
+
+    def test_least_recently_used_answer_is_dropped(self):
+        cache = AnswerCache(max_size=2)
+        cache.put("about the artist Muse", "muse")
+        cache.put("about the artist Adele", "adele")
+        cache.get("about the artist Muse")
+        cache.put("about the artist Blur", "blur")
+        self.assertEqual([cache.get(f"about the artist {a}") for a in ("Muse", "Adele", "Blur")],
+                         ["muse", None, "blur"])
+
+
+class AgentAnswerCacheTest(StubAgentTestCase):
+    async def asyncSetUp(self):
+        self.cache = AnswerCache()
+        self.agent = self.stub_agent(client_kwargs={"max_retries": 0}, answer_cache=self.cache)
+
+    async def test_repeated_first_question_skips_the_model(self):
+        answer = await self.agent.chat("Show me setlist 63de4613")
+        calls = len(self.service.prompt_sizes)
+        conversation = self.agent.new_conversation()
+        start = time.perf_counter()
+        self.assertEqual(await self.agent.chat("show me setlist 63de4613", conversation=conversation), answer)
+        self.assertLess(time.perf_counter() - start, 0.01)
+        events = [e async for e in self.agent.chat_stream("Show me setlist 63de4613",
+                                                         conversation=self.agent.new_conversation())]
+        self.assertEqual([e.kind for e in events], ["token", "done"])
+        self.assertEqual(events[-1].text, answer)
+        self.assertEqual(len(self.service.prompt_sizes), calls)
+        # the cached turn is part of the history a follow-up builds on
+        messages = [m async for m in conversation.thread.get_messages()]
+        self.assertEqual([m.content for m in messages], ["show me setlist 63de4613", answer])
+
+    async def test_follow_up_turns_bypass_the_cache(self):
+        await self.agent.chat("Show me setlist 63de4613")
+        await self.agent.chat("Show me setlist 7bd6aa0c")
+        self.assertEqual(len(self.cache), 1)
+        calls = len(self.service.prompt_sizes)
+        await self.agent.chat("Show me setlist 63de4613")
+        self.assertGreater(len(self.service.prompt_sizes), calls)
+
+    async def test_answers_built_on_failed_tools_are_not_cached(self):
+        self.client.BASE_URL = self.stub.setlistfm_url + "/down"
+        await self.agent.chat("Show me setlist 63de4613")
+        self.assertEqual(self.agent.conversation.failed_tools, 1)
+        self.assertEqual(len(self.cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,160 @@
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from artist_identity import ArtistIdentityPlugin, ArtistIdentityStore, ArtistResolver, name_key
+from bench_stubs import ScriptedChatCompletion
+from setlist_agent import SetlistFMAgent, SetlistFMPlugin
+
+
+class FakeSetlistClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def search_artists(self, artist_name):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if artist_name == "Nobody":
+            return {"artist": []}
+        if artist_name == "ACDC":
+            return {"artist": [{"mbid": "mbid-acdc", "name": "AC/DC"}]}
+        return {"artist": [{"mbid": "tribute", "name": f"{artist_name} Tribute"},
+                           {"mbid": f"mbid-{name_key(artist_name)}", "name": artist_name}]}
+
+    async def get_artist(self, mbid):
+        self.calls += 1
+        return {"mbid": mbid, "name": "Muse"}
+
+
+class FakeSpotifyClient:
+    def __init__(self):
+        self.calls = 0
+
+    async def search_artist(self, artist_name, limit=10):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        if artist_name == "Obscure Band":
+            return {"artists": {"items": [{"id": "x", "name": "Completely Different", "popularity": 90}]}}
+        return {"artists": {"items": [{"id": "sp-cover", "name": f"{artist_name} Covers", "popularity": 10},
+                                      {"id": "sp-small", "name": artist_name, "popularity": 5},
+                                      {"id": "sp-main", "name": artist_name, "popularity": 80}]}}
+
+
+class ThreadRecordingStore(ArtistIdentityStore):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.threads = set()
+
+    def by_mbid(self, *args):
+        self.threads.add(threading.get_ident())
+        return super().by_mbid(*args)
+
+    def by_name(self, *args):
+        self.threads.add(threading.get_ident())
+        return super().by_name(*args)
+
+    def put(self, *args):
+        self.threads.add(threading.get_ident())
+        return super().put(*args)
+
+
+class ArtistIdentityTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "identity.db")
+        self.setlist = FakeSetlistClient()
+        self.spotify = FakeSpotifyClient()
+        self.store = ArtistIdentityStore(self.path)
+        self.resolver = ArtistResolver(self.setlist, self.spotify, self.store)
+
+    def tearDown(self):
+        self.store.close()
+        self.dir.cleanup()
+
+    def test_name_key(self):
+        self.assertEqual(name_key("The Beatles"), "beatles")
+        self.assertEqual(name_key("Beyoncé"), "beyonce")
+        self.assertEqual(name_key("Simon & Garfunkel"), "simon and garfunkel")
+        self.assertEqual(name_key("The The"), "the")
+        self.assertEqual(name_key("坂本龍一"), "坂本龍一")
+        self.assertEqual(name_key("방탄소년단"), "방탄소년단")
+        self.assertEqual(name_key("Мумий Тролль"), "мумии тролль")
+        self.assertEqual(name_key("!!!"), "!!!")
+        self.assertEqual(name_key("  "), "")
+
+    def test_non_latin_names_do_not_share_a_key(self):
+        self.store.put("mbid-sakamoto", "坂本龍一", "sp-sakamoto", "坂本龍一", 1.0)
+        self.assertEqual(self.store.by_name("坂本龍一")["mbid"], "mbid-sakamoto")
+        self.assertIsNone(self.store.by_name("방탄소년단"))
+        self.assertIsNone(self.store.by_name(""))
+
+    async def test_first_resolution_fills_store_then_hits_it(self):
+        identity = await self.resolver.resolve("Muse")
+        self.assertEqual((identity["mbid"], identity["spotify_id"], identity["cached"]),
+                         ("mbid-muse", "sp-main", False))
+        again = await self.resolver.resolve("the muse ")
+        self.assertEqual(again["spotify_id"], "sp-main")
+        self.assertTrue(again["cached"])
+        self.assertEqual((self.setlist.calls, self.spotify.calls), (1, 1))
+
+    async def test_other_spelling_is_remembered_as_an_alias(self):
+        identity = await self.resolver.resolve("ACDC")
+        self.assertEqual((identity["name"], identity["spotify_id"]), ("AC/DC", "sp-main"))
+        self.assertTrue((await self.resolver.resolve("acdc"))["cached"])
+        self.assertTrue((await self.resolver.resolve("AC/DC"))["cached"])
+        self.assertEqual((self.setlist.calls, self.spotify.calls), (1, 1))
+
+    async def test_store_persists_and_resolves_by_mbid(self):
+        await self.resolver.resolve("Muse")
+        self.store.close()
+        self.store = ArtistIdentityStore(self.path)
+        self.assertEqual(self.store.by_spotify_id("sp-main")["mbid"], "mbid-muse")
+        resolver = ArtistResolver(self.setlist, self.spotify, self.store)
+        self.assertTrue((await resolver.resolve(mbid="mbid-muse"))["cached"])
+
+    async def test_unmatched_artist_is_remembered(self):
+        identity = await self.resolver.resolve("Obscure Band")
+        self.assertIsNone(identity["spotify_id"])
+        await self.resolver.resolve("Obscure Band")
+        self.assertEqual(self.spotify.calls, 1)
+        self.assertIsNone(await self.resolver.resolve("Nobody"))
+
+    async def test_store_calls_run_off_the_event_loop(self):
+        store = ThreadRecordingStore(os.path.join(self.dir.name, "threads.db"))
+        resolver = ArtistResolver(self.setlist, self.spotify, store)
+        await resolver.resolve("Muse")
+        await resolver.resolve(mbid="mbid-muse")
+        store.close()
+        self.assertTrue(store.threads)
+        self.assertNotIn(threading.get_ident(), store.threads)
+
+    async def test_batch_resolution_shares_lookups(self):
+        result = await self.resolver.resolve_many(["Muse", "Radiohead", "muse"])
+        self.assertEqual([item.value["mbid"] for item in result.items], ["mbid-muse", "mbid-radiohead", "mbid-muse"])
+        self.assertEqual(self.spotify.calls, 2)
+
+    async def test_plugin_outputs_json(self):
+        plugin = ArtistIdentityPlugin(self.resolver)
+        self.assertEqual(json.loads(await plugin.resolve_artist("Muse"))["spotify_id"], "sp-main")
+        identities = json.loads(await plugin.resolve_artists("Muse, Nobody"))
+        self.assertEqual(identities[1], {"name": "Nobody", "error": "not found"})
+
+
+class AgentIdentityConfigTest(unittest.TestCase):
+    def test_identity_db_without_spotify_keys_is_reported(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {"ARTIST_IDENTITY_DB": os.path.join(tmp, "identity.db"),
+                   "SPOTIPY_CLIENT_ID": "", "SPOTIPY_CLIENT_SECRET": ""}
+            with mock.patch.dict(os.environ, env), self.assertLogs(level="ERROR") as logs:
+                agent = SetlistFMAgent("key", service=ScriptedChatCompletion(), setlist_plugin=SetlistFMPlugin("key"))
+        self.assertIsNone(agent.identity_plugin)
+        self.assertNotIn("ArtistIdentity", agent.kernel.plugins)
+        self.assertIn("ARTIST_IDENTITY_DB", logs.output[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
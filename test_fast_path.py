@@ -0,0 +1,95 @@
+import unittest
+
+from bench_stubs import StubAgentTestCase, make_artist
+from fast_path import FastPathRouter, parse
+
+
+class ParseTest(unittest.TestCase):
+    def test_simple_questions_are_recognised(self):
+        self.assertEqual(parse("What was the last setlist of Muse?"), {"intent": "last_setlist", "artist": "Muse"})
+        self.assertEqual(parse("Radiohead's latest concert"), {"intent": "last_setlist", "artist": "Radiohead"})
+        self.assertEqual(parse("Find concerts in New York"), {"intent": "city_setlists", "city": "New York"})
+        self.assertEqual(parse("Can you find setlists for Radiohead in London?"),
+                         {"intent": "city_setlists", "artist": "Radiohead", "city": "London"})
+        self.assertEqual(parse("venue info for 6bd6ca6e"), {"intent": "venue_info", "venue_id": "6bd6ca6e"})
+        self.assertEqual(parse("Tell me about venue v0001f4"), {"intent": "venue_info", "venue_id": "v0001f4"})
+
+    def test_anything_else_is_left_to_the_agent(self):
+        for question in ("What songs did Metallica play at their last concert?",
+                         "Compare the last setlist of Muse with Blur's",
+                         "last setlist of them",
+                         "setlists in London in 2019",
+                         "Tell me about the artist Adele"):
+            self.assertIsNone(parse(question), question)
+
+
+class BlockingClient:
+    """setlist.fm client answering from memory, without awaitables."""
+
+    def __init__(self, artists):
+        self.artists = artists
+
+    def search_artists(self, artist_name, sort="relevance", page=1):
+        return {"artist": self.artists}
+
+    def get_artist_setlists(self, mbid, page=1):
+        return {"setlist": [{"id": "1", "eventDate": "01-06-2025", "venue": {"name": "Arena"}, "sets": {"set": []}},
+                            {"id": "2", "eventDate": "20-05-2025", "venue": {"name": "Hall"},
+                             "sets": {"set": [{"song": [{"name": "Intro", "tape": True}, {"name": "Uprising"}]},
+                                              {"encore": 1, "song": [{"name": "Knights of Cydonia"}]}]}}]}
+
+
+class FastPathRouterTest(StubAgentTestCase):
+    async def asyncSetUp(self):
+        self.router = FastPathRouter(self.stub_client())
+
+    async def test_templated_answers(self):
+        answer = await self.router.answer("last setlist of Muse")
+        self.assertTrue(answer.startswith("The last setlist of **Muse** on setlist.fm is from"))
+        self.assertIn("**Encore:**", answer)
+        answer = await self.router.answer("Find concerts in London")
+        self.assertTrue(answer.startswith("Setlists in London"))
+        # only shows in the asked city are listed
+        self.assertNotIn("Paris Arena", answer)
+        answer = await self.router.answer("venue info for v0001f4")
+        self.assertIn("is a venue in", answer)
+        self.assertEqual(self.router.stats()["decisions"], {"last_setlist": 1, "city_setlists": 1, "venue_info": 1})
+
+    async def test_low_confidence_falls_back(self):
+        self.assertIsNone(await self.router.answer("concerts in Atlantis"))
+        self.assertIsNone(await self.router.answer("Show me setlist 63de4613"))
+        self.client.BASE_URL = self.stub.setlistfm_url + "/down"
+        self.assertIsNone(await self.router.answer("venue info for v0001f4"))
+        self.assertEqual(self.router.stats()["decisions"], {
+            "agent:city_setlists:low_confidence": 1, "agent:no_intent": 1, "agent:venue_info:error": 1})
+
+    async def test_blocking_client_and_exact_artist_names(self):
+        router = FastPathRouter(BlockingClient([make_artist("The Muse"), make_artist("Muse Tribute")]))
+        answer = await router.answer("latest show by muse")
+        self.assertIn("from **20-05-2025** at Hall", answer)
+        self.assertIn("1. Uprising\n\n**Encore:** Knights of Cydonia", answer)
+        router = FastPathRouter(BlockingClient([make_artist("Muse"), make_artist("Muse")]))
+        self.assertIsNone(await router.answer("latest show by Muse"))
+        router = FastPathRouter(BlockingClient([make_artist("Muse Tribute")]))
+        self.assertIsNone(await router.answer("latest show by Muse"))
+
+
+class AgentFastPathTest(StubAgentTestCase):
+    async def asyncSetUp(self):
+        self.agent = self.stub_agent()
+        self.agent.fast_path = FastPathRouter(self.client)
+
+    async def test_simple_questions_skip_the_model(self):
+        await self.agent.chat("Show me setlist 63de4613")
+        calls = len(self.service.prompt_sizes)
+        self.assertGreater(self.agent.fast_path.agent_turn, 0)
+        events = [e async for e in self.agent.chat_stream("venue info for v0001f4")]
+        self.assertEqual([e.kind for e in events], ["token", "done"])
+        self.assertEqual(len(self.service.prompt_sizes), calls)
+        self.assertGreater(self.agent.fast_path.saved, 0)
+        messages = [m async for m in self.agent.thread.get_messages()]
+        self.assertEqual([m.content for m in messages[-2:]], ["venue info for v0001f4", events[-1].text])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+import asyncio
+import time
+import unittest
+from types import SimpleNamespace
+
+from foundry_runner import BackgroundLoop, FoundryRunner
+
+
+def tool_call(id, name):
+    return SimpleNamespace(id=id, function=SimpleNamespace(name=name, arguments="{}"))
+
+
+class FakeAgents:
+    """Agents operations whose run asks for tools once, then completes after a few polls."""
+
+    def __init__(self, tool_calls, busy_polls=3):
+        self.tool_calls = tool_calls
+        self.busy_polls = busy_polls
+        self.submitted = None
+        self.polls = 0
+
+    def _run(self, status, **kwargs):
+        return SimpleNamespace(id="run1", status=status, **kwargs)
+
+    def create_run(self, thread_id, agent_id):
+        return self._run("queued")
+
+    def get_run(self, thread_id, run_id):
+        self.polls += 1
+        if self.submitted is None:
+            action = SimpleNamespace(submit_tool_outputs=SimpleNamespace(tool_calls=self.tool_calls))
+            return self._run("requires_action", required_action=action)
+        if self.busy_polls:
+            self.busy_polls -= 1
+            return self._run("in_progress")
+        return self._run("completed")
+
+    def submit_tool_outputs_to_run(self, thread_id, run_id, tool_outputs):
+        self.submitted = tool_outputs
+        return self._run("queued")
+
+    def cancel_run(self, thread_id, run_id):
+        return self._run("cancelled")
+
+
+class FoundryRunnerTest(unittest.TestCase):
+    def test_tool_calls_run_concurrently(self):
+        def execute(call):
+            time.sleep(0.1)
+            return f"{call.function.name} done"
+
+        agents = FakeAgents([tool_call(f"c{i}", f"tool{i}") for i in range(4)])
+        with FoundryRunner(agents, execute, poll_interval=0.01) as runner:
+            result = runner.run("thread1", "agent1")
+        self.assertEqual(result.status, "completed")
+        self.assertEqual(agents.submitted, [{"tool_call_id": f"c{i}", "output": f"tool{i} done"} for i in range(4)])
+        stats = result.timings.stats()
+        self.assertEqual(stats["tool_calls"], 4)
+        self.assertLess(stats["tool_time"], 0.3)
+
+    def test_failing_tool_reports_error_output(self):
+        def execute(call):
+            raise ValueError("boom")
+
+        agents = FakeAgents([tool_call("c1", "get_setlist")], busy_polls=0)
+        with FoundryRunner(agents, execute, poll_interval=0.01) as runner:
+            runner.run("thread1", "agent1")
+        self.assertEqual(agents.submitted[0]["output"], "Error executing get_setlist: boom")
+
+    def test_polling_backs_off_while_status_is_unchanged(self):
+        agents = FakeAgents([tool_call("c1", "t")], busy_polls=6)
+        with FoundryRunner(agents, lambda call: "ok", poll_interval=0.01, backoff=2.0,
+                           max_poll_interval=0.04) as runner:
+            result = runner.run("thread1", "agent1")
+        # 0.01 + (after tools) 0.01, 0.01 (in_progress is a change), 0.02, 0.04, 0.04 ...
+        self.assertEqual(result.timings.polls, 8)
+        self.assertAlmostEqual(result.timings.poll_wait, 0.01 + 0.01 + 0.01 + 0.02 + 0.04 * 4, places=5)
+
+    def test_cancels_when_no_tool_calls(self):
+        agents = FakeAgents([])
+        with FoundryRunner(agents, lambda call: "ok", poll_interval=0.01) as runner:
+            self.assertEqual(runner.run("thread1", "agent1").status, "cancelled")
+
+
+class BackgroundLoopTest(unittest.TestCase):
+    def test_runs_coroutines_from_threads_on_one_loop(self):
+        loop = BackgroundLoop()
+        try:
+            async def current():
+                await asyncio.sleep(0)
+                return asyncio.get_running_loop()
+
+            self.assertIs(loop.run(current()), loop.run(current()))
+        finally:
+            loop.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
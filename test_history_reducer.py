@@ -0,0 +1,81 @@
+import unittest
+
+from semantic_kernel.contents import AuthorRole, ChatMessageContent, FunctionCallContent, FunctionResultContent
+
+from bench_stubs import StubAgentTestCase
+from history_reducer import ToolResultReducer, estimate_tokens
+
+
+def add_turn(history, n, result_chars=2000):
+    call_id = f"call_{n}"
+    history.add_user_message(f"Show me setlist {n}")
+    history.add_message(ChatMessageContent(role=AuthorRole.ASSISTANT, items=[FunctionCallContent(
+        id=call_id, plugin_name="SetlistFM", function_name="get_setlist", arguments=f'{{"setlist_id": "{n}"}}')]))
+    history.add_message(ChatMessageContent(role=AuthorRole.TOOL, items=[FunctionResultContent(
+        id=call_id, plugin_name="SetlistFM", function_name="get_setlist", result="x" * result_chars)]))
+    history.add_assistant_message(f"Setlist {n} had 20 songs.")
+
+
+def results(history):
+    return [str(item.result) for m in history.messages for item in m.items if isinstance(item, FunctionResultContent)]
+
+
+class ToolResultReducerTest(unittest.IsolatedAsyncioTestCase):
+    async def test_under_budget_is_untouched(self):
+        history = ToolResultReducer(max_tokens=10000)
+        add_turn(history, 1)
+        self.assertIsNone(await history.reduce())
+        self.assertEqual(results(history), ["x" * 2000])
+
+    async def test_old_tool_results_are_elided_first(self):
+        history = ToolResultReducer(max_tokens=800, keep_turns=1, preview_chars=50)
+        history.add_system_message("You are a music assistant.")
+        for n in range(3):
+            add_turn(history, n)
+        self.assertIs(await history.reduce(), history)
+        self.assertEqual(history.last_reduction["dropped_turns"], 0)
+        self.assertEqual(history.last_reduction["elided_results"], 2)
+        old, older, recent = results(history)[0], results(history)[1], results(history)[2]
+        self.assertIn("elided", old)
+        self.assertIn("elided", older)
+        self.assertEqual(recent, "x" * 2000)
+        self.assertEqual(history.messages[0].role, AuthorRole.SYSTEM)
+        self.assertEqual(len(history.messages), 13)
+        self.assertLessEqual(estimate_tokens(history.messages), 800)
+
+    async def test_whole_old_turns_are_dropped_when_elision_is_not_enough(self):
+        history = ToolResultReducer(max_tokens=600, keep_turns=1, preview_chars=50)
+        history.add_system_message("You are a music assistant.")
+        for n in range(4):
+            add_turn(history, n)
+        await history.reduce()
+        self.assertGreater(history.last_reduction["dropped_turns"], 0)
+        self.assertEqual(history.messages[0].role, AuthorRole.SYSTEM)
+        self.assertEqual(history.messages[-4].content, "Show me setlist 3")
+        self.assertEqual(results(history)[-1], "x" * 2000)
+        # every remaining result still follows its call
+        calls = {item.id for m in history.messages for item in m.items if isinstance(item, FunctionCallContent)}
+        answered = {item.id for m in history.messages for item in m.items if isinstance(item, FunctionResultContent)}
+        self.assertEqual(calls, answered)
+        self.assertEqual(history.messages[1].role, AuthorRole.USER)
+        self.assertLessEqual(estimate_tokens(history.messages), 600)
+
+
+class AgentHistoryBudgetTest(StubAgentTestCase):
+    async def prompt_tokens(self, history_max_tokens):
+        agent = self.stub_agent(latency=0.0, model_latency=0.0, memo_size=0, history_max_tokens=history_max_tokens)
+        for setlist_id in ["63de4613", "7bd6aa0c"] * 3:
+            await agent.chat(f"Show me setlist {setlist_id}")
+        return agent.conversation.prompt_tokens
+
+    async def test_budget_bounds_the_prompt(self):
+        unbounded = await self.prompt_tokens(0)
+        bounded = await self.prompt_tokens(500)
+        self.assertEqual(len(bounded), 6)
+        self.assertEqual(bounded[:2], unbounded[:2])
+        self.assertLess(bounded[-1], unbounded[-1])
+        self.assertLessEqual(max(bounded), 520)
+
+
+if __name__ == "__main__":
+    unittest.main()
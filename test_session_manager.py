@@ -0,0 +1,66 @@
+import asyncio
+import unittest
+
+from bench_stubs import StubAgentTestCase
+from session_manager import SessionManager
+
+
+class SessionManagerTest(StubAgentTestCase):
+    async def asyncSetUp(self):
+        self.agent = self.stub_agent(model_latency=0.01)
+
+    async def messages(self, sessions, session_id):
+        return [m async for m in sessions.get(session_id).conversation.thread.get_messages()]
+
+    async def test_sessions_have_their_own_conversation(self):
+        sessions = SessionManager(self.agent)
+
+        async def ask(session_id, setlist_id):
+            return [e async for e in sessions.chat_stream(session_id, f"Show me setlist {setlist_id}")]
+
+        alice, bob = await asyncio.gather(ask("alice", "63de4613"), ask("bob", "7bd6aa0c"))
+        # progress events of concurrent turns stay with their own session
+        self.assertEqual({e.arguments["setlist_id"] for e in alice if e.kind == "tool_start"}, {"63de4613"})
+        self.assertEqual({e.arguments["setlist_id"] for e in bob if e.kind == "tool_start"}, {"7bd6aa0c"})
+        await sessions.chat("alice", "Show me setlist 63de4613")
+        self.assertEqual(len(await self.messages(sessions, "alice")), 8)
+        self.assertEqual(len(await self.messages(sessions, "bob")), 4)
+        # the repeat hit alice's memo only
+        self.assertEqual(sessions.get("alice").conversation.memo.stats()["hits"], 1)
+        self.assertIsNone(self.agent.thread)
+
+    async def test_least_recently_used_session_is_dropped(self):
+        sessions = SessionManager(self.agent, max_sessions=2)
+        sessions.get("a")
+        sessions.get("b")
+        sessions.get("a")
+        sessions.get("c")
+        self.assertEqual((("a" in sessions), ("b" in sessions), len(sessions)), (True, False, 2))
+        self.assertEqual(sessions.evictions, 1)
+
+    async def test_idle_sessions_expire(self):
+        sessions = SessionManager(self.agent, idle_timeout=0.05)
+        await sessions.chat("a", "Show me setlist 63de4613")
+        await asyncio.sleep(0.06)
+        sessions.get("b")
+        self.assertNotIn("a", sessions)
+
+    async def test_memory_budget_evicts_oldest(self):
+        sessions = SessionManager(self.agent)
+        await sessions.chat("a", "Show me setlist 63de4613")
+        per_session = sessions.stats()["bytes"]
+        self.assertGreater(per_session, 1000)
+        sessions.max_bytes = int(per_session * 1.5)
+        await sessions.chat("b", "Show me setlist 7bd6aa0c")
+        self.assertEqual((("a" in sessions), ("b" in sessions)), (False, True))
+        self.assertLessEqual(sessions.total_bytes, sessions.max_bytes)
+
+    async def test_ended_session_starts_over(self):
+        sessions = SessionManager(self.agent)
+        await sessions.chat("a", "Show me setlist 63de4613")
+        self.assertTrue(sessions.end("a"))
+        self.assertIsNone(sessions.get("a").conversation.thread)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+
+from bench_stubs import StubAgentTestCase
+
+
+class SetlistFMAgentStreamTest(StubAgentTestCase):
+    async def asyncSetUp(self):
+        self.agent = self.stub_agent()
+
+    async def test_stream_reports_tools_then_tokens(self):
+        events = [e async for e in self.agent.chat_stream("Compare setlist 63de4613 with setlist 7bd6aa0c")]
+        kinds = [e.kind for e in events]
+        self.assertEqual(kinds[:2], ["tool_start", "tool_start"])
+        self.assertLess(kinds.index("tool_end"), kinds.index("token"))
+        self.assertEqual(kinds[-1], "done")
+        self.assertGreater(kinds.count("token"), 1)
+        self.assertEqual({e.arguments["setlist_id"] for e in events if e.kind == "tool_end"},
+                         {"63de4613", "7bd6aa0c"})
+        done = events[-1]
+        self.assertEqual(done.text, "".join(e.text for e in events if e.kind == "token"))
+        self.assertTrue(done.text.startswith("Here is what I found"))
+        self.assertLess(done.ttft, done.elapsed)
+
+    async def test_stream_continues_the_conversation(self):
+        await self.agent.chat("Show me setlist 63de4613")
+        events = [e async for e in self.agent.chat_stream("Show me setlist 63de4613")]
+        messages = [m async for m in self.agent.thread.get_messages()]
+        # user, tool call, tool result, answer for each turn
+        self.assertEqual(len(messages), 8)
+        self.assertEqual(messages[-1].content, events[-1].text)
+        # the repeat was answered from the memo and still reported
+        self.assertEqual(self.agent.memo.stats()["hits"], 1)
+        self.assertIn("tool_end", [e.kind for e in events])
+
+
+if __name__ == "__main__":
+    unittest.main()
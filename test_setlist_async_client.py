@@ -0,0 +1,123 @@
+import asyncio
+import unittest
+from datetime import date
+from aiohttp import web
+from setlist_async_client import AsyncSetlistFMClient
+
+
+class TestAsyncSetlistFMClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.requests = []
+        # requests being served right now, and the most seen at once
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+        self.throttle = 0
+
+        async def handler(request):
+            self.requests.append(request)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(0.05)
+            finally:
+                self.in_flight -= 1
+            if request.path.endswith("/missing"):
+                return web.Response(status=404)
+            if self.throttle:
+                self.throttle -= 1
+                return web.Response(status=429, headers={"Retry-After": "0"})
+            if request.path.endswith("/setlists"):
+                page = int(request.query["p"])
+                items = [{"id": f"s{i}", "eventDate": f"{28 - i % 28:02d}-12-{2024 - i // 28}"}
+                         for i in range((page - 1) * 20, min(page * 20, 45))]
+                return web.json_response({"type": "setlists", "itemsPerPage": 20, "page": page,
+                                          "total": 45, "setlist": items})
+            if request.headers.get("If-None-Match") == '"v1"':
+                return web.Response(status=304)
+            return web.json_response({"path": request.path, "query": dict(request.query)},
+                                     headers={"ETag": '"v1"'})
+
+        app = web.Application()
+        app.router.add_get("/rest/1.0/{tail:.*}", handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.base_url = f"http://127.0.0.1:{port}/rest/1.0"
+        self.client = self.make_client(rate_limit=None)
+
+    def make_client(self, **kwargs):
+        client = AsyncSetlistFMClient(api_key="test-key", pool_size=5, **kwargs)
+        client.BASE_URL = self.base_url
+        return client
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+
+    async def test_search_setlists(self):
+        result = await self.client.search_setlists(artist_name="Muse", city_name="London")
+        self.assertEqual(result["total"], 45)
+        self.assertEqual(self.requests[0].path, "/rest/1.0/search/setlists")
+        self.assertEqual(dict(self.requests[0].query), {"p": "1", "artistName": "Muse", "cityName": "London"})
+        self.assertEqual(self.requests[0].headers["x-api-key"], "test-key")
+
+    async def test_concurrent_calls_do_not_serialize(self):
+        results = await asyncio.gather(*[self.client.get_setlist(f"id{i}") for i in range(5)])
+        self.assertEqual([r["path"] for r in results], [f"/rest/1.0/setlist/id{i}" for i in range(5)])
+        # all five on the wire together (pool_size=5), not one after another
+        self.assertEqual(self.peak_in_flight, 5)
+
+    async def test_cached_and_revalidated(self):
+        first = await self.client.get_artist("mbid")
+        self.assertEqual(await self.client.get_artist("mbid"), first)
+        self.assertEqual(len(self.requests), 1)
+
+        key = self.client.cache.make_key("/artist/mbid", None, "en")
+        self.client.cache.lookup(key).expires_at = 0
+        self.assertEqual(await self.client.get_artist("mbid"), first)
+        self.assertEqual(len(self.requests), 2)
+        self.assertEqual(self.client.cache.stats()["revalidations"], 1)
+
+    async def test_identical_concurrent_calls_are_coalesced(self):
+        client = self.make_client(rate_limit=None, cache_size=0)
+        results = await asyncio.gather(*[client.search_artists("Muse") for _ in range(10)])
+        await client.close()
+        self.assertEqual(len(self.requests), 1)
+        self.assertTrue(all(r == results[0] for r in results))
+
+    async def test_throttled_request_is_retried(self):
+        self.throttle = 2
+        result = await self.client.get_venue("v1")
+        self.assertEqual(result["path"], "/rest/1.0/venue/v1")
+        self.assertEqual(len(self.requests), 3)
+
+    async def test_iterates_all_pages_with_prefetch(self):
+        ids = [s["id"] async for s in self.client.iter_artist_setlists("mbid", prefetch=2)]
+        self.assertEqual(ids, [f"s{i}" for i in range(45)])
+        self.assertEqual(sorted(r.query["p"] for r in self.requests), ["1", "2", "3"])
+
+    async def test_early_stop_limits_pages_fetched(self):
+        ids = [s["id"] async for s in self.client.iter_venue_setlists("v1", prefetch=0, max_items=5)]
+        self.assertEqual(len(ids), 5)
+        self.assertEqual(len(self.requests), 1)
+
+        ids = [s["id"] async for s in self.client.iter_search_setlists(artist_name="Muse", prefetch=0,
+                                                                         since=date(2024, 12, 1))]
+        self.assertEqual(ids, [f"s{i}" for i in range(28)])
+
+    async def test_batch_keeps_order_and_reports_errors(self):
+        result = await self.client.get_setlists(["a", "missing", "b", "c"], concurrency=2)
+        self.assertEqual([item.id for item in result.items], ["a", "missing", "b", "c"])
+        self.assertEqual(result.values[2]["path"], "/rest/1.0/setlist/b")
+        self.assertIsNone(result.values[1])
+        self.assertEqual(list(result.errors), ["missing"])
+        stats = result.stats()
+        self.assertEqual((stats["ok"], stats["failed"], stats["concurrency"]), (3, 1, 2))
+        self.assertGreater(stats["elapsed"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
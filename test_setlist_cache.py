@@ -0,0 +1,45 @@
+import time
+import unittest
+from setlist_cache import ResponseCache
+
+
+class TestResponseCache(unittest.TestCase):
+    def test_key_includes_params_and_language(self):
+        key = ResponseCache.make_key("/search/artists", {"p": 1, "artistName": "Muse"}, "en")
+        self.assertEqual(key, ResponseCache.make_key("/search/artists", {"artistName": "Muse", "p": "1"}, "en"))
+        self.assertNotEqual(key, ResponseCache.make_key("/search/artists", {"artistName": "Muse", "p": 1}, "fr"))
+
+    def test_ttl_per_endpoint(self):
+        cache = ResponseCache()
+        self.assertGreater(cache.ttl_for("/setlist/63de4613"), cache.ttl_for("/search/setlists"))
+        self.assertEqual(cache.ttl_for("/unknown"), cache.default_ttl)
+
+    def test_lru_eviction_and_counters(self):
+        cache = ResponseCache(max_size=2)
+        keys = [cache.make_key(f"/setlist/{i}", None, "en") for i in range(3)]
+        cache.store(keys[0], "a")
+        cache.store(keys[1], "b")
+        cache.lookup(keys[0])
+        cache.store(keys[2], "c")
+        self.assertIsNone(cache.lookup(keys[1]))
+        self.assertEqual(cache.lookup(keys[0]).value, "a")
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["hits"], 2)
+        self.assertEqual(cache.stats()["misses"], 1)
+
+    def test_stale_entry_is_revalidated(self):
+        cache = ResponseCache(ttls={"^/search/": 0.01})
+        key = cache.make_key("/search/artists", {"artistName": "Muse"}, "en")
+        cache.store(key, {"artist": []}, etag='"v1"', last_modified="Mon, 01 Jan 2024 00:00:00 GMT")
+        time.sleep(0.02)
+        entry = cache.lookup(key)
+        self.assertFalse(entry.fresh)
+        self.assertEqual(cache.conditional_headers(entry), {
+            "If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"})
+        self.assertEqual(cache.revalidated(key, entry), {"artist": []})
+        self.assertTrue(entry.fresh)
+        self.assertEqual(cache.stats()["revalidations"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 from setlist_client import SetlistFMClient
+from transport import transport_from_env
 import os
 from dotenv import load_dotenv
 import json
@@ -11,7 +12,8 @@ API_KEY = os.environ.get("SETLISTFM_API_KEY", "YOUR_API_KEY")
 if API_KEY == "YOUR_API_KEY":
     print("Warning: Please set your setlist.fm API key in the SETLISTFM_API_KEY environment variable or replace 'YOUR_API_KEY'.")
 
-client = SetlistFMClient(api_key=API_KEY)
+# HTTP_TRANSPORT=record:<file> / replay:<file> records or replays the API traffic
+client = SetlistFMClient(api_key=API_KEY, transport=transport_from_env())
 
 
 # Example: Search for setlists for 'Muse'
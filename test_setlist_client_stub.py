@@ -0,0 +1,70 @@
+import time
+import unittest
+from datetime import date
+
+from bench_stubs import StubAPIServer, make_artist
+from setlist_client import SetlistFMClient
+from setlist_models import parse_event_date
+
+MBID = make_artist("Muse")["mbid"]
+
+
+class SetlistFMClientStubTest(unittest.TestCase):
+    """The blocking client's pagination and batch paths against the local stub server."""
+
+    def setUp(self):
+        self.stub = self.enterContext(StubAPIServer(latency=0.05))
+        self.client = SetlistFMClient("key", cache_size=0, rate_limit=None, max_retries=0)
+        self.client.BASE_URL = self.stub.setlistfm_url
+
+    def test_iterates_pages_in_order_with_prefetch(self):
+        setlists = list(self.client.iter_artist_setlists(MBID, prefetch=2, max_items=50))
+        self.assertEqual(len(setlists), 50)
+        self.assertEqual(len({s["id"] for s in setlists}), 50)
+        dates = [parse_event_date(s["eventDate"]) for s in setlists]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+        # max_items bounds the pages fetched: 3 pages of 20
+        self.assertEqual(self.stub.requests, 3)
+
+    def test_prefetch_overlaps_page_fetches(self):
+        start = time.perf_counter()
+        list(self.client.iter_artist_setlists(MBID, prefetch=0, max_items=100))
+        sequential = time.perf_counter() - start
+        start = time.perf_counter()
+        list(self.client.iter_artist_setlists(MBID, prefetch=4, max_items=100))
+        prefetched = time.perf_counter() - start
+        self.assertLess(prefetched, sequential * 0.8)
+
+    def test_early_stop(self):
+        setlists = list(self.client.iter_search_setlists(artist_name="Muse", prefetch=0, since=date(2024, 12, 20)))
+        self.assertTrue(setlists)
+        self.assertTrue(all(parse_event_date(s["eventDate"]) >= date(2024, 12, 20) for s in setlists))
+        self.assertEqual(self.stub.requests, 1)
+        first = list(self.client.iter_venue_setlists("v000001", stop=lambda s: s["eventDate"].startswith("25-")))
+        self.assertEqual([s["eventDate"][:2] for s in first], ["28", "27", "26"])
+
+    def test_missing_listing_yields_nothing(self):
+        self.client.BASE_URL = self.stub.setlistfm_url + "/down"
+        self.assertEqual(list(self.client.iter_artist_setlists(MBID)), [])
+
+    def test_batch_keeps_order_and_reports_errors(self):
+        result = self.client.get_setlists(["63de4613", "no/such", "7bd6aa0c"], concurrency=2)
+        self.assertEqual([item.id for item in result.items], ["63de4613", "no/such", "7bd6aa0c"])
+        self.assertEqual(result.values[2]["id"], "7bd6aa0c")
+        self.assertIsNone(result.values[1])
+        self.assertEqual(list(result.errors), ["no/such"])
+        self.assertEqual([v["id"] for v in self.client.get_venues(["v000001", "v000002"]).values],
+                         ["v000001", "v000002"])
+        self.assertEqual(self.client.get_artists([MBID]).values[0]["mbid"], MBID)
+
+    def test_batch_runs_concurrently(self):
+        start = time.perf_counter()
+        result = self.client.get_setlists([f"{i:08x}" for i in range(8)], concurrency=8)
+        elapsed = time.perf_counter() - start
+        self.assertEqual(result.stats()["ok"], 8)
+        # sequential calls would take 8 x 50 ms
+        self.assertLess(elapsed, 0.3)
+
+
+if __name__ == "__main__":
+    unittest.main()
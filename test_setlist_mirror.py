@@ -0,0 +1,96 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from setlist_agent import SetlistFMPlugin
+from setlist_client import SetlistFMClient
+from setlist_mirror import SetlistMirror
+
+
+def show(i, last_updated="2024-01-01T00:00:00.000+0000"):
+    return {"id": f"s{i}", "eventDate": f"{28 - i:02d}-12-2024", "lastUpdated": last_updated,
+            "artist": {"mbid": "mbid", "name": "Muse"},
+            "venue": {"id": f"v{i % 2}", "name": "Venue", "city": {"name": "London" if i % 2 else "Paris",
+                                                                 "country": {"code": "GB" if i % 2 else "FR"}}}}
+
+
+class PagedClient(SetlistFMClient):
+    """SetlistFMClient serving an in-memory artist listing, 5 shows per page."""
+
+    def __init__(self, shows):
+        super().__init__("test-key", cache_size=0, rate_limit=None)
+        self.shows = shows
+        self.pages = []
+
+    def _get_json(self, endpoint, params=None):
+        page = params["p"]
+        self.pages.append(page)
+        return {"itemsPerPage": 5, "page": page, "total": len(self.shows),
+                "setlist": self.shows[(page - 1) * 5:page * 5]}
+
+
+class TestSetlistMirror(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.dir.name, "mirror.db")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def test_full_then_incremental_sync(self):
+        client = PagedClient([show(i) for i in range(12)])
+        mirror = SetlistMirror(client, self.path)
+        self.assertEqual(mirror.sync("mbid"), 12)
+        self.assertEqual(client.pages, [1, 2, 3])
+
+        client.shows = [show(-2), show(-1)] + client.shows
+        client.pages = []
+        self.assertEqual(mirror.sync("mbid"), 2)
+        self.assertEqual(client.pages, [1])
+        mirror.close()
+
+    def test_queries(self):
+        mirror = SetlistMirror(PagedClient([show(i) for i in range(12)]), self.path)
+        mirror.sync("mbid")
+        self.assertEqual(mirror.find_artist("muse"), "mbid")
+        self.assertIsNone(mirror.find_artist("Muse", max_age=-1))
+        result = mirror.search_setlists("mbid", city_name="london", items_per_page=3)
+        self.assertEqual(result["total"], 6)
+        self.assertEqual([s["id"] for s in result["setlist"]], ["s1", "s3", "s5"])
+        self.assertEqual(mirror.get_setlist("s4")["venue"]["city"]["name"], "Paris")
+        self.assertIsNone(mirror.get_setlist("unknown"))
+        mirror.close()
+
+
+class ThreadRecordingMirror(SetlistMirror):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.threads = set()
+
+    def find_artist(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().find_artist(*args, **kwargs)
+
+    def search_setlists(self, *args, **kwargs):
+        self.threads.add(threading.get_ident())
+        return super().search_setlists(*args, **kwargs)
+
+
+class TestPluginMirror(unittest.IsolatedAsyncioTestCase):
+    async def test_mirror_queries_run_off_the_event_loop(self):
+        with tempfile.TemporaryDirectory() as directory:
+            mirror = ThreadRecordingMirror(PagedClient([show(i) for i in range(12)]),
+                                           os.path.join(directory, "mirror.db"))
+            mirror.sync("mbid")
+            plugin = SetlistFMPlugin("test-key", mirror=mirror)
+            result = json.loads(await plugin.search_setlists(artist_name="Muse", city_name="London"))
+            self.assertEqual(result["total"], 6)
+            self.assertTrue(mirror.threads)
+            self.assertNotIn(threading.get_ident(), mirror.threads)
+            await plugin.close()
+            mirror.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+from datetime import date
+from setlist_models import Artist, SetlistPage, Setlist, Venue
+
+SETLIST = {
+    "id": "63de4613",
+    "versionId": "7be1aaa0",
+    "eventDate": "23-08-1964",
+    "lastUpdated": "2013-10-20T05:18:08.000+0000",
+    "artist": {"mbid": "b10bbbfc-cf9e-42e0-be17-e2c3e1d2600d", "name": "The Beatles", "sortName": "Beatles, The",
+               "disambiguation": "", "url": "https://www.setlist.fm/setlists/the-beatles-23d6a88b.html"},
+    "venue": {"id": "6bd6ca6e", "name": "Hollywood Bowl",
+              "city": {"id": "5357527", "name": "Hollywood", "state": "California", "stateCode": "CA",
+                       "coords": {"long": -118.3267434, "lat": 34.0983425},
+                       "country": {"code": "US", "name": "United States"}}},
+    "tour": {"name": "North American Tour 1964"},
+    "sets": {"set": [
+        {"song": [{"name": "Intro", "tape": True},
+                  {"name": "Twist and Shout", "cover": {"mbid": "f18f3403", "name": "The Top Notes"}},
+                  {"name": "You Can't Do That"}]},
+        {"encore": 1, "song": [{"name": "Long Tall Sally", "info": "extended"}]},
+    ]},
+}
+
+
+class TestSetlistModels(unittest.TestCase):
+    def test_setlist_fields(self):
+        setlist = Setlist.from_json(SETLIST)
+        self.assertEqual(setlist.artist, Artist("b10bbbfc-cf9e-42e0-be17-e2c3e1d2600d", "The Beatles", "Beatles, The",
+                                                None, "https://www.setlist.fm/setlists/the-beatles-23d6a88b.html"))
+        self.assertEqual(setlist.venue.city.country_code, "US")
+        self.assertEqual(setlist.venue.city.lat, 34.0983425)
+        self.assertEqual(setlist.tour, "North American Tour 1964")
+        self.assertEqual(setlist.date, date(1964, 8, 23))
+        self.assertFalse(hasattr(setlist, "__dict__"))
+
+    def test_sets_are_parsed_lazily(self):
+        setlist = Setlist.from_json(SETLIST)
+        self.assertIsNone(setlist._sets)
+        self.assertEqual([song.name for song in setlist.songs],
+                         ["Intro", "Twist and Shout", "You Can't Do That", "Long Tall Sally"])
+        self.assertIsNone(setlist._raw_sets)
+        self.assertEqual(setlist.sets[1].encore, 1)
+        self.assertTrue(setlist.sets[0].songs[0].tape)
+        self.assertEqual(setlist.sets[0].songs[1].cover.name, "The Top Notes")
+
+    def test_pages(self):
+        page = SetlistPage.from_json({"setlist": [SETLIST, SETLIST], "total": 42, "page": 1, "itemsPerPage": 20})
+        self.assertEqual(len(page), 2)
+        self.assertEqual(page.total, 42)
+        self.assertEqual([s.id for s in page], ["63de4613", "63de4613"])
+        self.assertIn("total=42", repr(page))
+
+    def test_venue_without_city(self):
+        self.assertIsNone(Venue.from_json({"id": "v", "name": "Somewhere"}).city)
+
+
+if __name__ == "__main__":
+    unittest.main()
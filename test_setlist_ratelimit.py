@@ -0,0 +1,70 @@
+import threading
+import time
+import unittest
+from setlist_ratelimit import SingleFlight, TokenBucket, retry_delay, shared_limiter
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_rate(self):
+        bucket = TokenBucket(rate=20, burst=2)
+        start = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        elapsed = time.monotonic() - start
+        self.assertGreaterEqual(elapsed, 0.09)
+        self.assertLess(elapsed, 0.3)
+
+    def test_shared_per_api_key(self):
+        self.assertIs(shared_limiter("key-a"), shared_limiter("key-a"))
+        self.assertIsNot(shared_limiter("key-a"), shared_limiter("key-b"))
+
+    def test_shared_limiter_warns_about_other_rates(self):
+        limiter = shared_limiter("key-c", rate=2.0, burst=2)
+        with self.assertLogs("setlist_ratelimit", level="WARNING"):
+            self.assertIs(shared_limiter("key-c", rate=5.0), limiter)
+        self.assertEqual(limiter.rate, 2.0)
+
+
+class TestRetryDelay(unittest.TestCase):
+    def test_honours_retry_after_seconds(self):
+        delay = retry_delay(0, "2", base=0.5)
+        self.assertGreaterEqual(delay, 2)
+        self.assertLessEqual(delay, 2.5)
+
+    def test_exponential_backoff_is_capped(self):
+        for attempt in range(10):
+            self.assertLessEqual(retry_delay(attempt, None, base=0.5, cap=4), 4)
+
+    def test_unparseable_retry_after_falls_back_to_backoff(self):
+        self.assertLessEqual(retry_delay(0, "soon", base=0.5), 0.5)
+
+
+class TestSingleFlight(unittest.TestCase):
+    def test_concurrent_calls_share_one_execution(self):
+        flight = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return {"artist": "Muse"}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do("muse", fetch)))
+                   for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"artist": "Muse"}] * 10)
+
+    def test_errors_propagate_to_followers(self):
+        flight = SingleFlight()
+        with self.assertRaises(ValueError):
+            flight.do("k", lambda: (_ for _ in ()).throw(ValueError("boom")))
+        self.assertEqual(flight.do("k", lambda: 1), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
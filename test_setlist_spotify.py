@@ -0,0 +1,98 @@
+import asyncio
+import json
+import time
+import unittest
+
+from setlist_spotify import SetlistSpotifyPlugin, SetlistTrackResolver, setlist_songs, title_key
+
+SETLIST = {
+    "id": "63de4613", "eventDate": "23-06-2023", "artist": {"name": "Muse"},
+    "sets": {"set": [
+        {"song": [{"name": "Intro", "tape": True},
+                  {"name": "Will of the People"},
+                  {"name": "Feeling Good", "cover": {"name": "Nina Simone"}},
+                  {"name": "Unreleased Jam"}]},
+        {"encore": 1, "song": [{"name": "Knights of Cydonia"}, {"name": "will of the people"}]},
+    ]},
+}
+
+
+class FakeSpotifyClient:
+    def __init__(self):
+        self.queries = []
+
+    async def search_track(self, track_name, limit=10, offset=0):
+        # same field prefix as AsyncSpotifyClient.search_track
+        return await self.search(f"track:{track_name}", "track", limit, offset)
+
+    async def search(self, query, type="track", limit=10, offset=0):
+        self.queries.append(query)
+        await asyncio.sleep(0.05)
+        if "Unreleased" in query:
+            return {"tracks": {"items": []}}
+        if "Feeling Good" in query:
+            return {"tracks": {"items": [
+                {"id": "muse-fg", "name": "Feeling Good", "artists": [{"name": "Muse"}], "popularity": 70},
+                {"id": "nina-fg", "name": "Feeling Good", "artists": [{"name": "Nina Simone"}], "popularity": 60}]}}
+        if "Knights" in query:
+            return {"tracks": {"items": [
+                {"id": "koc-live", "name": "Knights of Cydonia - Live from Wembley Stadium",
+                 "artists": [{"name": "Muse"}], "popularity": 40},
+                {"id": "koc", "name": "Knights Of Cydonia", "artists": [{"name": "Muse"}], "popularity": 75,
+                 "external_urls": {"spotify": "https://open.spotify.com/track/koc"}}]}}
+        return {"tracks": {"items": [
+            {"id": "wotp", "name": "Will Of The People", "artists": [{"name": "Muse"}], "popularity": 65}]}}
+
+
+class FakeSetlistClient:
+    async def get_setlist(self, setlist_id):
+        return SETLIST
+
+
+class SetlistSpotifyTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.spotify = FakeSpotifyClient()
+        self.resolver = SetlistTrackResolver(self.spotify)
+
+    def test_songs_skip_tapes_and_credit_covers(self):
+        songs = setlist_songs(SETLIST)
+        self.assertEqual([s["song"] for s in songs], ["Will of the People", "Feeling Good", "Unreleased Jam",
+                                                      "Knights of Cydonia", "will of the people"])
+        self.assertEqual(songs[1]["artist"], "Nina Simone")
+        self.assertTrue(songs[3]["encore"])
+
+    def test_title_key_drops_version_suffixes(self):
+        self.assertEqual(title_key("Knights of Cydonia - Live from Wembley Stadium"), "knights of cydonia")
+        self.assertEqual(title_key("Uprising (2011 Remaster)"), "uprising")
+        self.assertEqual(title_key("(Don't Fear) The Reaper"), "don t fear the reaper")
+
+    async def test_setlist_resolves_concurrently(self):
+        start = time.perf_counter()
+        tracks = await self.resolver.resolve_setlist(SETLIST)
+        # searches overlap; the unmatched song adds one free-text retry
+        self.assertLess(time.perf_counter() - start, 0.2)
+        self.assertEqual([t["spotify_id"] for t in tracks], ["wotp", "nina-fg", None, "koc", "wotp"])
+        self.assertEqual(tracks[1]["cover_of"], "Nina Simone")
+        self.assertEqual(tracks[3]["url"], "https://open.spotify.com/track/koc")
+        # the reprise shares the first search; the miss is retried as free text
+        self.assertEqual(len(self.spotify.queries), 5)
+        self.assertIn('track:"Will of the People" artist:"Muse"', self.spotify.queries)
+        self.assertIn("Unreleased Jam Muse", self.spotify.queries)
+        self.assertFalse([q for q in self.spotify.queries if "track:track:" in q])
+
+    async def test_results_are_cached_across_setlists(self):
+        await self.resolver.resolve_setlist(SETLIST)
+        queries = len(self.spotify.queries)
+        await self.resolver.resolve_setlist(SETLIST)
+        self.assertEqual(len(self.spotify.queries), queries)
+        self.assertEqual(self.resolver.stats()["misses"], 4)
+
+    async def test_plugin_returns_one_compact_list(self):
+        plugin = SetlistSpotifyPlugin(FakeSetlistClient(), self.resolver)
+        result = json.loads(await plugin.get_setlist_spotify_tracks("63de4613"))
+        self.assertEqual((result["artist"], result["songs"], result["resolved"]), ("Muse", 5, 4))
+        self.assertEqual(result["items"][2], {"position": 3, "song": "Unreleased Jam", "spotify_id": None})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from setlist_models import Setlist
+from setlist_stats import SongStats
+
+
+def show(id, main, encore=()):
+    sets = [{"song": [{"name": "Intro", "tape": True}] + [{"name": n} for n in main]}]
+    if encore:
+        sets.append({"encore": 1, "song": [{"name": n} for n in encore]})
+    return {"id": id, "sets": {"set": sets}}
+
+
+SHOWS = [
+    show("a", ["Uprising", "Hysteria", "Madness"], ["Knights of Cydonia"]),
+    show("b", ["Uprising", "Plug In Baby", "hysteria"], ["Knights of Cydonia"]),
+    show("c", ["Psycho", "Uprising"], ["Starlight"]),
+    {"id": "empty", "sets": {"set": []}},
+]
+
+
+class TestSongStats(unittest.TestCase):
+    def setUp(self):
+        self.stats = SongStats(SHOWS)
+
+    def test_matrix_shape_skips_tapes_and_empty_shows(self):
+        self.assertEqual(self.stats.show_ids, ["a", "b", "c"])
+        self.assertEqual(self.stats.incidence.shape, (7, 3))
+        self.assertNotIn("Intro", self.stats.songs)
+
+    def test_counts_are_case_insensitive(self):
+        counts = dict(zip(self.stats.songs, self.stats.play_counts()))
+        self.assertEqual(counts["Uprising"], 3)
+        self.assertEqual(counts["Hysteria"], 2)
+
+    def test_song_details(self):
+        knights = self.stats.song("knights of cydonia")
+        self.assertEqual((knights["plays"], knights["closer"], knights["encore"]), (2, 2, 2))
+        self.assertEqual(knights["mean_position"], 1.0)
+        uprising = self.stats.song("Uprising")
+        self.assertEqual((uprising["opener"], uprising["rarity"]), (2, 0.0))
+        self.assertIsNone(self.stats.song("Time Is Running Out"))
+
+    def test_summary(self):
+        summary = self.stats.summary(top=2)
+        self.assertEqual(summary["shows"], 3)
+        self.assertEqual(summary["most_played"][0], {"song": "Uprising", "plays": 3})
+        self.assertEqual(summary["top_openers"], ["Uprising", "Psycho"])
+        self.assertEqual(summary["top_encores"], ["Knights of Cydonia", "Starlight"])
+
+    def test_models_and_dicts_agree(self):
+        self.assertEqual(SongStats([Setlist.from_json(s) for s in SHOWS]).summary(), self.stats.summary())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import unittest
+from aiohttp import web
+from spotify_async_client import AsyncSpotifyClient
+from spotify_plugin import SpotifyPlugin
+
+
+class TestAsyncSpotifyClient(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.token_requests = 0
+        self.requests = []
+        # requests being served right now, and the most seen at once
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.throttle = 0
+        self.reject_token = None
+
+        async def token(request):
+            self.token_requests += 1
+            await asyncio.sleep(0.02)
+            return web.json_response({"access_token": f"token{self.token_requests}", "token_type": "Bearer",
+                                      "expires_in": 3600})
+
+        async def api(request):
+            self.requests.append(request)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                await asyncio.sleep(0.05)
+            finally:
+                self.in_flight -= 1
+            if request.headers["Authorization"] == f"Bearer {self.reject_token}":
+                return web.Response(status=401)
+            if self.throttle:
+                self.throttle -= 1
+                return web.Response(status=429, headers={"Retry-After": "0"})
+            if "ids" in request.query:
+                kind = request.match_info["tail"]
+                # "dropped" ids are left out altogether, as in a short response
+                return web.json_response({kind: [None if id.startswith("missing") else {"id": id}
+                                                 for id in request.query["ids"].split(",")
+                                                 if not id.startswith("dropped")]})
+            return web.json_response({"id": request.match_info["tail"].split("/")[-1], "name": "Uprising",
+                                      "available_markets": ["GB"] * 50, "artists": [{"name": "Muse"}],
+                                      "query": dict(request.query)})
+
+        app = web.Application()
+        app.router.add_post("/api/token", token)
+        app.router.add_get("/v1/{tail:.*}", api)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = self.runner.addresses[0][1]
+        self.client = AsyncSpotifyClient("id", "secret")
+        self.client.API_URL = f"http://127.0.0.1:{port}/v1/"
+        self.client.TOKEN_URL = f"http://127.0.0.1:{port}/api/token"
+
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.runner.cleanup()
+
+    async def test_concurrent_calls_share_one_token(self):
+        results = await asyncio.gather(*[self.client.get_track(f"t{i}") for i in range(5)])
+        self.assertEqual([r["id"] for r in results], [f"t{i}" for i in range(5)])
+        self.assertEqual(self.token_requests, 1)
+        # waiting for the one token does not serialize the calls behind it
+        self.assertEqual(self.peak_in_flight, 5)
+
+    async def test_search_params(self):
+        result = await self.client.search_track("Uprising", limit=5, offset=10)
+        self.assertEqual(result["query"], {"q": "track:Uprising", "type": "track", "limit": "5", "offset": "10"})
+        result = await self.client.search('track:"Uprising" artist:"Muse"', "track", limit=5)
+        self.assertEqual(result["query"]["q"], 'track:"Uprising" artist:"Muse"')
+
+    async def test_rejected_token_is_refreshed_once(self):
+        await self.client.get_artist("a1")
+        self.reject_token = "token1"
+        result = await self.client.get_artist("a2")
+        self.assertEqual(result["id"], "a2")
+        self.assertEqual(self.token_requests, 2)
+
+    async def test_throttled_request_is_retried(self):
+        self.throttle = 1
+        result = await self.client.get_album("al1")
+        self.assertEqual(result["id"], "al1")
+        self.assertEqual(len(self.requests), 2)
+
+    async def test_batch_chunks_to_api_limit(self):
+        ids = [f"t{i}" for i in range(120)] + ["t0", "missing1"]
+        result = await self.client.get_tracks(ids)
+        # each distinct id once, in chunks of 50, all chunks requested together
+        sent = sorted(r.query["ids"].split(",") for r in self.requests)
+        self.assertEqual(sent, [[f"t{i}" for i in range(50)], [f"t{i}" for i in range(100, 120)] + ["missing1"],
+                                [f"t{i}" for i in range(50, 100)]])
+        self.assertEqual(self.peak_in_flight, 3)
+        self.assertEqual([item.id for item in result.items], ids)
+        self.assertEqual(result.values[120], {"id": "t0"})
+        self.assertEqual(result.missing, ["missing1"])
+
+    async def test_short_response_reports_left_out_ids(self):
+        result = await self.client.get_tracks(["dropped1", "t1", "dropped2"])
+        self.assertEqual([item.id for item in result.items], ["dropped1", "t1", "dropped2"])
+        self.assertEqual(result.missing, ["dropped1", "dropped2"])
+
+    async def test_album_batches_are_smaller(self):
+        await self.client.get_albums([f"al{i}" for i in range(45)])
+        self.assertEqual(len(self.requests), 3)
+
+    async def test_failed_chunk_fails_its_ids(self):
+        self.throttle = 10
+        self.client.max_retries = 0
+        result = await self.client.get_artists(["a1", "a2"])
+        self.assertEqual(set(result.errors), {"a1", "a2"})
+        self.assertEqual(result.missing, [])
+
+    async def test_plugin_calls_run_concurrently(self):
+        plugin = SpotifyPlugin("id", "secret", client=self.client)
+        outputs = await asyncio.gather(plugin.get_track("t1"), plugin.get_artist("a1"), plugin.get_album("al1"))
+        self.assertEqual(self.peak_in_flight, 3)
+        self.assertEqual(json.loads(outputs[0])["artists"], ["Muse"])
+        self.assertNotIn("available_markets", outputs[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
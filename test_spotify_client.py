@@ -2,6 +2,7 @@ import os
 import unittest
 from dotenv import load_dotenv
 from spotify_client import SpotifyClient
+from transport import ReplayTransport, transport_from_env
 
 class TestSpotifyClient(unittest.TestCase):
     @classmethod
@@ -9,9 +10,13 @@ class TestSpotifyClient(unittest.TestCase):
         load_dotenv()
         client_id = os.getenv("SPOTIPY_CLIENT_ID")
         client_secret = os.getenv("SPOTIPY_CLIENT_SECRET")
+        # HTTP_TRANSPORT=record:<file> / replay:<file> records or replays the API traffic
+        transport = transport_from_env()
+        if isinstance(transport, ReplayTransport):
+            client_id, client_secret = client_id or "replay", client_secret or "replay"
         if not client_id or not client_secret:
             raise ValueError("SPOTIPY_CLIENT_ID and SPOTIPY_CLIENT_SECRET must be set in the .env file.")
-        cls.spotify = SpotifyClient(client_id, client_secret)
+        cls.spotify = SpotifyClient(client_id, client_secret, transport=transport)
 
     def test_search_artist(self):
         result = self.spotify.search_artist("Radiohead")
@@ -45,6 +50,13 @@ class TestSpotifyClient(unittest.TestCase):
         self.assertEqual(result["id"], track_id)
         self.assertEqual(result["name"], "Karma Police")
 
+    def test_get_artists_batch(self):
+        # Radiohead twice and Muse: order and duplicates are kept
+        ids = ["4Z8W4fKeB5YxbusRsdQVPb", "12Chz98pHFMPJEknJQMWvI", "4Z8W4fKeB5YxbusRsdQVPb"]
+        result = self.spotify.get_artists(ids)
+        self.assertEqual([artist["id"] for artist in result.values], ids)
+        self.assertEqual(result.missing, [])
+
     def test_search_track(self):
         result = self.spotify.search_track("Karma Police")
         self.assertIn("tracks", result)
@@ -0,0 +1,115 @@
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from spotify_token import SpotifyTokenProvider
+
+
+class TokenHandler(BaseHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.exchanges += 1
+            token = f"token{self.server.exchanges}"
+        time.sleep(0.05)
+        body = json.dumps({"access_token": token, "token_type": "Bearer",
+                           "expires_in": self.server.expires_in}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def fetch_in_child(cache_path, token_url, results):
+    provider = SpotifyTokenProvider("id", "secret", cache_path)
+    provider.token_url = token_url
+    results.put(provider.get_token())
+
+
+class SpotifyTokenProviderTest(unittest.TestCase):
+    def setUp(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), TokenHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.exchanges = 0
+        self.httpd.expires_in = 3600
+        self.httpd.lock = threading.Lock()
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        self.token_url = f"http://127.0.0.1:{self.httpd.server_port}/api/token"
+        self.dir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.dir.name, "spotify-token.json")
+        self.providers = []
+
+    def tearDown(self):
+        for provider in self.providers:
+            provider.close()
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.dir.cleanup()
+
+    def provider(self, client_id="id", **kwargs):
+        provider = SpotifyTokenProvider(client_id, "secret", kwargs.pop("cache_path", self.cache_path), **kwargs)
+        provider.token_url = self.token_url
+        self.providers.append(provider)
+        return provider
+
+    def test_concurrent_callers_share_one_exchange(self):
+        provider = self.provider(cache_path=None)
+        with ThreadPoolExecutor(8) as pool:
+            tokens = list(pool.map(lambda _: provider.get_token(), range(8)))
+        self.assertEqual(set(tokens), {"token1"})
+        self.assertEqual(self.httpd.exchanges, 1)
+
+    def test_sibling_adopts_cached_token(self):
+        self.assertEqual(self.provider().get_token(), "token1")
+        sibling = self.provider()
+        self.assertEqual(sibling.get_token(), "token1")
+        self.assertEqual(sibling.exchanges, 0)
+        # another app never reads this app's token
+        self.assertEqual(self.provider(client_id="other").get_token(), "token2")
+
+    def test_worker_processes_share_one_exchange(self):
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+        workers = [context.Process(target=fetch_in_child, args=(self.cache_path, self.token_url, results))
+                   for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        tokens = [results.get(timeout=10) for _ in workers]
+        for worker in workers:
+            worker.join()
+        self.assertEqual(set(tokens), {"token1"})
+        self.assertEqual(self.httpd.exchanges, 1)
+
+    def test_token_is_refreshed_in_the_background(self):
+        self.httpd.expires_in = 2
+        provider = self.provider(refresh_margin=1.7, expiry_margin=0.5)
+        self.assertEqual(provider.get_token(), "token1")
+        time.sleep(0.6)
+        start = time.perf_counter()
+        self.assertEqual(provider.get_token(), "token2")
+        self.assertLess(time.perf_counter() - start, 0.01)
+
+    def test_rejected_token_is_replaced(self):
+        provider = self.provider()
+        provider.get_token()
+        self.assertEqual(provider.get_token(expired="token1"), "token2")
+        self.assertEqual(self.provider().get_token(), "token2")
+
+    def test_shared_is_one_instance_per_process(self):
+        first = SpotifyTokenProvider.shared("shared-id", "secret")
+        self.assertIs(SpotifyTokenProvider.shared("shared-id", "secret"), first)
+        self.assertIsNot(SpotifyTokenProvider.shared("shared-id", "secret", self.cache_path), first)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import time
+import unittest
+from types import SimpleNamespace
+
+from semantic_kernel import Kernel
+from semantic_kernel.functions import FunctionResult, KernelArguments, kernel_function
+
+from tool_memo import ToolMemo
+
+
+class Plugin:
+    @kernel_function(name="search_setlists")
+    def search_setlists(self, artist_name: str = "", page: int = 1) -> str:
+        return "unused"
+
+
+class ToolMemoTest(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        kernel = Kernel()
+        kernel.add_plugin(Plugin(), "SetlistFM")
+        self.function = kernel.get_function("SetlistFM", "search_setlists")
+        self.calls = 0
+
+    async def invoke(self, memo, **arguments):
+        context = SimpleNamespace(function=self.function, arguments=KernelArguments(**arguments),
+                                  function_result=None)
+
+        async def next(context):
+            self.calls += 1
+            value = "Error: upstream down" if arguments.get("artist_name") == "broken" else f"result {self.calls}"
+            context.function_result = FunctionResult(function=self.function.metadata, value=value)
+
+        await memo.filter(context, next)
+        return context.function_result.value
+
+    async def test_repeated_call_is_answered_from_memo(self):
+        memo = ToolMemo()
+        first = await self.invoke(memo, artist_name="Muse")
+        # same call once defaults and name case are normalized
+        self.assertEqual(await self.invoke(memo, artist_name=" muse ", page=1), first)
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(memo.stats()["hits"], 1)
+        await self.invoke(memo, artist_name="Muse", page=2)
+        self.assertEqual(self.calls, 2)
+
+    async def test_errors_are_not_memoized(self):
+        memo = ToolMemo()
+        await self.invoke(memo, artist_name="broken")
+        await self.invoke(memo, artist_name="broken")
+        self.assertEqual(self.calls, 2)
+
+    async def test_ttl_expiry(self):
+        memo = ToolMemo(ttl=0.05)
+        await self.invoke(memo, artist_name="Muse")
+        time.sleep(0.06)
+        await self.invoke(memo, artist_name="Muse")
+        self.assertEqual(self.calls, 2)
+
+    def test_size_cap_drops_least_recently_used(self):
+        memo = ToolMemo(max_size=2)
+        keys = [ToolMemo.make_key("P", "f", {"id": str(i)}) for i in range(3)]
+        memo.put(keys[0], "a")
+        memo.put(keys[1], "b")
+        memo.get(keys[0])
+        memo.put(keys[2], "c")
+        self.assertIsNone(memo.get(keys[1]))
+        self.assertEqual(memo.get(keys[0]), "a")
+
+    def test_ids_keep_their_case(self):
+        self.assertNotEqual(ToolMemo.make_key("P", "get_track", {"track_id": "AbC"}),
+                            ToolMemo.make_key("P", "get_track", {"track_id": "abc"}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+import json
+import unittest
+
+from tool_output import SPOTIFY_PROJECTIONS, ToolOutput, fit
+
+
+def raw_setlist(i):
+    return {"id": f"{i:08x}", "eventDate": "01-02-2024", "versionId": "7abc", "lastUpdated": "2024-02-02T00:00:00",
+            "url": f"https://www.setlist.fm/setlist/{i:08x}.html",
+            "artist": {"mbid": "a74b1b7f", "name": "Muse", "sortName": "Muse", "url": "https://example.com"},
+            "venue": {"id": "v1", "name": "O2 Arena", "url": "https://example.com",
+                      "city": {"id": "1", "name": "London", "state": "England", "stateCode": "ENG",
+                               "coords": {"lat": 51.5, "long": 0.0}, "country": {"code": "GB", "name": "UK"}}},
+            "tour": {"name": "Tour"},
+            "sets": {"set": [{"song": [{"name": "Uprising"}, {"name": "Intro", "tape": True}, {"name": "Psycho"}]},
+                             {"encore": 1, "song": [{"name": "Knights of Cydonia"}]}]}}
+
+
+class ToolOutputTest(unittest.TestCase):
+    def test_setlist_projection(self):
+        out = json.loads(ToolOutput().render("get_setlist", raw_setlist(1)))
+        self.assertEqual(out["date"], "01-02-2024")
+        self.assertEqual(out["songs"], ["Uprising", "Psycho"])
+        self.assertEqual(out["encore"], ["Knights of Cydonia"])
+        self.assertEqual((out["venue"], out["city"], out["country"]), ("O2 Arena", "London", "GB"))
+        self.assertNotIn("url", out)
+
+    def test_page_marks_next_page(self):
+        page = {"type": "setlists", "itemsPerPage": 2, "page": 1, "total": 5,
+                "setlist": [raw_setlist(1), raw_setlist(2)]}
+        out = json.loads(ToolOutput().render("search_setlists", page))
+        self.assertEqual(out["next_page"], 2)
+        self.assertEqual([s["id"] for s in out["items"]], ["00000001", "00000002"])
+
+    def test_budget_trims_items_deterministically(self):
+        page = {"type": "setlists", "itemsPerPage": 20, "page": 1, "total": 20,
+                "setlist": [raw_setlist(i) for i in range(20)]}
+        output = ToolOutput(max_bytes=1500)
+        text = output.render("search_setlists", page)
+        self.assertLessEqual(len(text.encode()), 1500)
+        self.assertEqual(text, output.render("search_setlists", page))
+        out = json.loads(text)
+        self.assertTrue(out["more_available"])
+        self.assertEqual(len(out["items"]) + out["omitted"], 20)
+        self.assertEqual(out["items"][0]["id"], "00000000")
+
+    def test_unprojectable_payload_becomes_preview(self):
+        text = fit({"blob": "x" * 500}, 200)
+        out = json.loads(text)
+        self.assertTrue(out["truncated"])
+        self.assertLessEqual(len(text.encode()), 200)
+
+    def test_preview_budget_counts_escaping(self):
+        for payload in ({"a": {"quote": '"\\' * 400}, "b": {"c": 1}},
+                        {"a": {"text": "日本語のテキスト" * 100}},
+                        {"a": {"emoji": "\U0001f3b8" * 300}}):
+            for max_bytes in (80, 200, 500):
+                text = fit(payload, max_bytes)
+                self.assertLessEqual(len(text.encode()), max_bytes)
+                self.assertTrue(json.loads(text)["truncated"])
+
+    def test_lists_are_trimmed(self):
+        payload = [{"name": f"Song {i}", "info": '"' * i} for i in range(40)]
+        text = fit(payload, 300)
+        self.assertLessEqual(len(text.encode()), 300)
+        out = json.loads(text)
+        self.assertEqual(out[0], payload[0])
+        self.assertEqual(len(out) - 1 + out[-1]["omitted"], 40)
+        self.assertTrue(out[-1]["more_available"])
+
+    def test_tiny_budget_is_still_enforced(self):
+        for max_bytes in (0, 5, 20):
+            self.assertLessEqual(len(fit({"blob": "x" * 500}, max_bytes).encode()), max_bytes)
+
+    def test_full_mode_keeps_payload(self):
+        setlist = raw_setlist(1)
+        self.assertEqual(json.loads(ToolOutput(compact=False).render("get_setlist", setlist)), setlist)
+
+    def test_token_budget(self):
+        self.assertEqual(ToolOutput(max_tokens=100).max_bytes, 400)
+
+
+def spotify_track(i):
+    return {"id": f"t{i}", "name": f"Song {i}", "duration_ms": 245_000, "popularity": 60, "track_number": 3,
+            "explicit": False, "available_markets": ["GB", "US"] * 40, "external_urls": {"spotify": "https://x"},
+            "artists": [{"id": "a1", "name": "Muse", "href": "https://x"}],
+            "album": {"id": "al1", "name": "Origin of Symmetry", "release_date": "2001-06-18",
+                      "available_markets": ["GB"] * 80, "images": [{"url": "https://x", "height": 640}]}}
+
+
+class SpotifyOutputTest(unittest.TestCase):
+    def setUp(self):
+        self.output = ToolOutput(projections=SPOTIFY_PROJECTIONS)
+
+    def test_track_fields(self):
+        out = json.loads(self.output.render("get_track", spotify_track(1)))
+        self.assertEqual(out, {"id": "t1", "name": "Song 1", "artists": ["Muse"], "album": "Origin of Symmetry",
+                               "release_date": "2001-06-18", "duration": "4:05", "track_number": 3,
+                               "popularity": 60})
+
+    def test_search_page_and_next_offset(self):
+        result = {"tracks": {"items": [spotify_track(i) for i in range(3)], "total": 30, "offset": 0, "limit": 3,
+                             "next": "https://api.spotify.com/v1/search?offset=3"}}
+        out = json.loads(self.output.render("search_track", result))
+        self.assertEqual(out["next_offset"], 3)
+        self.assertEqual([t["name"] for t in out["items"]], ["Song 0", "Song 1", "Song 2"])
+        self.assertNotIn("available_markets", json.dumps(out))
+
+    def test_album_track_names(self):
+        album = {"id": "al1", "name": "Absolution", "album_type": "album", "release_date": "2003-09-15",
+                 "artists": [{"name": "Muse"}], "available_markets": ["GB"] * 80,
+                 "tracks": {"items": [{"name": "Intro"}, {"name": "Apocalypse Please"}]}}
+        out = json.loads(self.output.render("get_album", album))
+        self.assertEqual(out["tracks"], ["Intro", "Apocalypse Please"])
+        self.assertEqual(out["artists"], ["Muse"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from spotipy.cache_handler import MemoryCacheHandler
+
+from setlist_async_client import AsyncSetlistFMClient
+from setlist_client import SetlistFMClient
+from spotify_client import SpotifyClient
+from transport import RecordTransport, ReplayTransport
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"path": self.path}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestTransport(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f"http://127.0.0.1:{cls.server.server_port}/rest/1.0"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+
+    def setUp(self):
+        self.dir = tempfile.TemporaryDirectory()
+        self.fixtures = os.path.join(self.dir.name, "fixtures.jsonl")
+
+    def tearDown(self):
+        self.dir.cleanup()
+
+    def client(self, transport, cls=SetlistFMClient):
+        client = cls("secret-key", cache_size=0, rate_limit=None, max_retries=0, transport=transport)
+        client.BASE_URL = self.base_url
+        return client
+
+    def record(self):
+        client = self.client(RecordTransport(self.fixtures))
+        live = client.search_setlists(artist_name="Muse", city_name="London")
+        client.get_setlist("63de4613")
+        return live
+
+    def test_record_then_replay_offline(self):
+        live = self.record()
+        with open(self.fixtures) as f:
+            self.assertNotIn("secret-key", f.read())
+        client = self.client(ReplayTransport(self.fixtures))
+        self.assertEqual(client.search_setlists(artist_name="Muse", city_name="London"), live)
+        with self.assertRaises(requests.HTTPError) as raised:
+            client.get_venue("unrecorded")
+        self.assertEqual(raised.exception.response.status_code, 404)
+
+    def test_async_replay_with_latency(self):
+        import asyncio
+        self.record()
+        client = self.client(ReplayTransport(self.fixtures, latency=0.05), AsyncSetlistFMClient)
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            start = loop.time()
+            results = await asyncio.gather(*[client.get_setlist("63de4613") for _ in range(3)],
+                                           client.search_setlists(artist_name="Muse", city_name="London"))
+            await client.close()
+            return results, loop.time() - start
+
+        results, elapsed = asyncio.run(run())
+        self.assertEqual(results[0]["path"], "/rest/1.0/setlist/63de4613")
+        self.assertGreaterEqual(elapsed, 0.05)
+        self.assertLess(elapsed, 0.15)
+
+    def test_injected_errors_are_reproducible(self):
+        self.record()
+
+        def outcomes():
+            client = self.client(ReplayTransport(self.fixtures, error_rate=0.5, seed=7))
+            result = []
+            for _ in range(20):
+                try:
+                    client.get_setlist("63de4613")
+                    result.append(True)
+                except requests.HTTPError as e:
+                    self.assertEqual(e.response.status_code, 503)
+                    result.append(False)
+            return result
+
+        first = outcomes()
+        self.assertEqual(first, outcomes())
+        self.assertIn(True, first)
+        self.assertIn(False, first)
+
+    def test_spotify_replay(self):
+        with open(self.fixtures, "w") as f:
+            f.write(json.dumps({"method": "POST", "url": "https://accounts.spotify.com/api/token", "query": [],
+                                "status": 200, "headers": {"Content-Type": "application/json"},
+                                "body": json.dumps({"access_token": "t", "token_type": "Bearer", "expires_in": 3600})}) + "\n")
+            f.write(json.dumps({"method": "GET", "url": "https://api.spotify.com/v1/artists/4Z8W4fKeB5YxbusRsdQVPb",
+                                "query": [], "status": 200, "headers": {"Content-Type": "application/json"},
+                                "body": json.dumps({"id": "4Z8W4fKeB5YxbusRsdQVPb", "name": "Radiohead"})}) + "\n")
+        spotify = SpotifyClient("id", "secret", transport=ReplayTransport(self.fixtures))
+        spotify.auth_manager.cache_handler = MemoryCacheHandler()
+        self.assertEqual(spotify.get_artist("4Z8W4fKeB5YxbusRsdQVPb")["name"], "Radiohead")
+
+
+if __name__ == "__main__":
+    unittest.main()
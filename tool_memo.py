@@ -0,0 +1,91 @@
+"""Conversation-scoped memo of tool results.
+
+Models often repeat a tool call with the same arguments a few turns later
+(search_artists("Muse") again, get_setlist of an id already shown) rather
+than trusting earlier context. ToolMemo sits in front of function
+invocation as a Semantic Kernel auto-function-invocation filter and
+answers such repeats from memory. Keys are plugin, function and the
+normalized arguments (defaults filled in, names case-folded). Entries
+expire after ttl seconds and the least recently used are dropped beyond
+max_size. Error answers are never memoized.
+"""
+import json
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from opentelemetry.trace import get_tracer
+from semantic_kernel.functions import FunctionResult
+
+tracer = get_tracer(__name__)
+
+
+class ToolMemo:
+    def __init__(self, max_size: int = 128, ttl: float = 600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(plugin: Optional[str], function: str, arguments: Dict[str, Any]) -> Tuple:
+        normalized = []
+        for name, value in sorted(arguments.items()):
+            if isinstance(value, str):
+                value = " ".join(value.split())
+                # names are matched case-insensitively upstream; ids are not
+                if name.endswith("_name"):
+                    value = value.casefold()
+                elif name == "country_code":
+                    value = value.upper()
+            normalized.append((name, json.dumps(value, sort_keys=True, default=str)))
+        return (plugin, function, tuple(normalized))
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Tuple, value: Any) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def approx_bytes(self) -> int:
+        """Rough size of the memoized results."""
+        return sum(len(value) for _, value in self._entries.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "max_size": self.max_size, "hits": self.hits, "misses": self.misses}
+
+    async def filter(self, context, next) -> None:
+        """Auto function invocation filter: answer repeated tool calls from the memo."""
+        function = context.function
+        arguments = {p.name: context.arguments.get(p.name, p.default_value)
+                     for p in function.metadata.parameters}
+        key = self.make_key(function.plugin_name, function.name, arguments)
+        with tracer.start_as_current_span(f"tool_memo {function.fully_qualified_name}") as span:
+            cached = self.get(key)
+            span.set_attribute("tool_memo.hit", cached is not None)
+            span.set_attribute("tool_memo.hits", self.hits)
+            span.set_attribute("tool_memo.misses", self.misses)
+            if cached is not None:
+                context.function_result = FunctionResult(function=function.metadata, value=cached)
+                return
+            await next(context)
+            value = context.function_result.value if context.function_result is not None else None
+            if isinstance(value, str) and not value.startswith("Error"):
+                self.put(key, value)
@@ -0,0 +1,201 @@
+"""Compact, size-bounded rendering of tool results for the agent.
+
+Raw setlist.fm and Spotify payloads are mostly ids, URLs, image lists,
+market codes and nesting the model never needs. In compact mode a
+per-function projection keeps only the useful fields (dates, venue and
+city names, song titles, genres, release dates), the result is encoded
+as minified JSON, and anything over the byte budget is trimmed from the
+end of its longest list with an explicit "more available" marker, so the
+same input always renders to the same output.
+"""
+import json
+from typing import Any, Callable, Dict, List, Optional
+
+# Rough size of a token in bytes of English/JSON text, for token budgets.
+BYTES_PER_TOKEN = 4
+DEFAULT_MAX_BYTES = 6000
+
+
+def artist(data: Dict[str, Any]) -> Dict[str, Any]:
+    return _compact({"mbid": data.get("mbid"), "name": data.get("name"),
+                     "disambiguation": data.get("disambiguation")})
+
+
+def venue(data: Dict[str, Any]) -> Dict[str, Any]:
+    city = data.get("city") or {}
+    return _compact({"id": data.get("id"), "name": data.get("name"), "city": city.get("name"),
+                     "state": city.get("state"), "country": (city.get("country") or {}).get("code")})
+
+
+def setlist(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Date, artist, venue and song titles; encore songs are listed separately."""
+    songs: List[str] = []
+    encore: List[str] = []
+    for s in (data.get("sets") or {}).get("set", []):
+        names = [song["name"] for song in s.get("song", []) if song.get("name") and not song.get("tape")]
+        (encore if s.get("encore") else songs).extend(names)
+    place = venue(data.get("venue") or {})
+    return _compact({"id": data.get("id"), "date": data.get("eventDate"),
+                     "artist": (data.get("artist") or {}).get("name"), "venue": place.get("name"),
+                     "city": place.get("city"), "country": place.get("country"),
+                     "tour": (data.get("tour") or {}).get("name"), "songs": songs, "encore": encore})
+
+
+def page(key: str, item: Callable[[Dict[str, Any]], Dict[str, Any]]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Project a paged answer to its position plus projected items."""
+    def project(data: Dict[str, Any]) -> Dict[str, Any]:
+        number = data.get("page", 1)
+        total = data.get("total", 0)
+        items = [item(i) for i in data.get(key, [])]
+        result = {"page": number, "total": total, "items": items}
+        if number * data.get("itemsPerPage", len(items) or 1) < total:
+            result["next_page"] = number + 1
+        return result
+    return project
+
+
+def spotify_artist(data: Dict[str, Any]) -> Dict[str, Any]:
+    return _compact({"id": data.get("id"), "name": data.get("name"), "genres": data.get("genres"),
+                     "popularity": data.get("popularity"), "followers": (data.get("followers") or {}).get("total")})
+
+
+def spotify_album(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Album facts; the track list (names only) when the album was fetched by id."""
+    tracks = (data.get("tracks") or {}).get("items")
+    return _compact({"id": data.get("id"), "name": data.get("name"), "type": data.get("album_type"),
+                     "artists": _names(data.get("artists")), "release_date": data.get("release_date"),
+                     "total_tracks": data.get("total_tracks"), "label": data.get("label"),
+                     "tracks": [t.get("name") for t in tracks] if tracks else None})
+
+
+def spotify_track(data: Dict[str, Any]) -> Dict[str, Any]:
+    album = data.get("album") or {}
+    duration = data.get("duration_ms")
+    return _compact({"id": data.get("id"), "name": data.get("name"), "artists": _names(data.get("artists")),
+                     "album": album.get("name"), "release_date": album.get("release_date"),
+                     "duration": f"{duration // 60000}:{duration // 1000 % 60:02d}" if duration else None,
+                     "track_number": data.get("track_number"), "popularity": data.get("popularity"),
+                     "explicit": data.get("explicit") or None})
+
+
+def spotify_page(item: Callable[[Dict[str, Any]], Dict[str, Any]], key: Optional[str] = None
+                 ) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Project a Spotify paging object, optionally nested under key as search answers are."""
+    def project(data: Dict[str, Any]) -> Dict[str, Any]:
+        paging = (data.get(key) or {}) if key else data
+        offset = paging.get("offset", 0)
+        items = [item(i) for i in paging.get("items", []) if i]
+        result = {"offset": offset, "total": paging.get("total", len(items)), "items": items}
+        if paging.get("next"):
+            result["next_offset"] = offset + len(items)
+        return result
+    return project
+
+
+SETLISTFM_PROJECTIONS: Dict[str, Callable[[Any], Any]] = {
+    "search_artists": page("artist", artist),
+    "search_setlists": page("setlist", setlist),
+    "get_setlist": setlist,
+    "get_venue": venue,
+}
+
+SPOTIFY_PROJECTIONS: Dict[str, Callable[[Any], Any]] = {
+    "search_artist": spotify_page(spotify_artist, "artists"),
+    "get_artist": spotify_artist,
+    "get_artist_albums": spotify_page(spotify_album),
+    "get_album": spotify_album,
+    "get_track": spotify_track,
+    "search_track": spotify_page(spotify_track, "tracks"),
+}
+
+
+class ToolOutput:
+    """Render tool results for the model.
+
+    Args:
+        compact: Project and minify results; False keeps the full indented payload
+        max_bytes: Budget for one compact result (None for unlimited)
+        max_tokens: Alternative budget in tokens, converted at BYTES_PER_TOKEN
+        projections: Projection per function name, e.g. SPOTIFY_PROJECTIONS
+    """
+
+    def __init__(self, compact: bool = True, max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 max_tokens: Optional[int] = None,
+                 projections: Optional[Dict[str, Callable[[Any], Any]]] = None):
+        self.compact = compact
+        self.projections = projections if projections is not None else SETLISTFM_PROJECTIONS
+        self.max_bytes = max_tokens * BYTES_PER_TOKEN if max_tokens is not None else max_bytes
+
+    def render(self, function: str, result: Any) -> str:
+        if not self.compact:
+            return json.dumps(result, indent=2)
+        projection = self.projections.get(function)
+        return fit(projection(result) if projection else result, self.max_bytes)
+
+
+def encode(payload: Any) -> str:
+    return json.dumps(payload, separators=(",", ":"), ensure_ascii=False)
+
+
+def fit(payload: Any, max_bytes: Optional[int]) -> str:
+    """Minified JSON of payload, trimmed to max_bytes.
+
+    Dicts lose entries from the end of their longest list ("items" for
+    pages) and gain "omitted" and "more_available" fields; lists lose
+    entries from their end and end with such a marker. Anything that
+    still does not fit is cut and wrapped as a truncated preview.
+    """
+    text = encode(payload)
+    if max_bytes is None or _size(text) <= max_bytes:
+        return text
+    trimmed = None
+    if isinstance(payload, list):
+        trimmed = _longest_fitting(len(payload), max_bytes, lambda keep: payload[:keep] + [
+            {"omitted": len(payload) - keep, "more_available": True}])
+    elif isinstance(payload, dict):
+        key = "items" if isinstance(payload.get("items"), list) else _longest_list(payload)
+        if key is not None:
+            items = payload[key]
+            trimmed = _longest_fitting(len(items), max_bytes, lambda keep: dict(
+                payload, **{key: items[:keep], "omitted": len(items) - keep, "more_available": True}))
+    if trimmed is not None:
+        return trimmed
+    # the preview is escaped again when encoded, so its cut point is measured on the encoded wrapper
+    preview = _longest_fitting(len(text), max_bytes, lambda keep: {
+        "truncated": True, "more_available": True, "preview": text[:keep]})
+    if preview is not None:
+        return preview
+    marker = encode({"truncated": True})
+    return marker if _size(marker) <= max_bytes else ""
+
+
+def _longest_fitting(count: int, max_bytes: int, build: Callable[[int], Any]) -> Optional[str]:
+    """Encoding of build(keep) for the largest keep <= count that fits in max_bytes, if any does."""
+    low, high = 0, count
+    best = None
+    while low <= high:
+        keep = (low + high) // 2
+        candidate = encode(build(keep))
+        if _size(candidate) <= max_bytes:
+            best, low = candidate, keep + 1
+        else:
+            high = keep - 1
+    return best
+
+
+def _size(text: str) -> int:
+    return len(text.encode("utf-8"))
+
+
+def _longest_list(payload: Dict[str, Any]) -> Optional[str]:
+    lists = [(len(v), k) for k, v in payload.items() if isinstance(v, list) and v]
+    return max(lists)[1] if lists else None
+
+
+def _names(items: Optional[List[Dict[str, Any]]]) -> Optional[List[str]]:
+    return [i.get("name") for i in items] if items else None
+
+
+def _compact(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop empty fields."""
+    return {k: v for k, v in data.items() if v not in (None, "", [], {})}
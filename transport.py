@@ -0,0 +1,252 @@
+"""Pluggable HTTP transports for SetlistFMClient and SpotifyClient.
+
+RecordTransport passes requests through to the network and appends every
+request/response pair to a JSON-lines fixture file. ReplayTransport serves
+those pairs from the file without any network access, optionally adding
+latency and failures so caching and concurrency work can be measured
+reproducibly.
+
+Both plug into a requests.Session (mount) and into the aiohttp session of
+AsyncSetlistFMClient (wrap_async). Request headers are never recorded, so
+API keys stay out of fixtures.
+"""
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from typing import Optional, Dict, Any, List, Tuple
+from urllib.parse import parse_qsl, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+# Response headers worth keeping in fixtures (caching and rate limiting use them).
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Retry-After")
+
+
+def request_key(method: str, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple:
+    """Identify a request by method, URL without query, and sorted query parameters."""
+    parts = urlsplit(url)
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    query += [(k, str(v)) for k, v in (params or {}).items()]
+    base = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    return (method.upper(), base, tuple(sorted(query)))
+
+
+class RecordTransport:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def record(self, method: str, url: str, params: Optional[Dict[str, Any]], status: int,
+               headers: Dict[str, str], body: str) -> None:
+        method, base, query = request_key(method, url, params)
+        entry = {"method": method, "url": base, "query": [list(q) for q in query], "status": status,
+                 "headers": {k: headers[k] for k in KEPT_HEADERS if k in headers}, "body": body}
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+    def mount(self, session: requests.Session) -> None:
+        adapter = _RecordingAdapter(self)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def wrap_async(self, session):
+        return _RecordingAsyncSession(self, session)
+
+
+class ReplayTransport:
+    """Serve recorded responses; repeated requests cycle through their recordings.
+
+    Args:
+        path: Fixture file written by RecordTransport
+        latency: Seconds added to every response
+        jitter: Extra random latency, uniform in [0, jitter]
+        error_rate: Probability of answering error_status instead of the recording
+        error_status: Status code of injected failures
+        seed: Seed for the latency/error generator, for reproducible runs
+    """
+
+    def __init__(self, path: str, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, seed: Optional[int] = None):
+        self.path = path
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._responses: Dict[Tuple, List[Dict[str, Any]]] = defaultdict(list)
+        self._served: Dict[Tuple, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    key = (entry["method"], entry["url"], tuple(tuple(q) for q in entry["query"]))
+                    self._responses[key].append(entry)
+
+    def respond(self, method: str, url: str, params: Optional[Dict[str, Any]] = None) -> Tuple[float, int, Dict[str, str], str]:
+        """Return (delay, status, headers, body) for a request."""
+        key = request_key(method, url, params)
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return delay, self.error_status, {}, ""
+            recordings = self._responses.get(key)
+            if not recordings:
+                return delay, 404, {"Content-Type": "text/plain"}, f"No recording for {key}"
+            entry = recordings[self._served[key] % len(recordings)]
+            self._served[key] += 1
+        return delay, entry["status"], dict(entry["headers"]), entry["body"]
+
+    def mount(self, session: requests.Session) -> None:
+        adapter = _ReplayAdapter(self)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+
+    def wrap_async(self, session):
+        return _ReplayAsyncSession(self, session)
+
+
+def transport_from_env(variable: str = "HTTP_TRANSPORT"):
+    """Build a transport from e.g. HTTP_TRANSPORT=record:fixtures.jsonl or replay:fixtures.jsonl."""
+    spec = os.environ.get(variable)
+    if not spec:
+        return None
+    mode, _, path = spec.partition(":")
+    if mode == "record":
+        return RecordTransport(path)
+    if mode == "replay":
+        return ReplayTransport(path, latency=float(os.environ.get(f"{variable}_LATENCY", 0)),
+                               error_rate=float(os.environ.get(f"{variable}_ERROR_RATE", 0)))
+    raise ValueError(f"{variable} must be record:<path> or replay:<path>, got {spec!r}")
+
+
+class _RecordingAdapter(HTTPAdapter):
+    def __init__(self, transport: RecordTransport):
+        super().__init__()
+        self.transport = transport
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        self.transport.record(request.method, request.url, None, response.status_code,
+                              response.headers, response.text)
+        return response
+
+
+class _ReplayAdapter(BaseAdapter):
+    def __init__(self, transport: ReplayTransport):
+        super().__init__()
+        self.transport = transport
+
+    def send(self, request, **kwargs):
+        delay, status, headers, body = self.transport.respond(request.method, request.url)
+        if delay:
+            time.sleep(delay)
+        response = requests.Response()
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers)
+        response._content = body.encode("utf-8")
+        response.encoding = "utf-8"
+        response.url = request.url
+        response.request = request
+        response.reason = "Replayed"
+        return response
+
+    def close(self):
+        pass
+
+
+class _ReplayResponse:
+    """The subset of aiohttp.ClientResponse used by AsyncSetlistFMClient."""
+
+    def __init__(self, method: str, url: str, status: int, headers: Dict[str, str], body: str):
+        self.method = method
+        self.url = url
+        self.status = status
+        self.headers = CaseInsensitiveDict(headers)
+        self._body = body
+
+    def raise_for_status(self) -> None:
+        if self.status >= 400:
+            import aiohttp
+            raise aiohttp.ClientResponseError(None, (), status=self.status, message=self._body,
+                                              headers=self.headers)
+
+    async def json(self) -> Any:
+        return json.loads(self._body)
+
+    async def text(self) -> str:
+        return self._body
+
+
+class _ReplayAsyncSession:
+    def __init__(self, transport: ReplayTransport, session):
+        self.transport = transport
+        self.session = session
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        return _AsyncContext(self._respond("GET", url, params))
+
+    def post(self, url: str, **kwargs):
+        return _AsyncContext(self._respond("POST", url, None))
+
+    async def _respond(self, method, url, params):
+        delay, status, headers, body = self.transport.respond(method, url, params)
+        if delay:
+            await asyncio.sleep(delay)
+        return _ReplayResponse(method, url, status, headers, body)
+
+
+class _RecordingAsyncSession:
+    def __init__(self, transport: RecordTransport, session):
+        self.transport = transport
+        self.session = session
+
+    @property
+    def closed(self) -> bool:
+        return self.session.closed
+
+    async def close(self) -> None:
+        await self.session.close()
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs):
+        return _AsyncContext(self._record("GET", url, params, kwargs))
+
+    def post(self, url: str, **kwargs):
+        return _AsyncContext(self._record("POST", url, None, kwargs))
+
+    async def _record(self, method, url, params, kwargs):
+        response = await self.session.request(method, url, params=params, **kwargs)
+        # read the body now; aiohttp keeps it for the caller's json()
+        body = await response.text()
+        self.transport.record(method, url, params, response.status, response.headers, body)
+        return response
+
+
+class _AsyncContext:
+    """Async context manager around a coroutine returning a response."""
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._response = None
+
+    async def __aenter__(self):
+        self._response = await self._coro
+        return self._response
+
+    async def __aexit__(self, *exc_info):
+        release = getattr(self._response, "release", None)
+        if release is not None:
+            release()